@@ -1,6 +1,8 @@
+import os
 import sys
 import bcrypt
 import requests
+from requests.adapters import HTTPAdapter
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QLineEdit, QPushButton, 
                              QComboBox, QMessageBox, QFrame, QStackedWidget,
@@ -43,6 +45,16 @@ class SupabaseClient:
             'Content-Type': 'application/json',
             'Prefer': 'return=representation'
         }
+        # Tüm istekler aynı oturumu kullanır: TLS bağlantısı bir kez kurulur,
+        # sonraki tıklamalar keep-alive bağlantıları havuzdan alır
+        pool_size = int(os.getenv("SUPABASE_POOL_SIZE", "10"))
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    
+    def close(self):
+        """Havuzdaki bağlantıları kapat"""
+        self.session.close()
     
     def insert_user(self, username, password_hash, role):
         """Kullanıcı ekleme fonksiyonu"""
@@ -53,9 +65,8 @@ class SupabaseClient:
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.url}/rest/v1/users",
-                headers=self.headers,
                 json=data,
                 timeout=10  # 10 saniye timeout
             )
@@ -87,9 +98,8 @@ class SupabaseClient:
     def get_user(self, username):
         """Kullanıcı getir"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.url}/rest/v1/users?username=eq.{username}",
-                headers=self.headers,
                 timeout=10
             )
             
@@ -103,9 +113,8 @@ class SupabaseClient:
     def get_all_users(self):
         """Tüm kullanıcıları getir"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.url}/rest/v1/users?select=id,username,role",
-                headers=self.headers,
                 timeout=10
             )
             
@@ -118,9 +127,8 @@ class SupabaseClient:
     def delete_user_direct(self, user_id):
         """Kullanıcı silme işlemi (direkt API çağrısı)"""
         try:
-            response = requests.delete(
+            response = self.session.delete(
                 f"{self.url}/rest/v1/users?id=eq.{user_id}",
-                headers=self.headers,
                 timeout=10
             )
             
@@ -490,6 +498,7 @@ class AirbotUserCreation(QMainWindow):
         if self.worker and self.worker.isRunning():
             self.worker.terminate()
             self.worker.wait()
+        self.supabase.close()
         event.accept()
     
     def get_stylesheet(self):
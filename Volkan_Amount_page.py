@@ -4,17 +4,33 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
                             QTableWidgetItem, QPushButton, QLabel, QComboBox, 
                             QHeaderView, QFrame, QLineEdit, QDateEdit)
 from PyQt5.QtCore import QDate, Qt, pyqtSignal
-from database_manager import DatabaseManager
+from database_manager import DatabaseManager, PAGE_COLUMNS
+from change_feed import get_change_feed
+
+# Yenilemede bundan fazla değişiklik birikmişse tablo baştan yüklenir
+DELTA_LIMIT = 1000
 
 class VolkanAmountPageWidget(QWidget):
     back_to_main = pyqtSignal()
     balance_updated = pyqtSignal(float)
     
-    def __init__(self):
+    def __init__(self, db=None):
         super().__init__()
-        self.db = DatabaseManager()
+        self.db = db or DatabaseManager.instance()
+        # Detay tablosu sayfa ilk açıldığında yüklenir (bkz. showEvent);
+        # ana ekrandaki bakiye DatabaseManager.get_account_balances ile gelir
+        self.transactions_loaded = False
+        # Tabloda gösterilen (başlangıç, bitiş, tür) filtresi ve o yüklemedeki değişiklik akışı imleci (xid, id);
+        # yenilemede filtre aynıysa sadece bu imleçten sonraki değişiklikler istenir
+        self.loaded_filter = None
+        self.change_cursor = None
         self.setupUi()
-        self.load_volkan_amount_transactions()
+        get_change_feed().changed.connect(self.on_remote_change)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.transactions_loaded:
+            self.load_volkan_amount_transactions()
 
     def setupUi(self):
         main_layout = QVBoxLayout(self)
@@ -166,9 +182,18 @@ class VolkanAmountPageWidget(QWidget):
             }
             QPushButton:hover { background-color: #e05555; }
         """)
-        delete_btn.clicked.connect(lambda _, r=row: self.delete_transaction(r))
+        # Satırlar sıralanıp eklenip silindiği için satır numarası değil ID saklanır
+        delete_btn.clicked.connect(lambda _, i=data.get('id'): self.delete_transaction(self.find_row(i)))
         self.table.setCellWidget(row, 6, delete_btn)
 
+    def find_row(self, transaction_id):
+        """ID'si verilen işlemin tablodaki satırı; yoksa -1"""
+        for row in range(self.table.rowCount()):
+            item = self.table.item(row, 6)
+            if item and item.text() == str(transaction_id):
+                return row
+        return -1
+
     def delete_transaction(self, row):
         # Kullanıcıdan onay al
         reply = QtWidgets.QMessageBox.question(
@@ -203,51 +228,110 @@ class VolkanAmountPageWidget(QWidget):
                 QtWidgets.QMessageBox.critical(self, "Hata", f"Bir hata oluştu:\n{str(e)}")
 
     def load_volkan_amount_transactions(self):
+        start_date = self.start_date.date().toString("yyyy-MM-dd")
+        end_date = self.end_date.date().toString("yyyy-MM-dd")
+        transaction_type = {"Gider": "expense", "Gelir": "income"}.get(
+            self.transaction_type_combo.currentText())
+        selected_filter = (start_date, end_date, transaction_type)
+        # Özet detay tablosunu beklemeden ayrı bir küçük istekle gelir
+        self.update_summary(selected_filter)
+
+        # Filtre değişmediyse sadece son yüklemeden bu yana değişen işlemler istenir
+        if self.transactions_loaded and selected_filter == self.loaded_filter and self.change_cursor is not None:
+            self.db.submit("get_changes", self.change_cursor, limit=DELTA_LIMIT, table="transactions",
+                           columns=["id", "xid", "op", "row_id", "row"],
+                           on_result=self.apply_delta, on_error=self.on_load_failed,
+                           key=(id(self), "load"))
+            return
+
+        # Önce değişiklik akışının imleci alınır; sonraki yenilemeler bu imleçten devam eder.
+        # Kayıt okunamazsa (change_log yoksa) her yenileme tam yükleme olur
+        self.db.submit("get_change_cursor",
+                       on_result=lambda cursor: self.load_all_transactions(selected_filter, cursor),
+                       on_error=lambda error: self.load_all_transactions(selected_filter, None),
+                       key=(id(self), "load"))
+
+    def load_all_transactions(self, selected_filter, change_cursor):
+        start_date, end_date, transaction_type = selected_filter
+        # Hesap ve tür filtresi sunucuda uygulanır, tek istekte gelir + gider gelir.
+        # İstek thread havuzunda çalışır; sonuç show_transactions'a gelir
+        self.db.submit("get_account_transactions", 'Volkan Amount', start_date, end_date, type=transaction_type,
+                       columns=PAGE_COLUMNS["account"],
+                       on_result=lambda transactions: self.show_transactions(transactions, selected_filter, change_cursor),
+                       on_error=self.on_load_failed,
+                       key=(id(self), "load"))
+
+    def show_transactions(self, transactions, selected_filter=None, change_cursor=None):
+        self.table.setRowCount(0)
+
+        for transaction in transactions:
+            if transaction['type'] == "expense":
+                self.add_row_to_table(transaction, "Gider", "#ff6b6b")
+            else:
+                self.add_row_to_table(transaction, "Gelir", "#51cf66")
+        
+        self.table.sortItems(0, Qt.DescendingOrder)
+        self.transactions_loaded = True
+        self.loaded_filter = selected_filter
+        self.change_cursor = change_cursor
+
+    def apply_delta(self, changes):
+        """Son yüklemeden bu yana değişen işlemleri tabloya satır satır uygular"""
+        if len(changes) == DELTA_LIMIT:
+            # Çok fazla değişiklik birikmiş; baştan yüklemek daha ucuz
+            self.change_cursor = None
+            self.load_volkan_amount_transactions()
+            return
+        for change in changes:
+            self.apply_change(change)
+            self.change_cursor = (change["xid"], change["id"])
+        self.table.sortItems(0, Qt.DescendingOrder)
+        self.update_summary()
+
+    def apply_change(self, change):
+        """Tek bir değişikliği uygular: satır eklenir, güncellenir ya da silinir"""
+        data = change["row"]
+        start_date, end_date, transaction_type = self.loaded_filter
+        belongs = (change["op"] != "DELETE" and data.get('odeme_turu') == 'Volkan Amount' and data.get('aktif', True)
+                   and start_date <= data['tarih'][:10] <= end_date
+                   and transaction_type in (None, data['type']))
+
+        row = self.find_row(change["row_id"])
+        if row >= 0:
+            self.table.removeRow(row)
+        if belongs:
+            if data['type'] == "expense":
+                self.add_row_to_table(data, "Gider", "#ff6b6b")
+            else:
+                self.add_row_to_table(data, "Gelir", "#51cf66")
+
+    def on_remote_change(self, change):
+        """Değişiklik akışından gelen işlemi tabloya uygular (tablo baştan yüklenmez)"""
+        if change["tbl"] != "transactions" or not self.transactions_loaded:
+            return
         try:
-            start_date = self.start_date.date().toString("yyyy-MM-dd")
-            end_date = self.end_date.date().toString("yyyy-MM-dd")
-            transaction_type = self.transaction_type_combo.currentText()
-            
-            expenses = []
-            incomes = []
-            
-            if transaction_type in ["Tümü", "Gider"]:
-                all_expenses = self.db.get_expenses_by_date_range(start_date, end_date)
-                expenses = [exp for exp in all_expenses if exp['odeme_turu'] == 'Volkan Amount']
-            
-            if transaction_type in ["Tümü", "Gelir"]:
-                all_incomes = self.db.get_incomes_by_date_range(start_date, end_date)
-                incomes = [inc for inc in all_incomes if inc.get('odeme_turu') == 'Volkan Amount']
-            
-            self.table.setRowCount(0)
-            
-            for expense in expenses:
-                self.add_row_to_table(expense, "Gider", "#ff6b6b")
-            
-            for income in incomes:
-                self.add_row_to_table(income, "Gelir", "#51cf66")
-            
+            self.apply_change(change)
             self.table.sortItems(0, Qt.DescendingOrder)
             self.update_summary()
-            
         except Exception as e:
-            print(f"Hata: {str(e)}")
-            QtWidgets.QMessageBox.critical(self, "Hata", f"Veri yüklenirken hata oluştu:\n{str(e)}")
+            print(f"Değişiklik uygulanamadı: {e}")
 
-    def update_summary(self):
-        total_expense = 0
-        total_income = 0
-        
-        for row in range(self.table.rowCount()):
-            transaction_type = self.table.item(row, 3).text()
-            amount = float(self.table.item(row, 5).text().replace('₺', '').replace(',', '.'))
-            
-            if transaction_type == "Gider":
-                total_expense += amount
-            elif transaction_type == "Gelir":
-                total_income += amount
-        
-        net_amount = total_income - total_expense
+    def on_load_failed(self, error):
+        print(f"Hata: {error}")
+        QtWidgets.QMessageBox.critical(self, "Hata", f"Veri yüklenirken hata oluştu:\n{error}")
+
+    def update_summary(self, selected_filter=None):
+        """Gelir/gider toplamlarını sunucudaki transaction_summary'den alır (tablodaki satırlar gezilmez)"""
+        start_date, end_date, transaction_type = selected_filter or self.loaded_filter
+        self.db.submit("get_account_summary", 'Volkan Amount', start_date, end_date, type=transaction_type,
+                       on_result=self.show_summary,
+                       on_error=lambda error: print(f"Hesap özeti alınamadı: {error}"),
+                       key=(id(self), "summary"))
+
+    def show_summary(self, summary):
+        total_expense = summary["expense"]
+        total_income = summary["income"]
+        net_amount = summary["net"]
         
         self.total_expense_label.setText(f"Toplam Gider: ₺{total_expense:.2f}")
         self.total_income_label.setText(f"Toplam Gelir: ₺{total_income:.2f}")
@@ -10,7 +10,7 @@ from database_manager import DatabaseManager
 
 class AuthorizationManager:
     def __init__(self):
-        self.db = DatabaseManager()
+        self.db = DatabaseManager.instance()
         
     def verify_user(self, username, password):
         """Kullanıcı doğrulama"""
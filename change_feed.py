@@ -0,0 +1,102 @@
+# change_feed.py
+"""
+Başka istemcilerin yaptığı değişiklikleri açık sayfalara satır satır ileten akış.
+
+Sunucudaki tetikleyiciler her insert/update/delete'i change_log tablosuna yazar
+(bkz. migrations/0006_change_log.sql). ChangeFeed bu tabloyu kısa aralıklarla, sadece son
+görülen (xid, id) imlecinden sonrasını isteyerek okur. Kayıtlar commit sırasıyla gelir; id'leri
+ters sırada commit olan transaction'ların kayıtları atlanmaz (bkz. 0016_change_log_commit_order.sql).
+Her kayıt için önbelleği ve yerel kopyayı günceller, ardından `changed` sinyalini yayınlar.
+Sayfalar sinyali kendi tablolarına uygular; tabloyu baştan yüklemez:
+
+    get_change_feed().changed.connect(self.on_remote_change)
+
+    def on_remote_change(self, change):
+        # change: {"id", "xid", "tbl", "op": INSERT/UPDATE/DELETE, "row_id", "row", "old_row"}
+        ...
+
+İstekler db_tasks thread havuzunda çalışır; sinyal GUI thread'inde gelir.
+"""
+import logging
+import os
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from database_manager import DatabaseManager
+from db_tasks import PRIORITY_LOW
+
+# Sorgulama aralığı (ms); hata durumunda MAX_INTERVAL_MS'e kadar ikiye katlanır
+INTERVAL_MS = int(os.getenv("CHANGE_FEED_INTERVAL_MS", "500"))
+MAX_INTERVAL_MS = 30000
+BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeFeed(QObject):
+    changed = pyqtSignal(object)
+
+    def __init__(self, db, interval_ms=INTERVAL_MS, batch_size=BATCH_SIZE):
+        super().__init__()
+        self.db = db
+        self.interval_ms = interval_ms
+        self.batch_size = batch_size
+        self.cursor = None
+        self.polling = False
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.poll)
+
+    def start(self):
+        if self.interval_ms > 0 and not self.timer.isActive():
+            self.timer.start()
+            self.poll()
+
+    def stop(self):
+        self.timer.stop()
+
+    def poll(self):
+        """Yeni değişiklikleri ister; önceki istek bitmediyse bekler"""
+        if self.polling:
+            return
+        self.polling = True
+        if self.cursor is None:
+            # Açılışta geçmiş değişiklikler uygulanmaz; akış şu andan başlar
+            self.db.submit("get_change_cursor", priority=PRIORITY_LOW,
+                           on_result=self.on_started, on_error=self.on_poll_failed)
+        else:
+            self.db.submit("get_changes", self.cursor, limit=self.batch_size, priority=PRIORITY_LOW,
+                           on_result=self.dispatch, on_error=self.on_poll_failed)
+
+    def on_started(self, cursor):
+        self.polling = False
+        self.cursor = cursor
+        self.timer.setInterval(self.interval_ms)
+
+    def dispatch(self, changes):
+        self.polling = False
+        self.timer.setInterval(self.interval_ms)
+        for change in changes:
+            self.cursor = (change["xid"], change["id"])
+            self.db.apply_change(change)
+            self.changed.emit(change)
+        # Birikmiş değişiklik varsa beklemeden devam et
+        if len(changes) == self.batch_size:
+            self.poll()
+
+    def on_poll_failed(self, error):
+        self.polling = False
+        interval = min(self.timer.interval() * 2, MAX_INTERVAL_MS)
+        self.timer.setInterval(interval)
+        logger.warning(f"Değişiklik akışı okunamadı, {interval} ms sonra tekrar denenecek: {error}")
+
+
+_feed = None
+
+
+def get_change_feed():
+    """Süreç genelinde paylaşılan ChangeFeed (GUI thread'inden çağrılmalı)"""
+    global _feed
+    if _feed is None:
+        _feed = ChangeFeed(DatabaseManager.instance())
+    return _feed
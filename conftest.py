@@ -0,0 +1,52 @@
+# conftest.py
+import os
+import sys
+import types
+
+import pytest
+
+from local_supabase import LocalSupabase
+
+# supabase_client import edildiği anda .env'deki projeye bağlanır.
+# Testler gerçek veritabanı yerine bellek içi LocalSupabase istemcisini kullanır.
+if "supabase_client" not in sys.modules:
+    _client_module = types.ModuleType("supabase_client")
+    _client_module.supabase = LocalSupabase()
+    sys.modules["supabase_client"] = _client_module
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture
+def local_db():
+    """Her test için boş bir LocalSupabase, boş önbellek ve metriklerle çalışan DatabaseManager"""
+    from database_manager import DatabaseManager
+    from query_cache import QueryCache
+    from db_metrics import DbMetrics
+    from db_retry import CircuitBreaker
+
+    db = DatabaseManager()
+    db.supabase = LocalSupabase()
+    db.cache = QueryCache()
+    db.metrics = DbMetrics()
+    db.breaker = CircuitBreaker("Supabase")
+    return db
+
+
+@pytest.fixture
+def pg_conn():
+    """TEST_DATABASE_URL'deki yerel Postgres'e bağlantı; test sonunda her şey geri alınır.
+
+    Değişken tanımlı değilse ya da psycopg kurulu değilse test atlanır.
+    """
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL tanımlı değil")
+    psycopg = pytest.importorskip("psycopg")
+
+    conn = psycopg.connect(url)
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+        conn.close()
@@ -8,13 +8,15 @@ from PyQt5.QtCore import Qt, QTimer, QDateTime
 from PyQt5.QtGui import QFont, QPalette, QColor, QIcon
 from datetime import datetime
 import random
-from database_manager import DatabaseManager
+from database_manager import DatabaseManager, PAGE_COLUMNS
+from write_journal import QueuedWrite
+from queued_rows import JournalWatcher
+from change_feed import get_change_feed
 import logging
 
 class OrderDialog(QDialog):
     def __init__(self, parent=None, order_data=None):
         super().__init__(parent)
-        self.db = DatabaseManager()
         self.order_data = order_data
         self.initUI()
         if order_data:
@@ -117,21 +119,8 @@ class OrderDialog(QDialog):
         product_code = self.order_no_edit.text()
         quantity = self.quantity_spin.value()
         
-        # Stok kontrolü yap
-        stock_item = self.db.get_stock_item_by_code(product_code)
-        if stock_item is None:
-            QMessageBox.warning(self, "Uyarı", "Bu ürün kodu stokta bulunamadı!")
-            return None
-            
-        stock_quantity = stock_item['miktar']
-        real_stock_quantity = stock_item.get('gercek_stok', stock_quantity)
-        
-        if quantity > stock_quantity:
-            reply = QMessageBox.question(self, "Stok Uyarısı",
-                                    f"Stokta yeterli ürün yok! Mevcut stok: {stock_quantity}\nYine de sipariş eklemek istiyor musunuz?",
-                                    QMessageBox.Yes | QMessageBox.No)
-            if reply == QMessageBox.No:
-                return None
+        # Stok kontrolü ayrıca yapılmaz: add_daily_order stoğu sunucuda tek işlemde kontrol edip düşer,
+        # ürün yoksa ya da stok yetersizse hata mesajı döner
         
         # Gerçek sipariş mi sorusu
         reply = QMessageBox.question(self, "Sipariş Türü",
@@ -151,18 +140,33 @@ class OrderDialog(QDialog):
             'product_name': self.product_combo.currentText(),
             'quantity': quantity,
             'unit_price': self.price_spin.value(),
-            'is_real_order': is_real_order,
-            'current_stock': stock_quantity,
-            'current_real_stock': real_stock_quantity
+            'is_real_order': is_real_order
         }
 
 class DailyOrdersWidget(QWidget):
-    def __init__(self):
+    def __init__(self, db=None):
         super().__init__()
-        self.db = DatabaseManager()
+        self.db = db or DatabaseManager.instance()
         self.orders_data = []
+        # Günlükte sırada bekleyen siparişler: QueuedWrite.seq -> sonuç gönderilince bildirilsin mi
+        self.queued_orders = {}
         self.initUI()
         self.load_orders_from_db()
+        get_change_feed().changed.connect(self.on_remote_change)
+        # Sıradaki siparişler arka planda gönderilir; sonuçları burada gösterilir
+        self.journal_watcher = JournalWatcher(self.db.journal, self, self.on_queued_write_sent)
+
+    def on_queued_write_sent(self, seq, result, error):
+        if seq not in self.queued_orders:
+            return
+        announce = self.queued_orders.pop(seq)
+        if error is not None:
+            QMessageBox.warning(self, "Hata", f"Sıradaki sipariş sunucu tarafından reddedildi:\n{error}")
+            return
+        self.load_orders_from_db()
+        if announce:
+            QMessageBox.information(self, "Başarılı",
+                                    f"Sipariş başarıyla eklendi!\nKalan stok: {result['stock']['miktar']}")
         
     def initUI(self):
         main_layout = QVBoxLayout()
@@ -513,61 +517,101 @@ class DailyOrdersWidget(QWidget):
             }
         """)
         
-    def load_orders_from_db(self):
-        """Veritabanından sipariş verilerini yükle"""
+    def load_orders_from_db(self, message=None):
+        """Veritabanından sipariş verilerini arka planda yükle; gelince tabloyu güncelle"""
+        self.db.submit("get_today_orders", columns=PAGE_COLUMNS["daily_orders"],
+                       on_result=lambda result: self.on_orders_loaded(result, message),
+                       on_error=self.on_orders_load_failed,
+                       key=(id(self), "load"))
+
+    def on_orders_loaded(self, result, message=None):
+        self.orders_data = result
+        self.update_table()
+        if message:
+            QMessageBox.information(self, "Başarılı", message)
+
+    def on_remote_change(self, change):
+        """Değişiklik akışından gelen siparişi tabloya uygular (tablo baştan yüklenmez)"""
+        if change["tbl"] != "daily_orders":
+            return
         try:
-            result = self.db.get_today_orders()
-            if result is None:
-                raise Exception("Veritabanı bağlantı hatası")
-                
-            self.orders_data = result
-            self.update_table()
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Hata", f"Veritabanından veri yüklenemedi:\n{str(e)}")
-            logging.exception("Veritabanı yükleme hatası")
-            self.orders_data = []
+            order = change["row"]
+            today = datetime.now().date().isoformat()
+            belongs = change["op"] != "DELETE" and str(order.get('order_date', ''))[:10] == today
+            index = next((i for i, o in enumerate(self.orders_data) if o.get('id') == change["row_id"]), -1)
+
+            if index >= 0 and belongs:
+                self.orders_data[index] = order
+                self.set_table_row(index, order)
+            elif index >= 0:
+                del self.orders_data[index]
+                self.orders_table.removeRow(index)
+                # Sonraki satırların sıra numaraları kayar
+                for row in range(index, len(self.orders_data)):
+                    self.set_table_row(row, self.orders_data[row])
+            elif belongs:
+                self.orders_data.append(order)
+                self.orders_table.insertRow(len(self.orders_data) - 1)
+                self.set_table_row(len(self.orders_data) - 1, order)
+            else:
+                return
+            self.update_summary()
+        except Exception:
+            logging.exception("Sipariş değişikliği uygulanamadı")
+
+    def on_orders_load_failed(self, error):
+        QMessageBox.critical(self, "Hata", f"Veritabanından veri yüklenemedi:\n{error}")
+        logging.error(f"Veritabanı yükleme hatası: {error}")
+        self.orders_data = []
         
     def update_table(self):
         """Tabloyu güncelle"""
         try:
             self.orders_table.setRowCount(len(self.orders_data))
-            
-            total_amount = 0
             for row, order in enumerate(self.orders_data):
-                # Satır numarasını ekle (ilk sütun)
-                row_number_item = QTableWidgetItem(str(row + 1))
-                row_number_item.setTextAlignment(Qt.AlignCenter)
-                row_number_item.setForeground(QColor("white"))
-                row_number_item.setFont(QFont("Arial", 12, QFont.Bold))
-                self.orders_table.setItem(row, 0, row_number_item)
-                
-                # Diğer sütunları ekle - Veritabanı formatına göre
-                columns = [
-                    order.get('product_code', ''),
-                    order.get('customer_name', ''),
-                    order.get('product_name', ''),
-                    str(order.get('quantity', 0)),
-                    f"{float(order.get('unit_price', 0)):.2f}",
-                    f"{float(order.get('total_amount', 0)):.2f}"
-                ]
-                
-                for col, value in enumerate(columns):
-                    item = QTableWidgetItem(str(value))
-                    item.setTextAlignment(Qt.AlignCenter)
-                    item.setForeground(QColor("white"))
-                    self.orders_table.setItem(row, col + 1, item)
-                    
-                # Toplam tutarı hesapla
-                total_amount += float(order.get('total_amount', 0))
-            
-            # Özet bilgileri güncelle
-            self.total_orders_label.setText(f"{len(self.orders_data)}")
-            self.total_amount_label.setText(f"{total_amount:.2f} TL")
+                self.set_table_row(row, order)
+            self.update_summary()
             
         except Exception as e:
             QMessageBox.critical(self, "Hata", f"Tablo güncellenirken hata oluştu:\n{str(e)}")
             logging.exception("Tablo güncelleme hatası")
+
+    def set_table_row(self, row, order):
+        """Tablodaki tek bir satırı siparişle doldurur"""
+        # Satır numarasını ekle (ilk sütun)
+        row_number_item = QTableWidgetItem(str(row + 1))
+        row_number_item.setTextAlignment(Qt.AlignCenter)
+        row_number_item.setForeground(QColor("white"))
+        row_number_item.setFont(QFont("Arial", 12, QFont.Bold))
+        self.orders_table.setItem(row, 0, row_number_item)
+        
+        # Diğer sütunları ekle - Veritabanı formatına göre
+        columns = [
+            order.get('product_code', ''),
+            order.get('customer_name', ''),
+            order.get('product_name', ''),
+            str(order.get('quantity', 0)),
+            f"{float(order.get('unit_price', 0)):.2f}",
+            f"{float(order.get('total_amount', 0)):.2f}"
+        ]
+        
+        for col, value in enumerate(columns):
+            item = QTableWidgetItem(str(value))
+            item.setTextAlignment(Qt.AlignCenter)
+            item.setForeground(QColor("white"))
+            self.orders_table.setItem(row, col + 1, item)
+
+    def update_summary(self):
+        """Bugünün sipariş sayısı ve toplam tutarını sunucudaki daily_orders_summary'den alır"""
+        today = datetime.now().date().isoformat()
+        self.db.submit("get_daily_orders_summary", today, on_result=self.show_summary,
+                       on_error=lambda error: logging.error(f"Sipariş özeti alınamadı: {error}"),
+                       key=(id(self), "summary"))
+
+    def show_summary(self, summary):
+        """Sipariş sayısı ve toplam tutar etiketlerini günceller"""
+        self.total_orders_label.setText(f"{summary['total_orders']}")
+        self.total_amount_label.setText(f"{summary['total_amount']:.2f} TL")
         
     def add_order(self):
         """Yeni sipariş ekle"""
@@ -610,9 +654,18 @@ class DailyOrdersWidget(QWidget):
                     is_real_order=order_data['is_real_order']
                 )
                 
-                if result:
+                if isinstance(result, QueuedWrite):
+                    # Sipariş günlükte sırada; stok kontrolü gönderimde yapılır ve sonuç on_queued_write_sent'te
+                    # gösterilir. Sunucuya ulaşılamıyorsa bu hemen söylenir, gönderilince ayrıca pencere açılmaz
+                    offline = self.db.breaker.is_open
+                    self.queued_orders[result.seq] = not offline
+                    if offline:
+                        QMessageBox.information(self, "Sıraya Alındı",
+                                                "Sunucuya ulaşılamadı. Sipariş kaydedildi ve bağlantı gelince gönderilecek.")
+                elif result:
                     self.load_orders_from_db()
-                    QMessageBox.information(self, "Başarılı", "Sipariş başarıyla eklendi!")
+                    QMessageBox.information(self, "Başarılı",
+                                            f"Sipariş başarıyla eklendi!\nKalan stok: {result['stock']['miktar']}")
                 else:
                     QMessageBox.critical(self, "Hata", "Sipariş eklenirken bir hata oluştu!")
                     
@@ -670,7 +723,10 @@ class DailyOrdersWidget(QWidget):
                 )
                 
                 if result:
-                    self.load_orders_from_db()
+                    # PATCH güncel satırı döndürür; tabloyu yeniden yüklemeden sadece o satır yenilenir
+                    self.orders_data[current_row] = {**order_data, **result}
+                    self.set_table_row(current_row, self.orders_data[current_row])
+                    self.update_summary()
                     QMessageBox.information(self, "Başarılı", "Sipariş başarıyla güncellendi!")
                 else:
                     QMessageBox.critical(self, "Hata", "Sipariş güncellenirken bir hata oluştu!")
@@ -709,8 +765,7 @@ class DailyOrdersWidget(QWidget):
     def refresh_data(self):
         """Veri yenileme fonksiyonu"""
         try:
-            self.load_orders_from_db()
-            QMessageBox.information(self, "Başarılı", "Veriler yenilendi!")
+            self.load_orders_from_db("Veriler yenilendi!")
         except Exception as e:
             QMessageBox.critical(self, "Hata", f"Veriler yenilenirken hata oluştu:\n{str(e)}")
             logging.exception("Veri yenileme hatası")
@@ -1,10 +1,160 @@
 # GÜNCELLENMİŞ database_manager.py (income + expense + daily_orders için)
 from supabase_client import supabase
+from query_cache import query_cache
+from db_metrics import db_metrics
+from local_replica import LocalReplica
+from json_stream import iter_json_array, batched
+from db_tasks import get_runner, PRIORITY_NORMAL, PRIORITY_HIGH
+from db_retry import write_retry, read_retry, supabase_breaker, deadline, OFFLINE_ERRORS
+from write_journal import WriteJournal, QueuedWrite
 from datetime import datetime
 import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
 import bcrypt
+from postgrest.exceptions import APIError
+import numpy as np
+import pandas as pd
+
+# Sayfaların tablolarında gerçekten gösterdiği sütunlar. Okuma fonksiyonlarına
+# columns= olarak verilir; böylece "*" yerine sadece bu sütunlar indirilir.
+PAGE_COLUMNS = {
+    "account": ["id", "type", "tarih", "aciklama", "para_birimi", "miktar", "tl_karsiligi"],
+    "income": ["id", "tarih", "aciklama", "para_birimi", "miktar", "odeme_turu", "usd_kuru", "tl_karsiligi"],
+    "expense": ["id", "tarih", "aciklama", "para_birimi", "miktar", "odeme_turu", "usd_kuru", "tl_karsiligi"],
+    "stock": ["id", "urun_kodu", "urun_adi", "miktar", "gercek_stok", "birim_fiyat"],
+    "daily_orders": ["id", "product_code", "customer_name", "product_name", "quantity",
+                     "unit_price", "total_amount", "is_real_order"],
+    "contacts": ["id", "name", "phone", "description"],
+    "passwords": ["id", "platform", "username", "password", "description"],
+    "imports": ["id", "urun_adi", "miktar", "tarih", "durum", "alt_durum", "notlar"],
+}
+
+# dashboard_bootstrap'in döndürdüğü change_horizon'un önbellek anahtarı (bkz. get_change_cursor)
+CHANGE_HORIZON_KEY = ("change_log", "horizon")
+
+# Toplu bir okumanın (begin_dashboard_bootstrap) bıraktığı süren okumaların sonucu; bekleyen okuma kendisi yapılır
+_ABANDONED = object()
+
+# Akışlı okumalarda (iter_* metotları) sayfaya bir seferde aktarılan satır sayısı
+STREAM_BATCH_SIZE = 200
+
+# get_transaction_summary'de gruplanabilecek sütunlar (bkz. migrations/0010_summaries.sql)
+SUMMARY_GROUPS = ("tarih", "odeme_turu", "para_birimi", "type")
+
+# Sürüm çakışmasında (_update_versioned) yeniden okuyup tekrar deneme sayısı
+VERSIONED_UPDATE_ATTEMPTS = 5
+
+# add_transactions_bulk her istekte en fazla bu kadar satır gönderir
+BULK_INSERT_CHUNK_SIZE = 500
+
+# Bir çağrının tüm denemeleriyle birlikte sürebileceği en uzun süre (saniye, bkz. db_retry.deadline)
+DEFAULT_DEADLINE = float(os.getenv("SUPABASE_DEADLINE", "8"))
+CALL_DEADLINES = {
+    "load_dashboard_bootstrap": 20.0,
+    "add_transactions_bulk": 60.0,
+    "get_changes": 4.0,
+    "get_change_cursor": 4.0,
+}
+
+
+def _to_number(values):
+    """Sayı sütununu float'a çevirir; "1.234,56" gibi Türkçe biçimi de tanır. Geçersizler NaN olur."""
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.to_numeric(values, errors="coerce").astype(float)
+    text = values.astype(str).str.strip().str.replace(" ", "", regex=False)
+    has_comma = text.str.contains(",", regex=False)
+    text = text.where(~has_comma, text.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(text, errors="coerce").astype(float)
+
+
+def _to_iso_date(values):
+    """Tarih sütununu "YYYY-MM-DD" metnine çevirir (gg.aa.yyyy ve yyyy-aa-gg kabul edilir). Geçersizler NaN olur."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = values
+    else:
+        text = values.astype(str).str.strip().str[:10]
+        parsed = pd.to_datetime(text, format="%d.%m.%Y", errors="coerce")
+        parsed = parsed.fillna(pd.to_datetime(text, format="%Y-%m-%d", errors="coerce"))
+    return parsed.dt.strftime("%Y-%m-%d")
+
+
+class ConflictError(Exception):
+    """Güncellenen alanı başka bir istemci de farklı bir değere değiştirmiş (bkz. _update_versioned)"""
+
+
+class UnitOfWork:
+    """Birden çok tablodaki ekleme/güncelleme/silmeleri toplayıp tek çağrıda, tek transaction'da uygular.
+
+        with db.unit_of_work() as uow:
+            uow.update("transactions", {"aktif": False}, id=eski_id)
+            uow.insert("transactions", yeni_satir)
+        uow.results  # her işlemin etkilediği satırlar, ekleme sırasıyla
+
+    İşlemler commit'e kadar sadece biriktirilir; commit hepsini commit_unit_of_work RPC'siyle
+    gönderir (bkz. migrations/0013_commit_unit_of_work.sql). Biri başarısız olursa hiçbiri
+    uygulanmaz. update/delete hiçbir satırla eşleşmezse (ör. match'te verilen version
+    değişmişse) ConflictError fırlatılır; optional=True bu kontrolü kapatır.
+    """
+
+    def __init__(self, db, operation):
+        self.db = db
+        self.operation = operation
+        self.operations = []
+        self.results = None
+
+    def insert(self, table, values, on_conflict=None):
+        """values'ı ekler; on_conflict verilirse o sütunda çakışan satırı günceller (upsert)"""
+        self.operations.append({"op": "insert", "table": table, "values": values, "on_conflict": on_conflict})
+        return self
+
+    def update(self, table, values, optional=False, **match):
+        self.operations.append({"op": "update", "table": table, "values": values, "match": match,
+                                "optional": optional})
+        return self
+
+    def delete(self, table, optional=False, **match):
+        self.operations.append({"op": "delete", "table": table, "match": match, "optional": optional})
+        return self
+
+    def commit(self):
+        """Biriken işlemleri tek istekte uygular; işlem başına etkilenen satırları döndürür"""
+        if self.results is not None:
+            raise RuntimeError("UnitOfWork zaten uygulandı")
+        self.results = self.db._commit_unit_of_work(self.operations, self.operation) if self.operations else []
+        return self.results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Blok hata ile biterse hiçbir şey gönderilmez
+        if exc_type is None and self.results is None:
+            self.commit()
+        return False
+
 
 class DatabaseManager:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        """Süreç genelinde paylaşılan DatabaseManager örneği.
+
+        Sayfalar ve yardımcı sınıflar kendi örneklerini oluşturmak yerine bunu kullanır;
+        böylece HTTP bağlantı havuzu ve önbellek tek bir yerde tutulur.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+                cls._instance.replica = LocalReplica.from_env(cls._instance.supabase)
+                cls._instance.journal = WriteJournal.from_env(cls._instance)
+            return cls._instance
+
     def __init__(self):
         self.supabase = supabase
         self.table_name = "transactions"
@@ -14,6 +164,23 @@ class DatabaseManager:
         self.passwords_table = "passwords"
         self.users_table = "users"
         self.version_control_table = "version_control"
+        # Tüm DatabaseManager örnekleri aynı önbelleği paylaşır (bkz. query_cache.py)
+        self.cache = query_cache
+        # Her Supabase çağrısının süresi ve boyutu buraya kaydedilir (bkz. db_metrics.py)
+        self.metrics = db_metrics
+        # İsteğe bağlı yerel SQLite kopyası (bkz. local_replica.py); instance() ortamdan açar
+        self.replica = None
+        # Süren okumalar: anahtar -> (tablo, Future). Aynı anda gelen aynı istekler tek çağrıyı paylaşır
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self.coalesced = 0
+        # Tekrarı güvenli yazmaların (idempotency_key'li eklemeler) ve okumaların yeniden deneme politikaları
+        self.write_retry = write_retry
+        self.read_retry = read_retry
+        # Sunucuya ulaşılamadığında çağrıları hemen reddeden devre; arayüz durumunu buradan izler (bkz. db_retry.py)
+        self.breaker = supabase_breaker
+        # İsteğe bağlı yazma günlüğü (bkz. write_journal.py); instance() ortamdan açar
+        self.journal = None
         
         self.logger = logging.getLogger(__name__)
 
@@ -23,6 +190,389 @@ class DatabaseManager:
         self.logger.error(error_msg, exc_info=True)
         raise Exception(error_msg)  # Hata yukarıya fırlatılıyor
 
+    def _projection(self, columns):
+        """select() için sütun listesini PostgREST formatına çevirir (None -> "*")"""
+        if not columns:
+            return "*"
+        if isinstance(columns, str):
+            return columns
+        return ",".join(columns)
+
+    def _read(self, table, columns=None, filters=(), order=(), limit=None, cache=True, *, operation):
+        """Önbellekten okur; yoksa sorguyu çalıştırıp sonucu önbelleğe koyar.
+
+        filters: (operatör, sütun, değer) demetleri; operatör postgrest metodunun adıdır
+                 (eq, neq, gte, lte, lt, in_, ilike). ("or_", None, ifade) or= filtresidir.
+        order: (sütun, desc) demetleri
+        cache=False ise önbellek ve yerel kopya atlanır (yazmadan önce güncel değer gereken okumalar)
+        operation: okumayı yapan metodun adı (metriklerde ve CALL_DEADLINES'ta kullanılır)
+        """
+        key, filters = self._read_key(table, columns, filters, order, limit)
+        projection = key[2]
+
+        if cache and self.replica is not None:
+            rows = self.replica.query(table, projection, filters, order, limit)
+            if rows is not None:
+                return rows
+
+        def _fetch():
+            return self._execute_retrying(lambda: self._select_query(table, projection, filters, order, limit),
+                                          hedge=False, policy=self.read_retry, operation=operation).data or []
+
+        hit, data = self.cache.get(key) if cache else (False, None)
+        if not hit:
+            data = self._single_flight(key, table, _fetch, filters) if cache else _fetch()
+        # Çağıranların önbellekteki satırları değiştirmemesi için kopya döner
+        return [dict(row) for row in data]
+
+    def _select_query(self, table, projection, filters=(), order=(), limit=None, head=False):
+        """_read filtre/sıra demetlerinden postgrest sorgusunu kurar (head=True: satırsız, sadece sayı)"""
+        if head:
+            query = self.supabase.table(table).select(projection, count="exact", head=True)
+        else:
+            query = self.supabase.table(table).select(projection)
+        for op, column, value in filters:
+            query = query.or_(value) if op == "or_" else getattr(query, op)(column, value)
+        for column, desc in order:
+            query = query.order(column, desc=desc)
+        if limit:
+            query = query.limit(limit)
+        return query
+
+    def _stream(self, table, columns=None, filters=(), order=(), batch_size=STREAM_BATCH_SIZE, *, operation):
+        """_read'in akışlı hali: satırları batch_size'lık listeler halinde, geldikçe üretir.
+
+        Yerel kopyada ya da önbellekte varsa oradan gelir. Yoksa yanıt gövdesi okundukça
+        çözülür (json_stream.py); gövdenin ve satırların tamamı bellekte birikmez, bu yüzden
+        sonuç önbelleğe de konmaz.
+        """
+        key, filters = self._read_key(table, columns, filters, order)
+        projection = key[2]
+
+        rows = self.replica.query(table, projection, filters, order, None) if self.replica is not None else None
+        if rows is None:
+            hit, data = self.cache.get(key)
+            if not hit:
+                # Açılışta dashboard_bootstrap bu okumayı da getiriyor olabilir (bkz. _lead)
+                data = self._await_flight(key)
+            rows = [dict(row) for row in data] if data is not None else None
+        if rows is not None:
+            yield from batched(rows, batch_size)
+            return
+
+        query = self._select_query(table, projection, filters, order)
+        started = time.perf_counter()
+        received = [0]
+
+        def counted(chunks):
+            for chunk in chunks:
+                received[0] += len(chunk)
+                yield chunk
+
+        count = 0
+        self.breaker.before_call()
+        try:
+            for batch in batched(iter_json_array(counted(self._iter_body(query))), batch_size):
+                count += len(batch)
+                yield batch
+        except Exception as e:
+            self.breaker.record_failure(e)
+            self.metrics.record(operation, query, None, (time.perf_counter() - started) * 1000,
+                                error=str(e), rows=count, size=received[0])
+            raise
+        except GeneratorExit:
+            # Okuma yarıda bırakıldı; sunucu yanıt veriyordu
+            self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        self.metrics.record(operation, query, None, (time.perf_counter() - started) * 1000,
+                            rows=count, size=received[0])
+
+    def _iter_body(self, query):
+        """Sorgunun HTTP yanıt gövdesini parça parça döndürür"""
+        if hasattr(query, "iter_bytes"):
+            # LocalSupabase
+            yield from query.iter_bytes()
+            return
+        request = query.request
+        with request.session.stream(request.http_method, str(request.path), params=request.params,
+                                    headers=request.headers, auth=request.auth) as response:
+            if not response.is_success:
+                response.read()
+                raise APIError(response.json() if response.content else {"message": response.reason_phrase})
+            yield from response.iter_bytes()
+
+    def _read_key(self, table, columns=None, filters=(), order=(), limit=None):
+        """_read'in önbellek anahtarı ve demete çevrilmiş filtreleri"""
+        filters = tuple((op, column, tuple(value) if isinstance(value, list) else value)
+                        for op, column, value in filters)
+        return (table, filters, self._projection(columns), tuple(order), limit), filters
+
+    def _single_flight(self, key, table, fetch, filters=()):
+        """Aynı anahtarla süren bir okuma varsa onun sonucunu bekler; yoksa fetch() çağrısını yapar.
+
+        Sonuç önbelleğe konur ve bekleyen herkese aynı veri (ya da aynı hata) döner.
+        İstek sürerken tabloya yazılırsa (_invalidate) kayıt düşer: sonradan gelenler
+        yeni bir istek başlatır, eski sonuç önbelleğe konmaz.
+        Sunucuya ulaşılamazsa (OFFLINE_ERRORS) süresi dolmuş da olsa önbellekteki son veri döner.
+        Süren okuma bir toplu okumanınsa (_lead) ve o başarısız olursa okuma ayrıca yapılır.
+        """
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = (table, Future())
+            else:
+                self.coalesced += 1
+        future = flight[1]
+        if not leader:
+            data = future.result()
+            if data is _ABANDONED:
+                return self._single_flight(key, table, fetch, filters)
+            return data
+
+        try:
+            data = fetch()
+        except Exception as e:
+            with self._inflight_lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            hit, data = self.cache.get(key, stale=True) if isinstance(e, OFFLINE_ERRORS) else (False, None)
+            if hit:
+                self.logger.warning(f"Sunucuya ulaşılamadı, önbellekteki son veri kullanılıyor ({table}): {e}")
+                future.set_result(data)
+                return data
+            future.set_exception(e)
+            raise
+        with self._inflight_lock:
+            if self._inflight.get(key) is flight:
+                self.cache.put(key, data, table, filters)
+                del self._inflight[key]
+        future.set_result(data)
+        return data
+
+    def _lead(self, entries):
+        """entries'deki (alan, anahtar, tablo, filtreler) okumaları için süren okuma kaydı açar.
+
+        Bu okumaları yapan _single_flight çağrıları sunucuya gitmez, _land ile verilecek sonucu
+        bekler. Zaten süren okumalar atlanır. Dönüş: {anahtar: flight}
+        """
+        flights = {}
+        with self._inflight_lock:
+            for _, key, table, _ in entries:
+                if key not in self._inflight:
+                    flights[key] = self._inflight[key] = (table, Future())
+        return flights
+
+    def _land(self, flight, key, rows, table, filters):
+        """_lead ile açılmış okumanın sonucunu önbelleğe (ilk okunana kadar) koyar ve bekleyenlere verir"""
+        with self._inflight_lock:
+            if self._inflight.get(key) is flight:
+                # Bu arada tabloya yazıldıysa (_drop_inflight) sonuç önbelleğe konmaz
+                self.cache.put(key, rows, table, filters, until_read=True)
+                del self._inflight[key]
+        flight[1].set_result(rows)
+
+    def _abandon(self, flights):
+        """_lead ile açılmış, sonucu verilmemiş okumaları bırakır; bekleyenler okumayı kendileri yapar"""
+        with self._inflight_lock:
+            for key, flight in flights.items():
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+        for flight in flights.values():
+            if not flight[1].done():
+                flight[1].set_result(_ABANDONED)
+
+    def _await_flight(self, key):
+        """Anahtarla süren bir okuma varsa sonucunu bekler; yoksa, başarısız olduysa ya da bırakıldıysa None"""
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+        if flight is None:
+            return None
+        try:
+            data = flight[1].result()
+        except Exception:
+            return None
+        return None if data is _ABANDONED else data
+
+    def _search(self, function, table, columns=None, replica_filters=(), replica_order=(), *, operation, **params):
+        """migrations/0008_search.sql'deki indeksli arama fonksiyonunu çağırır; sonuç benzerliğe göre sıralı gelir.
+
+        Yerel kopya açıksa arama önce onda replica_filters (ilike) ile yapılır.
+        Sonuç önbelleğe konur; tabloya yapılan her yazma kaydı düşürür.
+        """
+        projection = self._projection(columns)
+        if self.replica is not None:
+            rows = self.replica.query(table, projection, tuple(replica_filters), replica_order, None)
+            if rows is not None:
+                return rows
+        return self._rpc_read(function, table, columns, operation=operation, **params)
+
+    def _rpc_read(self, function, table, columns=None, filters=(), *, operation, **params):
+        """Satır döndüren sunucu fonksiyonunu çağırır; sonuç table'a bağlı olarak önbelleğe konur.
+
+        filters, sonucu etkileyen satırları _read biçiminde tarif eder; verilirse tabloya
+        yapılan yazmalardan sadece bunlara uyanlar kaydı düşürür, verilmezse hepsi düşürür.
+        """
+        projection = self._projection(columns)
+        key = self._rpc_key(function, projection, params)
+        hit, rows = self.cache.get(key)
+        if not hit:
+            rows = self._single_flight(key, table, lambda: self._execute_retrying(
+                lambda: self.supabase.rpc(function, params).select(projection),
+                hedge=False, policy=self.read_retry, operation=operation).data or [], tuple(filters))
+        return [dict(row) for row in rows]
+
+    def _rpc_key(self, function, projection, params):
+        """_rpc_read'in önbellek anahtarı"""
+        return ("rpc:" + function, projection) + tuple(sorted(
+            (name, tuple(value) if isinstance(value, list) else value) for name, value in params.items()))
+
+    def _count(self, table, filters=(), *, operation):
+        """Filtreye uyan satırların sayısı; satırlar indirilmez (HEAD isteği, Content-Range'deki toplam)"""
+        key, filters = self._read_key(table, None, filters)
+        key = ("count",) + key
+        hit, count = self.cache.get(key)
+        if hit:
+            return count
+        return self._single_flight(key, table, lambda: self._execute_retrying(
+            lambda: self._select_query(table, "id", filters, head=True),
+            hedge=False, policy=self.read_retry, operation=operation).count or 0, filters)
+
+    def _execute(self, query, operation):
+        """Sorguyu çalıştırır; işlem adı, tablo, filtreler, satır sayısı, boyut ve süreyi kaydeder.
+
+        operation, çağrıyı başlatan public metodun adıdır (ör. "get_all_stock_items"); her metot
+        kendi adını açıkça verir, yardımcılar (_read, _update_versioned...) aldıklarını iletir.
+        Çağrı işlemin süre sınırıyla (CALL_DEADLINES) ve devre (self.breaker) üzerinden yapılır;
+        devre açıksa istek gönderilmeden CircuitOpenError fırlatılır.
+        """
+        started = time.perf_counter()
+        try:
+            with deadline(CALL_DEADLINES.get(operation, DEFAULT_DEADLINE)):
+                result = self.breaker.call(query.execute)
+        except Exception as e:
+            self.metrics.record(operation, query, None, (time.perf_counter() - started) * 1000, error=str(e))
+            raise
+        self.metrics.record(operation, query, result.data, (time.perf_counter() - started) * 1000)
+        return result
+
+    def _execute_retrying(self, build, hedge=True, policy=None, *, operation):
+        """build() ile kurulan sorguyu policy (varsayılan write_retry) ile çalıştırır; her denemede sorgu yeniden kurulur.
+
+        Sadece tekrarı güvenli sorgular için (okumalar, idempotency_key'li yazmalar).
+        Tüm denemeler işlemin süre sınırına sığmalıdır.
+        """
+        policy = policy or self.write_retry
+        with deadline(CALL_DEADLINES.get(operation, DEFAULT_DEADLINE)):
+            return policy.run(lambda: self._execute(build(), operation=operation), hedge=hedge)
+
+    def _write(self, method, preview=None, **args):
+        """Yazma metodunu (ör. _insert_idempotent) yazma günlüğü üzerinden çağırır.
+
+        Günlük açıksa kayıt yerel günlüğe yazılır, çağrı beklemeden preview içerikli bir QueuedWrite
+        döner ve kayıt arka planda gönderilir (bkz. write_journal.py).
+        args JSON'a çevrilebilir olmalıdır; tekrar gönderimde aynı kayıt oluşmaması için
+        idempotency_key içermelidir.
+        """
+        if self.journal is None:
+            return getattr(self, method)(**args)
+        return self.journal.submit(method, args, preview=preview)
+
+    def _insert_idempotent(self, table, data, operation):
+        """Satırı idempotency_key ile ekler; ağ hatalarında write_retry ile güvenle tekrar dener.
+
+        Ekleme on_conflict=idempotency_key ile yapılan bir upsert'tür (ignore-duplicates): önceki
+        bir deneme satırı zaten eklediyse yeni satır oluşmaz ve satır anahtarıyla okunur.
+        Dönüş: eklenen satır (bkz. migrations/0011_idempotency_keys.sql)
+        """
+        data = dict(data, idempotency_key=data.get("idempotency_key") or str(uuid.uuid4()))
+        rows = self._execute_retrying(lambda: self.supabase.table(table).upsert(
+            data, on_conflict="idempotency_key", ignore_duplicates=True), operation=operation).data
+        if not rows:
+            rows = self._execute_retrying(lambda: self._select_query(
+                table, "*", [("eq", "idempotency_key", data["idempotency_key"])]), hedge=False,
+                operation=operation).data
+        if not rows:
+            raise Exception("Veritabanına ekleme başarısız")
+        self._invalidate(table, rows)
+        return rows[0]
+
+    def _update_versioned(self, table, column, value, changes, base=None, attempts=VERSIONED_UPDATE_ATTEMPTS, *,
+                          operation):
+        """column = value satırını version sütunuyla koşullu günceller ve yeni satırı döndürür.
+
+        Satır güncel haliyle okunur, PATCH sadece okunan sürüm hâlâ geçerliyse uygulanır
+        (eq("version", v)); arada başka bir yazma olduysa satır yeniden okunup tekrar denenir.
+        base, değişikliklerin hesaplandığı satırdır (ör. sayfada gösterilen); verilmezse ilk okuma
+        kullanılır. changes'teki bir alanı başkası base'den sonra farklı bir değere değiştirdiyse
+        üzerine yazılmaz, ConflictError fırlatılır. Satır yoksa None döner.
+        (bkz. migrations/0012_stock_version.sql)
+        """
+        for _ in range(attempts):
+            rows = self._read(table, filters=[("eq", column, value)], cache=False, operation=operation)
+            if not rows:
+                return None
+            current = rows[0]
+            if base is None:
+                base = current
+            changed_by_others = [field for field, new_value in changes.items()
+                                 if field in base and current.get(field) != base[field]
+                                 and current.get(field) != new_value]
+            if changed_by_others:
+                raise ConflictError(f"Kayıt başka bir kullanıcı tarafından değiştirildi: {', '.join(changed_by_others)}")
+
+            result = self._execute(self.supabase.table(table).update(changes)
+                                   .eq(column, value).eq("version", current.get("version")), operation=operation)
+            if result.data:
+                self._invalidate(table, result.data, changed_columns=changes)
+                return result.data[0]
+            # Okuma ile yazma arasında satır değişti; yeniden oku
+        raise ConflictError(f"Kayıt {attempts} denemede güncellenemedi; sürekli değişiyor")
+
+    def unit_of_work(self, operation="unit_of_work"):
+        """Birden çok tabloya yazmaları tek istekte ve tek transaction'da uygulayan UnitOfWork döndürür"""
+        return UnitOfWork(self, operation)
+
+    def _commit_unit_of_work(self, operations, operation):
+        """UnitOfWork.commit: işlemleri commit_unit_of_work RPC'siyle gönderir ve yazılan satırları önbellekten düşer"""
+        try:
+            results = self._execute(self.supabase.rpc("commit_unit_of_work", {"p_operations": operations}),
+                                    operation=operation).data
+        except APIError as e:
+            if e.code == "P0002":
+                raise ConflictError(e.message) from e
+            raise
+        for item, rows in zip(operations, results):
+            self._invalidate(item["table"], rows or None, changed_columns=item.get("values"),
+                             deleted=item["op"] == "delete")
+        return results
+
+    def _invalidate(self, table, rows=None, changed_columns=None, deleted=False):
+        """Yazılan satırların etkilediği önbellek kayıtlarını siler ve yazmayı yerel kopyaya işler"""
+        self.cache.invalidate(table, rows, changed_columns)
+        self._drop_inflight(table)
+        if self.replica is not None:
+            self.replica.apply(table, rows, deleted=deleted)
+
+    def _drop_inflight(self, table):
+        """Tablodaki süren okumalara yeni bekleyen eklenmesini engeller (sonuçları artık eski olabilir)"""
+        with self._inflight_lock:
+            for key in [key for key, flight in self._inflight.items() if flight[0] == table]:
+                del self._inflight[key]
+
+    def submit(self, method, *args, priority=PRIORITY_NORMAL, on_result=None, on_error=None, key=None,
+               on_batch=None, **kwargs):
+        """Verilen metodu (ör. "get_all_stock_items") GUI thread'ini bloklamadan thread havuzunda çalıştırır.
+
+        Sonuç on_result'a, hata mesajı on_error'a GUI thread'inde gelir. Dönen DbTask
+        iptal edilebilir (task.cancel()) ve task.future ile beklenebilir; bkz. db_tasks.py
+        on_batch verilirse metot satır grupları üreten bir iter_* metodudur; her grup geldikçe
+        on_batch'e, sonunda toplam satır sayısı on_result'a gelir.
+        """
+        return get_runner().submit(getattr(self, method), *args, priority=priority,
+                                   on_result=on_result, on_error=on_error, key=key, on_batch=on_batch, **kwargs)
+
     def _validate_data(self, data, required_fields):
         """Veri doğrulama"""
         for field in required_fields:
@@ -31,93 +581,165 @@ class DatabaseManager:
         return True
 
     def add_income(self, **kwargs):
-        return self._add_transaction(type="income", **kwargs)
+        return self._add_transaction(type="income", operation="add_income", **kwargs)
 
     def add_expense(self, **kwargs):
-        return self._add_transaction(type="expense", **kwargs)
+        return self._add_transaction(type="expense", operation="add_expense", **kwargs)
 
-    def _add_transaction(self, type, tarih, aciklama, para_birimi, miktar, usd_kuru=None, tl_karsiligi=None, odeme_turu="Nakit"):
+    def _add_transaction(self, type, operation, idempotency_key=None, **fields):
+        """Gelir/gider ekler. idempotency_key verilmezse yeni bir anahtar üretilir (bkz. _insert_idempotent)"""
         try:
-            # Veri doğrulama
-            self._validate_data({
-                'tarih': tarih,
-                'aciklama': aciklama,
-                'para_birimi': para_birimi,
-                'miktar': miktar
-            }, ['tarih', 'aciklama', 'para_birimi', 'miktar'])
-
-            if isinstance(tarih, str):
-                try:
-                    tarih = datetime.strptime(tarih, "%d.%m.%Y").date()
-                except ValueError:
-                    tarih = datetime.strptime(tarih, "%Y-%m-%d").date()
-
-            if tl_karsiligi is None:
-                if para_birimi == "TL":
-                    tl_karsiligi = miktar
-                elif para_birimi == "USD" and usd_kuru:
-                    tl_karsiligi = miktar * usd_kuru
-                elif para_birimi == "EUR" and usd_kuru:
-                    tl_karsiligi = miktar * 1.1 * usd_kuru
-                else:
-                    tl_karsiligi = miktar
-
-            data = {
-                "type": type,
-                "tarih": tarih.isoformat(),
-                "aciklama": aciklama,
-                "para_birimi": para_birimi,
-                "miktar": float(miktar),
-                "odeme_turu": odeme_turu,
-                "usd_kuru": float(usd_kuru) if usd_kuru else None,
-                "tl_karsiligi": float(tl_karsiligi)
-            }
-
-            result = self.supabase.table(self.table_name).insert(data).execute()
-            
-            if not result.data:
-                raise Exception("Veritabanına ekleme başarısız")
-                
-            return result.data[0]
+            data = dict(self._transaction_row(type, **fields), idempotency_key=idempotency_key or str(uuid.uuid4()))
+            return self._write("_insert_idempotent", preview=dict(data, id=None), table=self.table_name, data=data,
+                               operation=operation)
 
         except Exception as e:
             self._handle_error("Transaction ekleme", e)
 
-    def get_all_incomes(self):
-        return self._get_all_by_type("income")
+    def _transaction_row(self, type, tarih, aciklama, para_birimi, miktar, usd_kuru=None, tl_karsiligi=None,
+                         odeme_turu="Nakit"):
+        """Form alanlarını doğrulayıp transactions satırına çevirir (tarih ISO, TL karşılığı hesaplanmış)"""
+        # Veri doğrulama
+        self._validate_data({
+            'tarih': tarih,
+            'aciklama': aciklama,
+            'para_birimi': para_birimi,
+            'miktar': miktar
+        }, ['tarih', 'aciklama', 'para_birimi', 'miktar'])
+
+        if isinstance(tarih, str):
+            try:
+                tarih = datetime.strptime(tarih, "%d.%m.%Y").date()
+            except ValueError:
+                tarih = datetime.strptime(tarih, "%Y-%m-%d").date()
+
+        if tl_karsiligi is None:
+            if para_birimi == "TL":
+                tl_karsiligi = miktar
+            elif para_birimi == "USD" and usd_kuru:
+                tl_karsiligi = miktar * usd_kuru
+            elif para_birimi == "EUR" and usd_kuru:
+                tl_karsiligi = miktar * 1.1 * usd_kuru
+            else:
+                tl_karsiligi = miktar
+
+        return {
+            "type": type,
+            "tarih": tarih.isoformat(),
+            "aciklama": aciklama,
+            "para_birimi": para_birimi,
+            "miktar": float(miktar),
+            "odeme_turu": odeme_turu,
+            "usd_kuru": float(usd_kuru) if usd_kuru else None,
+            "tl_karsiligi": float(tl_karsiligi)
+        }
+
+    def add_transactions_bulk(self, rows, type=None, chunk_size=BULK_INSERT_CHUNK_SIZE):
+        """Çok sayıda gelir/gider kaydını tek seferde doğrular ve parça parça ekler.
+
+        rows: dict listesi ya da pandas.DataFrame. Sütunlar _add_transaction parametreleriyle
+        aynıdır (tarih, aciklama, para_birimi, miktar, usd_kuru, tl_karsiligi, odeme_turu);
+        type verilmezse her satırda "type" sütunu olmalıdır.
+        Dönüştürme (tarih, tl_karsiligi) tüm tablo üzerinde vektörel yapılır; ekleme
+        chunk_size satırlık çok satırlı isteklerle yapılır. Dönüş: eklenen kayıt sayısı
+        """
+        try:
+            df = rows.copy() if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+            if df.empty:
+                return 0
+            if type:
+                df["type"] = type
+            for column, default in (("usd_kuru", None), ("tl_karsiligi", None), ("odeme_turu", "Nakit")):
+                if column not in df:
+                    df[column] = default
+
+            required = ["type", "tarih", "aciklama", "para_birimi", "miktar"]
+            missing = [column for column in required if column not in df]
+            if missing:
+                raise ValueError(f"Eksik sütunlar: {', '.join(missing)}")
+
+            df["tarih"] = _to_iso_date(df["tarih"])
+            df["miktar"] = _to_number(df["miktar"])
+            df["usd_kuru"] = _to_number(df["usd_kuru"])
+            df["tl_karsiligi"] = _to_number(df["tl_karsiligi"])
+            df["aciklama"] = df["aciklama"].fillna("").astype(str).str.strip()
+            df["para_birimi"] = df["para_birimi"].fillna("").astype(str).str.strip().str.upper()
+            df["odeme_turu"] = df["odeme_turu"].fillna("Nakit").astype(str).str.strip()
+
+            # Doğrulama: hatalı satırlar (1'den başlayan sıra numarasıyla) tek mesajda bildirilir
+            invalid = df["tarih"].isna() | df["miktar"].isna() | (df["aciklama"] == "") | \
+                (df["para_birimi"] == "") | ~df["type"].isin(["income", "expense"])
+            if invalid.any():
+                bad_rows = (np.flatnonzero(invalid.to_numpy()) + 1).tolist()
+                shown = ", ".join(str(row) for row in bad_rows[:10])
+                raise ValueError(f"{len(bad_rows)} satır geçersiz (satır: {shown}{'...' if len(bad_rows) > 10 else ''})")
+
+            # tl_karsiligi boş olan satırlar _add_transaction ile aynı kurala göre hesaplanır
+            has_rate = df["usd_kuru"].notna() & (df["usd_kuru"] != 0)
+            computed = np.select(
+                [(df["para_birimi"] == "USD") & has_rate, (df["para_birimi"] == "EUR") & has_rate],
+                [df["miktar"] * df["usd_kuru"], df["miktar"] * 1.1 * df["usd_kuru"]],
+                default=df["miktar"]
+            )
+            df["tl_karsiligi"] = df["tl_karsiligi"].fillna(pd.Series(computed, index=df.index))
+
+            columns = ["type", "tarih", "aciklama", "para_birimi", "miktar", "odeme_turu", "usd_kuru", "tl_karsiligi"]
+            records = df[columns].astype(object).where(df[columns].notna(), None).to_dict("records")
+            # Her satırın kendi anahtarı var; zaman aşımından sonra tekrar gönderilen parça satırları çoğaltmaz
+            for record in records:
+                record["idempotency_key"] = str(uuid.uuid4())
+
+            for start in range(0, len(records), chunk_size):
+                chunk = records[start:start + chunk_size]
+                # Eklenen satırlar geri indirilmez; önbellek gönderilen satırlarla geçersiz kılınır
+                self._execute_retrying(lambda: self.supabase.table(self.table_name).upsert(
+                    chunk, on_conflict="idempotency_key", ignore_duplicates=True,
+                    returning="minimal", default_to_null=False), operation="add_transactions_bulk")
+                self._invalidate(self.table_name, chunk)
+
+            return len(records)
+        except Exception as e:
+            self._handle_error("Toplu transaction ekleme", e)
 
-    def get_all_expenses(self):
-        return self._get_all_by_type("expense")
+    def get_all_incomes(self, page_size=None, cursor=None, columns=None):
+        return self._get_all_by_type("income", page_size=page_size, cursor=cursor, columns=columns,
+                                     operation="get_all_incomes")
 
-    def _get_all_by_type(self, type):
+    def get_all_expenses(self, page_size=None, cursor=None, columns=None):
+        return self._get_all_by_type("expense", page_size=page_size, cursor=cursor, columns=columns,
+                                     operation="get_all_expenses")
+
+    def _get_all_by_type(self, type, page_size=None, cursor=None, columns=None, *, operation):
+        """Kayıtları (tarih, id) sırasına göre, yeniden eskiye getirir.
+
+        page_size verilirse en fazla o kadar kayıt döner (keyset sayfalama).
+        cursor, bir önceki sayfanın son satırının (tarih, id) değeridir; verilirse
+        sadece o satırdan daha eski kayıtlar getirilir.
+        """
         try:
-            result = self.supabase.table(self.table_name)\
-                .select("*")\
-                .eq("type", type)\
-                .eq("aktif", True)\
-                .order("tarih", desc=True)\
-                .execute()
-            return result.data if result.data else []
+            filters = [("eq", "type", type), ("eq", "aktif", True)]
+            if cursor:
+                last_tarih, last_id = cursor
+                filters.append(("or_", None, f"tarih.lt.{last_tarih},and(tarih.eq.{last_tarih},id.lt.{last_id})"))
+
+            return self._read(self.table_name, columns, filters,
+                              order=[("tarih", True), ("id", True)], limit=page_size, operation=operation)
         except Exception as e:
             self._handle_error(f"{type} verileri getirme", e)
             return []
 
-    def search_incomes(self, search_term):
-        return self._search_by_type("income", search_term)
+    def search_incomes(self, search_term, columns=None):
+        return self._search_by_type("income", search_term, columns=columns, operation="search_incomes")
 
-    def search_expenses(self, search_term):
-        return self._search_by_type("expense", search_term)
+    def search_expenses(self, search_term, columns=None):
+        return self._search_by_type("expense", search_term, columns=columns, operation="search_expenses")
 
-    def _search_by_type(self, type, term):
+    def _search_by_type(self, type, term, columns=None, *, operation):
+        """Açıklamada arar; en iyi eşleşmeler önce gelir (bkz. migrations/0008_search.sql)"""
         try:
-            result = self.supabase.table(self.table_name)\
-                .select("*")\
-                .eq("type", type)\
-                .eq("aktif", True)\
-                .ilike("aciklama", f"%{term}%")\
-                .order("tarih", desc=True)\
-                .execute()
-            return result.data if result.data else []
+            return self._search("search_transactions", self.table_name, columns,
+                                [("eq", "type", type), ("eq", "aktif", True), ("ilike", "aciklama", f"%{term}%")],
+                                [("tarih", True)], p_type=type, p_term=term, operation=operation)
         except Exception as e:
             self._handle_error(f"{type} arama", e)
             return []
@@ -139,7 +761,9 @@ class DatabaseManager:
                 return self.update_transaction(transaction_id, aktif=False)
             else:
                 # Gerçekten sil
-                result = self.supabase.table(self.table_name).delete().eq("id", transaction_id).execute()
+                result = self._execute(self.supabase.table(self.table_name).delete().eq("id", transaction_id),
+                                       operation="delete_transaction")
+                self._invalidate(self.table_name, result.data, deleted=True)
                 return True if result.data else False
 
         except Exception as e:
@@ -148,6 +772,31 @@ class DatabaseManager:
 
 
 
+    def replace_income(self, income_id, **kwargs):
+        return self.replace_transaction(income_id, type="income", **kwargs)
+
+    def replace_expense(self, expense_id, **kwargs):
+        return self.replace_transaction(expense_id, type="expense", **kwargs)
+
+    def replace_transaction(self, transaction_id, type, **kwargs):
+        """Düzenlenen kaydı pasif yapıp yeni halini ekler; ikisi tek istekte ve tek transaction'da.
+
+        Eski kayıt bu arada silinmiş ya da düzenlenmişse (aktif değilse) hiçbir şey yazılmaz.
+        Dönüş: eklenen yeni satır
+        """
+        try:
+            if not transaction_id:
+                raise ValueError("Geçersiz transaction ID")
+            data = dict(self._transaction_row(type, **kwargs), idempotency_key=str(uuid.uuid4()))
+
+            with self.unit_of_work("replace_transaction") as uow:
+                uow.update(self.table_name, {"aktif": False}, id=transaction_id, aktif=True)
+                uow.insert(self.table_name, data)
+            return uow.results[1][0]
+
+        except Exception as e:
+            self._handle_error("Transaction düzenleme", e)
+
     def update_income(self, income_id, **kwargs):
         return self.update_transaction(income_id, **kwargs)
 
@@ -168,48 +817,236 @@ class DatabaseManager:
                     update_data['tarih'] = datetime.strptime(update_data['tarih'], "%Y-%m-%d").date().isoformat()
 
             # Güncelleme işlemi yapılır
-            result = self.supabase.table(self.table_name).update(update_data).eq("id", transaction_id).execute()
+            result = self._execute(self.supabase.table(self.table_name).update(update_data).eq("id", transaction_id),
+                                   operation="update_transaction")
 
-            # Supabase bazen .data boş döner ama hata vermez
+            # Supabase bazen .data boş döner ama hata vermez; o durumda satır bilinmediği için tablo düşer
+            self._invalidate(self.table_name, result.data or None, changed_columns=update_data)
             return True
 
         except Exception as e:
             self._handle_error("Transaction güncelleme", e)
             return None
-    def get_expenses_by_date_range(self, start_date, end_date):
+    def get_expenses_by_date_range(self, start_date, end_date, columns=None):
         """Belirli tarih aralığındaki giderleri getirir (Supabase uyumlu)"""
         try:
-            result = self.supabase.table(self.table_name)\
-                .select("*")\
-                .eq("type", "expense")\
-                .eq("aktif", True)\
-                .gte("tarih", start_date)\
-                .lte("tarih", end_date)\
-                .order("tarih", desc=True)\
-                .execute()
-            return result.data if result.data else []
+            return self._read(self.table_name, columns,
+                              [("eq", "type", "expense"), ("eq", "aktif", True),
+                               ("gte", "tarih", start_date), ("lte", "tarih", end_date)],
+                              order=[("tarih", True)], operation="get_expenses_by_date_range")
         except Exception as e:
             self._handle_error("Giderleri tarih aralığında getirme", e)
             return []    
 
-    def get_incomes_by_date_range(self, start_date, end_date):
+    def get_incomes_by_date_range(self, start_date, end_date, columns=None):
         """Belirli tarih aralığındaki gelirleri getirir (Supabase uyumlu)"""
         try:
-            result = self.supabase.table(self.table_name)\
-                .select("*")\
-                .eq("type", "income")\
-                .eq("aktif", True)\
-                .gte("tarih", start_date)\
-                .lte("tarih", end_date)\
-                .order("tarih", desc=True)\
-                .execute()
-            return result.data if result.data else []
+            return self._read(self.table_name, columns,
+                              [("eq", "type", "income"), ("eq", "aktif", True),
+                               ("gte", "tarih", start_date), ("lte", "tarih", end_date)],
+                              order=[("tarih", True)], operation="get_incomes_by_date_range")
         except Exception as e:
             self._handle_error("Gelirleri tarih aralığında getirme", e)
-            return [] 
+            return []
+
+    def get_account_transactions(self, account, start_date, end_date, type=None, columns=None):
+        """Bir hesabın (odeme_turu) tarih aralığındaki gelir ve giderlerini tek sorguda getirir.
+
+        type verilmezse gelir ve giderler birlikte döner; satırlar "type" alanıyla ayrılır.
+        """
+        try:
+            filters = [("eq", "odeme_turu", account), ("eq", "aktif", True),
+                       ("gte", "tarih", start_date), ("lte", "tarih", end_date)]
+            if type:
+                filters.append(("eq", "type", type))
+            return self._read(self.table_name, columns, filters, order=[("tarih", True)],
+                              operation="get_account_transactions")
+        except Exception as e:
+            self._handle_error(f"{account} hesap işlemlerini getirme", e)
+            return []
+
+    def get_account_balances(self, start_date, end_date):
+        """Tüm hesapların tarih aralığındaki gelir/gider toplamlarını tek çağrıda getirir.
+
+        Gruplama sunucudaki account_balances fonksiyonunda yapılır (bkz. migrations/0002_account_balances.sql).
+        Dönüş: {odeme_turu: {"income": float, "expense": float, "net": float}}
+        """
+        try:
+            # Sonuç transactions tablosuna bağlıdır; bu tabloya her yazma kaydı düşürür
+            key = ("rpc:account_balances", start_date, end_date)
+            hit, rows = self.cache.get(key)
+            if not hit:
+                rows = self._single_flight(key, self.table_name, lambda: self._execute(
+                    self.supabase.rpc("account_balances", {
+                        "p_start_date": start_date,
+                        "p_end_date": end_date
+                    }), operation="get_account_balances").data or [])
+
+            balances = {}
+            for row in rows:
+                account = balances.setdefault(row['odeme_turu'], {"income": 0.0, "expense": 0.0, "net": 0.0})
+                account[row['type']] = float(row['toplam'] or 0)
+
+            for account in balances.values():
+                account["net"] = account["income"] - account["expense"]
+            return balances
+        except Exception as e:
+            self._handle_error("Hesap bakiyelerini getirme", e)
+            return {}
+
+    def get_transaction_summary(self, start_date=None, end_date=None, type=None, account=None, group_by=()):
+        """Gelir/gider adet, toplam ve en az/en çok tutarlarını satırları indirmeden getirir.
+
+        group_by: SUMMARY_GROUPS'tan sütunlar (gün, hesap, para birimi, tür); her grup için bir satır döner.
+        Dönüş: [{<grup sütunları>, "adet": int, "toplam": float, "tl_toplam": float, "en_az": float, "en_cok": float}]
+        toplam ve en_az/en_cok para birimindeki miktar, tl_toplam TL karşılığıdır (bkz. migrations/0010_summaries.sql).
+        """
+        try:
+            filters, params = self._transaction_summary_args(start_date, end_date, type, account, group_by)
+            rows = self._rpc_read("transaction_summary", self.table_name, filters=filters,
+                                  operation="get_transaction_summary", **params)
+            for row in rows:
+                row["adet"] = int(row["adet"])
+                for column in ("toplam", "tl_toplam", "en_az", "en_cok"):
+                    row[column] = float(row[column] or 0)
+            return rows
+        except Exception as e:
+            self._handle_error("İşlem özeti getirme", e)
+            return []
+
+    def _transaction_summary_args(self, start_date=None, end_date=None, type=None, account=None, group_by=()):
+        """transaction_summary çağrısının parametreleri ve sonucun bağlı olduğu satırların filtreleri"""
+        unknown = set(group_by) - set(SUMMARY_GROUPS)
+        if unknown:
+            raise ValueError(f"Geçersiz gruplama sütunu: {', '.join(sorted(unknown))}")
+
+        # Sadece bu filtrelere uyan satırlara yazılırsa önbellekteki özet düşer
+        filters = [("eq", "aktif", True)]
+        if start_date:
+            filters.append(("gte", "tarih", start_date))
+        if end_date:
+            filters.append(("lte", "tarih", end_date))
+        if type:
+            filters.append(("eq", "type", type))
+        if account:
+            filters.append(("eq", "odeme_turu", account))
+
+        params = {
+            "p_start_date": start_date,
+            "p_end_date": end_date,
+            "p_type": type,
+            "p_account": account,
+            "p_group_by": [column for column in SUMMARY_GROUPS if column in group_by]
+        }
+        return filters, params
+
+    def get_account_summary(self, account, start_date, end_date, type=None):
+        """Bir hesabın tarih aralığındaki gelir/gider toplamları (TL) ve işlem sayısı.
+
+        Dönüş: {"income": float, "expense": float, "net": float, "count": int}
+        """
+        try:
+            summary = {"income": 0.0, "expense": 0.0, "net": 0.0, "count": 0}
+            for row in self.get_transaction_summary(start_date, end_date, type=type, account=account,
+                                                    group_by=["type"]):
+                summary[row["type"]] = row["tl_toplam"]
+                summary["count"] += row["adet"]
+            summary["net"] = summary["income"] - summary["expense"]
+            return summary
+        except Exception as e:
+            self._handle_error(f"{account} hesap özeti getirme", e)
+            return {"income": 0.0, "expense": 0.0, "net": 0.0, "count": 0}
+
+    def begin_dashboard_bootstrap(self, account, start_date, end_date, page_size=50, on_result=None, on_error=None):
+        """load_dashboard_bootstrap'ı GUI thread'ini bloklamadan arka planda (submit) çalıştırır.
+
+        Dolduracağı okumalar çağrı anında süren okuma olarak kaydedilir (_lead): sayfaların bu arada
+        başlattığı aynı okumalar sunucuya ayrıca gitmez, bootstrap'in sonucunu bekler. Bootstrap
+        başarısız olursa bekleyen okumalar kendi isteklerini yapar.
+        """
+        today = datetime.now().date().isoformat()
+        flights = self._lead(self._dashboard_bootstrap_entries(account, start_date, end_date, today, page_size))
+        return self.submit("load_dashboard_bootstrap", account, start_date, end_date, page_size=page_size,
+                           today=today, flights=flights, priority=PRIORITY_HIGH,
+                           on_result=on_result, on_error=on_error)
+
+    def load_dashboard_bootstrap(self, account, start_date, end_date, page_size=50, today=None, flights=None):
+        """Ana pencerenin açılış verilerini tek bir dashboard_bootstrap çağrısıyla alıp önbelleğe koyar.
+
+        Hesap bakiyeleri, account hesabının detayı, gelir/gider ilk sayfası (page_size), stok,
+        bugünkü siparişler, kişiler, şifreler, ithalat ve sayfaların alt satır özetleri; ilk yüklemeler böylece
+        sunucuya gitmeden önbellekten karşılanır (bkz. migrations/0010_summaries.sql).
+        Kayıtların TTL'i ilk okunduklarında başlar; hesap sayfaları detaylarını ancak açılınca okur.
+        Bu arada başka istemcilerin yaptığı değişiklikler kayıtları değişiklik akışıyla düşürür
+        (akış, aynı anlık görüntünün change_horizon'undan başlar).
+        flights: begin_dashboard_bootstrap'in açtığı süren okumalar
+        """
+        today = today or datetime.now().date().isoformat()
+        entries = self._dashboard_bootstrap_entries(account, start_date, end_date, today, page_size)
+        flights = self._lead(entries) if flights is None else flights
+        try:
+            data = self._execute(self.supabase.rpc("dashboard_bootstrap", {
+                "p_account": account,
+                "p_start_date": start_date,
+                "p_end_date": end_date,
+                "p_today": today,
+                "p_page_size": page_size
+            }), operation="load_dashboard_bootstrap").data
+
+            for field, key, table, filters in entries:
+                if key in flights:
+                    self._land(flights[key], key, data[field], table, filters)
+            return data
+        except Exception as e:
+            self._abandon(flights)
+            self._handle_error("Açılış verilerini getirme", e)
+
+    def _dashboard_bootstrap_entries(self, account, start_date, end_date, today, page_size):
+        """dashboard_bootstrap sonucunun alanları ve doldurdukları önbellek kayıtları: [(alan, anahtar, tablo, filtreler)]
+
+        Anahtarlar, sayfaların çağırdığı okuma fonksiyonlarının _read/_rpc_read anahtarlarıyla aynıdır.
+        """
+        def read(field, table, columns, filters=(), order=(), limit=None):
+            key, filters = self._read_key(table, columns, filters, order, limit)
+            return field, key, table, filters
+
+        def rpc(field, function, table, filters=(), **params):
+            _, filters = self._read_key(table, None, filters)
+            return field, self._rpc_key(function, "*", params), table, filters
+
+        entries = [
+            ("account_balances", ("rpc:account_balances", start_date, end_date), self.table_name, ()),
+            read("account_transactions", self.table_name, PAGE_COLUMNS["account"],
+                 [("eq", "odeme_turu", account), ("eq", "aktif", True),
+                  ("gte", "tarih", start_date), ("lte", "tarih", end_date)],
+                 order=[("tarih", True)]),
+        ]
+        for type, name in (("income", "incomes"), ("expense", "expenses")):
+            entries.append(read(name, self.table_name, PAGE_COLUMNS[type],
+                                [("eq", "type", type), ("eq", "aktif", True)],
+                                order=[("tarih", True), ("id", True)], limit=page_size))
+        entries += [
+            read("stock", self.stock_table, PAGE_COLUMNS["stock"], order=[("urun_adi", False)]),
+            read("today_orders", self.daily_orders_table, PAGE_COLUMNS["daily_orders"], [("eq", "order_date", today)]),
+            read("contacts", self.contacts_table, PAGE_COLUMNS["contacts"], order=[("created_at", True)]),
+            read("passwords", self.passwords_table, PAGE_COLUMNS["passwords"]),
+            read("imports", "imports", PAGE_COLUMNS["imports"]),
+        ]
+        # Alt satır özetleri (migrations/0010_summaries.sql)
+        filters, params = self._transaction_summary_args(start_date, end_date, account=account, group_by=["type"])
+        entries.append(rpc("account_summary", "transaction_summary", self.table_name, filters, **params))
+        entries.append(rpc("stock_summary", "stock_summary", self.stock_table))
+        entries.append(rpc("today_orders_summary", "daily_orders_summary", self.daily_orders_table,
+                           [("eq", "order_date", today)], p_start_date=today, p_end_date=today))
+        for type in ("income", "expense"):
+            filters, params = self._transaction_summary_args(type=type, group_by=["para_birimi"])
+            entries.append(rpc(f"{type}_summary", "transaction_summary", self.table_name, filters, **params))
+        entries.append(("change_horizon", CHANGE_HORIZON_KEY, "change_log", ()))
+        return entries
+
     # ------------------ STOCK TABLE FONKSİYONLARI ------------------ #
 
-    def add_stock_item(self, urun_kodu, urun_adi, miktar, birim_fiyat, gercek_stok=None):
+    def add_stock_item(self, urun_kodu, urun_adi, miktar, birim_fiyat, gercek_stok=None, idempotency_key=None):
         try:
             # Eğer gerçek stok belirtilmemişse, normal stokla aynı yap
             if gercek_stok is None:
@@ -220,36 +1057,45 @@ class DatabaseManager:
                 "urun_adi": str(urun_adi),
                 "miktar": int(miktar),
                 "gercek_stok": int(gercek_stok),  # Zorunlu alan
-                "birim_fiyat": float(birim_fiyat)
+                "birim_fiyat": float(birim_fiyat),
+                "idempotency_key": idempotency_key
             }
             
-            result = self.supabase.table(self.stock_table).insert(data).execute()
-            return result.data[0] if result.data else None
+            return self._insert_idempotent(self.stock_table, data, operation="add_stock_item")
         except Exception as e:
             self._handle_error("Stok ekleme", e)
             return None
 
-    def get_all_stock_items(self):
+    def get_all_stock_items(self, columns=None):
         try:
-            result = self.supabase.table(self.stock_table).select("*").order("urun_adi").execute()
-            return result.data if result.data else []
+            return self._read(self.stock_table, columns, order=[("urun_adi", False)], operation="get_all_stock_items")
         except Exception as e:
             self._handle_error("Stok verisi getirme", e)
             return []
-    def get_stock_item_by_code(self, product_code):
-        """Ürün koduna göre stok item'ını getirir"""
+    def iter_all_stock_items(self, columns=None, batch_size=STREAM_BATCH_SIZE):
+        """get_all_stock_items'ın akışlı hali: satırlar geldikçe batch_size'lık listeler üretir"""
         try:
-            result = self.supabase.table(self.stock_table)\
-                .select("*")\
-                .eq("urun_kodu", product_code)\
-                .execute()
-            return result.data[0] if result.data else None
+            yield from self._stream(self.stock_table, columns, order=[("urun_adi", False)], batch_size=batch_size,
+                                    operation="iter_all_stock_items")
+        except Exception as e:
+            self._handle_error("Stok verisi getirme", e)
+
+    def get_stock_item_by_code(self, product_code, columns=None, fresh=False):
+        """Ürün koduna göre stok item'ını getirir (fresh=True: önbelleği atlar)"""
+        try:
+            rows = self._read(self.stock_table, columns, [("eq", "urun_kodu", product_code)], cache=not fresh,
+                              operation="get_stock_item_by_code")
+            return rows[0] if rows else None
         except Exception as e:
             self._handle_error("Stok item'ı getirme", e)
             return None    
         
-    def update_stock_quantity(self, product_code, new_quantity, new_real_quantity=None):
-        """Verilen ürün koduna ait stok miktarını günceller."""
+    def update_stock_quantity(self, product_code, new_quantity, new_real_quantity=None, base=None):
+        """Verilen ürün koduna ait stok miktarını günceller.
+
+        Güncelleme version ile koşulludur; base (değerlerin hesaplandığı satır) verilirse ve miktarı
+        o satırdan sonra başkası değiştirdiyse ConflictError fırlatılır (bkz. _update_versioned).
+        """
         try:
             if new_quantity < 0:  # Stok miktarının negatif olmamasını sağla
                 new_quantity = 0
@@ -261,12 +1107,11 @@ class DatabaseManager:
                     new_real_quantity = 0
                 update_data["gercek_stok"] = new_real_quantity
                 
-            result = self.supabase.table(self.stock_table)\
-                .update(update_data)\
-                .eq("urun_kodu", product_code)\
-                .execute()
-                
-            return True if result.data else False
+            row = self._update_versioned(self.stock_table, "urun_kodu", product_code, update_data, base,
+                                         operation="update_stock_quantity")
+            return True if row else False
+        except ConflictError:
+            raise
         except Exception as e:
             self._handle_error(f"Stok miktarı güncellenirken hata oluştu: {e}", e)
             return False    
@@ -274,9 +1119,10 @@ class DatabaseManager:
     def get_stock_quantity(self, product_code):
         """Verilen ürün koduna ait stok miktarını döndürür."""
         try:
-            result = self.supabase.table(self.stock_table).select("miktar").eq("urun_kodu", product_code).execute()
-            if result.data:
-                return result.data[0]['miktar']
+            rows = self._read(self.stock_table, ["miktar"], [("eq", "urun_kodu", product_code)],
+                              operation="get_stock_quantity")
+            if rows:
+                return rows[0]['miktar']
             return None
         except Exception as e:
             self._handle_error(f"Stok miktarı sorgulanırken hata oluştu: {e}", e)
@@ -284,7 +1130,12 @@ class DatabaseManager:
 
     
 
-    def update_stock_item(self, item_id, **kwargs):
+    def update_stock_item(self, item_id, base=None, **kwargs):
+        """Stok kaydını günceller ve yeni satırı döndürür.
+
+        base, kullanıcının düzenlediği satırdır (sayfadaki değerler). Düzenlenen bir alanı arada başka
+        bir istemci değiştirdiyse ConflictError fırlatılır; diğer alanlardaki değişiklikler korunur.
+        """
         try:
             if not item_id:
                 raise ValueError("Geçersiz stok ID")
@@ -297,12 +1148,13 @@ class DatabaseManager:
             if 'birim_fiyat' in update_data and update_data['birim_fiyat'] <= 0:
                 raise ValueError("Birim fiyat pozitif olmalıdır")
 
-            result = self.supabase.table(self.stock_table).update(update_data).eq("id", item_id).execute()
-            
-            if not result.data:
+            row = self._update_versioned(self.stock_table, "id", item_id, update_data, base,
+                                         operation="update_stock_item")
+            if not row:
                 raise Exception("Stok güncelleme başarısız")
-                
-            return result.data[0]
+            return row
+        except ConflictError:
+            raise
         except Exception as e:
             self._handle_error("Stok güncelleme", e)
             return None
@@ -312,16 +1164,45 @@ class DatabaseManager:
             if not item_id:
                 raise ValueError("Geçersiz stok ID")
                 
-            result = self.supabase.table(self.stock_table).delete().eq("id", item_id).execute()
+            result = self._execute(self.supabase.table(self.stock_table).delete().eq("id", item_id),
+                                   operation="delete_stock_item")
+            self._invalidate(self.stock_table, result.data, deleted=True)
             return True if result.data else False
         except Exception as e:
             self._handle_error("Stok silme", e)
             return False
 
 
+    def get_stock_summary(self):
+        """Ürün sayısı, toplam miktar ve toplam stok değeri (miktar * birim_fiyat); satırlar indirilmez.
+
+        Hesap sunucudaki stock_summary fonksiyonunda yapılır (bkz. migrations/0010_summaries.sql).
+        """
+        empty = {"total_items": 0, "total_quantity": 0, "total_value": 0.0}
+        try:
+            rows = self._rpc_read("stock_summary", self.stock_table, operation="get_stock_summary")
+            if not rows:
+                return empty
+            return {
+                "total_items": int(rows[0]["adet"]),
+                "total_quantity": int(rows[0]["toplam_miktar"] or 0),
+                "total_value": float(rows[0]["toplam_deger"] or 0)
+            }
+        except Exception as e:
+            self._handle_error("Stok özeti getirme", e)
+            return empty
+
     # ------------------ DAILY ORDERS TABLE FONKSİYONLARI ------------------ #
 
-    def add_daily_order(self, product_code, customer_name, product_name, quantity, unit_price, is_real_order=True):
+    def add_daily_order(self, product_code, customer_name, product_name, quantity, unit_price, is_real_order=True,
+                        idempotency_key=None, order_date=None):
+        """Siparişi ekler ve stoğu düşer.
+
+        idempotency_key ile tekrar denenen çağrı siparişi ikinci kez eklemez, stoğu ikinci kez düşmez.
+        order_date verilmezse bugündür; günlükten sonradan gönderilen sipariş de girildiği günün tarihini alır.
+        Dönüş: {"order": eklenen sipariş, "stock": {"miktar": kalan stok, "gercek_stok": kalan gerçek stok}};
+        yazma günlüğü açıksa {"order": sipariş, "stock": None} içerikli QueuedWrite
+        """
         try:
             # Veri doğrulama
             self._validate_data({
@@ -335,58 +1216,48 @@ class DatabaseManager:
             if quantity <= 0 or unit_price <= 0:
                 raise ValueError("Miktar ve birim fiyat pozitif olmalıdır")
 
-            # Stok kontrolü yap
-            stock_item = self.get_stock_item_by_code(product_code)
-            if stock_item is None:
-                raise ValueError("Ürün stokta bulunamadı")
-                
-            stock_quantity = stock_item['miktar']
-            real_stock_quantity = stock_item.get('gercek_stok', stock_quantity)
-            
-            # Stok güncelleme işlemi
-            new_stock = stock_quantity - quantity
-            if new_stock < 0:
-                raise ValueError(f"Stokta yeterli ürün yok! Mevcut stok: {stock_quantity}")
-                
-            # Gerçek stok güncelleme
-            if is_real_order:
-                new_real_stock = real_stock_quantity - quantity
-                if new_real_stock < 0:
-                    new_real_stock = 0
-            else:
-                new_real_stock = real_stock_quantity
-                
-            # Stokları güncelle
-            self.update_stock_quantity(product_code, new_stock, new_real_stock)
-
-            order_date = datetime.now().date()
-            total_amount = quantity * unit_price
-            
-            data = {
-                "product_code": str(product_code),
-                "customer_name": str(customer_name),
-                "product_name": str(product_name),
-                "quantity": int(quantity),
-                "unit_price": float(unit_price),
-                "total_amount": float(total_amount),
-                "order_date": order_date.isoformat(),
-                "is_real_order": is_real_order
+            # Stok kontrolü, stok düşümü ve sipariş kaydı sunucuda tek transaction'da yapılır
+            # (bkz. migrations/0011_idempotency_keys.sql); aynı ürüne eşzamanlı siparişler stoğu eksiye düşüremez
+            params = {
+                "p_product_code": str(product_code),
+                "p_customer_name": str(customer_name),
+                "p_product_name": str(product_name),
+                "p_quantity": int(quantity),
+                "p_unit_price": float(unit_price),
+                "p_is_real_order": bool(is_real_order),
+                "p_order_date": order_date or datetime.now().date().isoformat(),
+                "p_idempotency_key": idempotency_key or str(uuid.uuid4())
             }
-            
-            result = self.supabase.table(self.daily_orders_table).insert(data).execute()
-            
-            if not result.data:
-                raise Exception("Sipariş ekleme başarısız")
-                
-            return result.data[0]
+            preview = {"order": {"id": None, "product_code": params["p_product_code"],
+                                 "customer_name": params["p_customer_name"], "product_name": params["p_product_name"],
+                                 "quantity": params["p_quantity"], "unit_price": params["p_unit_price"],
+                                 "total_amount": params["p_quantity"] * params["p_unit_price"],
+                                 "is_real_order": params["p_is_real_order"], "order_date": params["p_order_date"]},
+                       "stock": None}
+            return self._write("_reserve_stock_and_add_order", preview=preview, params=params,
+                               operation="add_daily_order")
         except Exception as e:
             self._handle_error("Günlük sipariş ekleme", e)
             return None
 
+    def _reserve_stock_and_add_order(self, params, operation):
+        """reserve_stock_and_add_order RPC'si; siparişi ve stok satırını önbellekten düşer"""
+        result = self._execute_retrying(lambda: self.supabase.rpc("reserve_stock_and_add_order", params),
+                                        operation=operation)
+
+        if not result.data:
+            raise Exception("Sipariş ekleme başarısız")
+
+        order, stock = result.data["order"], result.data["stock"]
+        self._invalidate(self.daily_orders_table, [order])
+        self._invalidate(self.stock_table, [dict(stock, urun_kodu=params["p_product_code"])],
+                         changed_columns=["miktar", "gercek_stok"])
+        return {"order": order, "stock": stock}
+
     
-    def get_all_daily_orders(self, order_date=None):
+    def get_all_daily_orders(self, order_date=None, columns=None):
         try:
-            query = self.supabase.table(self.daily_orders_table).select("*")
+            filters = []
             
             if order_date:
                 if isinstance(order_date, str):
@@ -394,31 +1265,32 @@ class DatabaseManager:
                         order_date = datetime.strptime(order_date, "%d.%m.%Y").date()
                     except ValueError:
                         order_date = datetime.strptime(order_date, "%Y-%m-%d").date()
-                query = query.eq("order_date", order_date.isoformat())
+                filters.append(("eq", "order_date", order_date.isoformat()))
             
-            result = query.execute()
-            return result.data if result.data else []
+            return self._read(self.daily_orders_table, columns, filters, operation="get_all_daily_orders")
             
         except Exception as e:
             self._handle_error("Günlük sipariş verisi getirme", e)
             return []
 
-    def get_today_orders(self):
+    def get_today_orders(self, columns=None):
         try:
             today = datetime.now().date().isoformat()
-            result = self.supabase.table(self.daily_orders_table).select("*")\
-                    .eq("order_date", today).execute()
-            return result.data if result.data else []
+            return self._read(self.daily_orders_table, columns, [("eq", "order_date", today)],
+                              operation="get_today_orders")
         except Exception as e:
             self._handle_error("Bugünkü siparişleri getirme", e)
             return []
 
     def update_daily_order(self, order_id, **kwargs):
+        """Siparişi tek PATCH ile günceller ve güncel satırı (total_amount dahil) döndürür"""
         try:
             if not order_id:
                 raise ValueError("Geçersiz sipariş ID")
                 
             update_data = {k: v for k, v in kwargs.items() if v is not None}
+            # Hesaplanan sütun yazılamaz
+            update_data.pop('total_amount', None)
             
             # Tarih formatını kontrol et
             if 'order_date' in update_data and isinstance(update_data['order_date'], str):
@@ -427,21 +1299,14 @@ class DatabaseManager:
                 except ValueError:
                     update_data['order_date'] = datetime.strptime(update_data['order_date'], "%Y-%m-%d").date().isoformat()
             
-            # Eğer quantity veya unit_price güncellendiyse total_amount'u hesapla
-            if 'quantity' in update_data or 'unit_price' in update_data:
-                # Mevcut veriyi al
-                current_result = self.supabase.table(self.daily_orders_table).select("quantity, unit_price").eq("id", order_id).execute()
-                if current_result.data:
-                    current_data = current_result.data[0]
-                    quantity = update_data.get('quantity', current_data['quantity'])
-                    unit_price = update_data.get('unit_price', current_data['unit_price'])
-                    update_data['total_amount'] = float(quantity) * float(unit_price)
-            
-            result = self.supabase.table(self.daily_orders_table).update(update_data).eq("id", order_id).execute()
+            # total_amount sunucuda hesaplanır (generated column); PATCH güncel satırı döndürür
+            result = self._execute(self.supabase.table(self.daily_orders_table).update(update_data).eq("id", order_id),
+                                   operation="update_daily_order")
             
             if not result.data:
                 raise Exception("Sipariş güncelleme başarısız")
-                
+
+            self._invalidate(self.daily_orders_table, result.data, changed_columns=update_data)
             return result.data[0]
         except Exception as e:
             self._handle_error("Günlük sipariş güncelleme", e)
@@ -452,15 +1317,17 @@ class DatabaseManager:
             if not order_id:
                 raise ValueError("Geçersiz sipariş ID")
                 
-            result = self.supabase.table(self.daily_orders_table).delete().eq("id", order_id).execute()
+            result = self._execute(self.supabase.table(self.daily_orders_table).delete().eq("id", order_id),
+                                   operation="delete_daily_order")
+            self._invalidate(self.daily_orders_table, result.data, deleted=True)
             return True if result.data else False
         except Exception as e:
             self._handle_error("Günlük sipariş silme", e)
             return False
 
-    def search_daily_orders(self, search_term, order_date=None):
+    def search_daily_orders(self, search_term, order_date=None, columns=None):
         try:
-            query = self.supabase.table(self.daily_orders_table).select("*")
+            filters = []
             
             if order_date:
                 if isinstance(order_date, str):
@@ -468,49 +1335,66 @@ class DatabaseManager:
                         order_date = datetime.strptime(order_date, "%d.%m.%Y").date()
                     except ValueError:
                         order_date = datetime.strptime(order_date, "%Y-%m-%d").date()
-                query = query.eq("order_date", order_date.isoformat())
+                order_date = order_date.isoformat()
+                filters.append(("eq", "order_date", order_date))
             
             # Müşteri adı, ürün adı veya ürün kodunda arama yap
-            result = query.or_(f"customer_name.ilike.%{search_term}%,product_name.ilike.%{search_term}%,product_code.ilike.%{search_term}%").execute()
-            return result.data if result.data else []
+            filters.append(("or_", None, f"customer_name.ilike.%{search_term}%,product_name.ilike.%{search_term}%,product_code.ilike.%{search_term}%"))
+            return self._search("search_daily_orders", self.daily_orders_table, columns, filters,
+                                p_term=search_term, p_order_date=order_date or None, operation="search_daily_orders")
         except Exception as e:
             self._handle_error("Günlük sipariş arama", e)
             return []
 
     def get_daily_orders_summary(self, order_date=None):
+        """Sipariş sayısı ve toplam tutarı (order_date verilirse o günün) siparişleri indirmeden getirir.
+
+        Hesap sunucudaki daily_orders_summary fonksiyonunda yapılır (bkz. migrations/0010_summaries.sql).
+        """
+        empty = {"total_orders": 0, "total_amount": 0.0, "min_amount": 0.0, "max_amount": 0.0}
         try:
-            orders = self.get_all_daily_orders(order_date)
-            if not orders:
-                return {"total_orders": 0, "total_amount": 0.0}
-            
-            total_orders = len(orders)
-            total_amount = sum(float(order['total_amount']) for order in orders)
-            
+            filters = []
+            if order_date:
+                if isinstance(order_date, str):
+                    try:
+                        order_date = datetime.strptime(order_date, "%d.%m.%Y").date()
+                    except ValueError:
+                        order_date = datetime.strptime(order_date, "%Y-%m-%d").date()
+                order_date = order_date.isoformat()
+                filters.append(("eq", "order_date", order_date))
+
+            rows = self._rpc_read("daily_orders_summary", self.daily_orders_table, filters=filters,
+                                  p_start_date=order_date or None, p_end_date=order_date or None,
+                                  operation="get_daily_orders_summary")
+            if not rows:
+                return empty
             return {
-                "total_orders": total_orders,
-                "total_amount": total_amount
+                "total_orders": int(rows[0]["adet"]),
+                "total_amount": float(rows[0]["toplam"] or 0),
+                "min_amount": float(rows[0]["en_az"] or 0),
+                "max_amount": float(rows[0]["en_cok"] or 0)
             }
         except Exception as e:
             self._handle_error("Günlük sipariş özeti", e)
-            return {"total_orders": 0, "total_amount": 0.0}
+            return empty
 
     def check_product_code_exists(self, product_code, exclude_id=None):
         try:
             if not product_code:
                 return False
                 
-            query = self.supabase.table(self.daily_orders_table).select("id").eq("product_code", product_code)
+            filters = [("eq", "product_code", product_code)]
             if exclude_id:
-                query = query.neq("id", exclude_id)
-            result = query.execute()
-            return len(result.data) > 0
+                filters.append(("neq", "id", exclude_id))
+            return self._count(self.daily_orders_table, filters, operation="check_product_code_exists") > 0
         except Exception as e:
             self._handle_error("Ürün kodu kontrol", e)
             return False
 
     def test_connection(self):
         try:
-            result = self.supabase.table(self.table_name).select("count", count="exact").eq("type", "income").execute()
+            result = self._execute(self.supabase.table(self.table_name).select("id", count="exact", head=True).eq("type", "income"),
+                                   operation="test_connection")
             self.logger.info(f"Veritabanı bağlantısı başarılı! Toplam gelir kaydı: {result.count}")
             return True
         except Exception as e:
@@ -529,59 +1413,59 @@ class DatabaseManager:
         if not phone_clean.isdigit() or len(phone_clean) < 10:
             raise ValueError("Geçersiz telefon numarası formatı")
 
-    def get_all_contacts(self):
+    def get_all_contacts(self, columns=None):
         """Tüm kişileri getir"""
         try:
             # order("name") yerine order("created_at", desc=True) kullanın
-            result = self.supabase.table(self.contacts_table).select("*").order("created_at", desc=True).execute()
+            rows = self._read(self.contacts_table, columns or PAGE_COLUMNS["contacts"],
+                              order=[("created_at", True)], operation="get_all_contacts")
             return [(item['id'], item['name'], item['phone'], item.get('description', '')) 
-                for item in result.data] if result.data else []
+                for item in rows]
         except Exception as e:
             self._handle_error("Kişileri getirme", e)
             return []
 
-    def get_contact_by_id(self, contact_id):
+    def get_contact_by_id(self, contact_id, columns=None):
         """ID'ye göre kişi getir"""
         try:
-            result = self.supabase.table(self.contacts_table).select("*").eq("id", contact_id).execute()
-            if result.data:
-                item = result.data[0]
+            rows = self._read(self.contacts_table, columns or PAGE_COLUMNS["contacts"], [("eq", "id", contact_id)],
+                              operation="get_contact_by_id")
+            if rows:
+                item = rows[0]
                 return (item['id'], item['name'], item['phone'], item.get('description', ''))
             return None
         except Exception as e:
             self._handle_error("Kişi getirme", e)
             return None
 
-    def search_contacts(self, search_term):
+    def search_contacts(self, search_term, columns=None):
         """Kişi ara"""
         try:
-            result = self.supabase.table(self.contacts_table).select("*").or_(
-                f"name.ilike.%{search_term}%,phone.ilike.%{search_term}%,description.ilike.%{search_term}%"
-            ).order("name").execute()
+            rows = self._search("search_contacts", self.contacts_table, columns or PAGE_COLUMNS["contacts"], [(
+                "or_", None, f"name.ilike.%{search_term}%,phone.ilike.%{search_term}%,description.ilike.%{search_term}%"
+            )], [("name", False)], p_term=search_term, operation="search_contacts")
             
             return [(item['id'], item['name'], item['phone'], item.get('description', '')) 
-                   for item in result.data] if result.data else []
+                   for item in rows]
         except Exception as e:
             self._handle_error("Kişi arama", e)
             return []
 
-    def add_contact(self, name, phone, description=""):
-        """Yeni kişi ekle"""
+    def add_contact(self, name, phone, description="", idempotency_key=None):
+        """Yeni kişi ekle. Dönüş: kişinin id'si; yazma günlüğü açıksa sıradaki kaydın QueuedWrite'ı"""
         try:
             self._validate_contact_data(name, phone)
             
             data = {
                 "name": name,
                 "phone": phone,
-                "description": description
+                "description": description,
+                "idempotency_key": idempotency_key or str(uuid.uuid4())
             }
             
-            result = self.supabase.table(self.contacts_table).insert(data).execute()
-            
-            if not result.data:
-                raise Exception("Kişi eklenemedi")
-                
-            return result.data[0]['id']
+            result = self._write("_insert_idempotent", preview=dict(data, id=None), table=self.contacts_table, data=data,
+                                 operation="add_contact")
+            return result if isinstance(result, QueuedWrite) else result['id']
         except Exception as e:
             self._handle_error("Kişi ekleme", e)
             return None
@@ -598,11 +1482,13 @@ class DatabaseManager:
                 "updated_at": datetime.now().isoformat()
             }
             
-            result = self.supabase.table(self.contacts_table).update(data).eq("id", contact_id).execute()
+            result = self._execute(self.supabase.table(self.contacts_table).update(data).eq("id", contact_id),
+                                   operation="update_contact")
             
             if not result.data:
                 raise Exception("Kişi güncellenemedi")
-                
+
+            self._invalidate(self.contacts_table, result.data, changed_columns=data)
             return True
         except Exception as e:
             self._handle_error("Kişi güncelleme", e)
@@ -611,7 +1497,9 @@ class DatabaseManager:
     def delete_contact(self, contact_id):
         """Kişi sil"""
         try:
-            result = self.supabase.table(self.contacts_table).delete().eq("id", contact_id).execute()
+            result = self._execute(self.supabase.table(self.contacts_table).delete().eq("id", contact_id),
+                                   operation="delete_contact")
+            self._invalidate(self.contacts_table, result.data, deleted=True)
             return len(result.data) > 0 if result.data else False
         except Exception as e:
             self._handle_error("Kişi silme", e)
@@ -621,7 +1509,8 @@ class DatabaseManager:
         """Veritabanı bağlantısını test et"""
         try:
             # Contacts tablosundan örnek bir sorgu yaparak bağlantıyı test edelim
-            result = self.supabase.table(self.contacts_table).select("count", count="exact").execute()
+            result = self._execute(self.supabase.table(self.contacts_table).select("id", count="exact", head=True),
+                                   operation="test_connection")
             self.logger.info(f"Veritabanı bağlantısı başarılı! Toplam kişi kaydı: {result.count}")
             return True
         except Exception as e:
@@ -646,31 +1535,29 @@ class DatabaseManager:
                 
             }
 
-            result = self.supabase.table(self.passwords_table).insert(data).execute()
+            result = self._execute(self.supabase.table(self.passwords_table).insert(data), operation="add_password")
             
             if not result.data:
                 raise Exception("Şifre ekleme başarısız")
-                
+
+            self._invalidate(self.passwords_table, result.data)
             return result.data[0]
         except Exception as e:
             self._handle_error("Şifre ekleme", e)
             return None
 
-    def get_all_passwords(self):
+    def get_all_passwords(self, columns=None):
         try:
-            
-            result = self.supabase.table(self.passwords_table).select("*").execute()
-            return result.data if result.data else []
+            return self._read(self.passwords_table, columns, operation="get_all_passwords")
         except Exception as e:
             self._handle_error("Şifreleri getirme", e)
             return []
 
-    def search_passwords(self, search_term):
+    def search_passwords(self, search_term, columns=None):
         try:
-            result = self.supabase.table(self.passwords_table).select("*").or_(
-                f"platform.ilike.%{search_term}%,username.ilike.%{search_term}%,description.ilike.%{search_term}%"
-            ).execute()
-            return result.data if result.data else []
+            return self._search("search_passwords", self.passwords_table, columns, [(
+                "or_", None, f"platform.ilike.%{search_term}%,username.ilike.%{search_term}%,description.ilike.%{search_term}%"
+            )], p_term=search_term, operation="search_passwords")
         except Exception as e:
             self._handle_error("Şifre arama", e)
             return []
@@ -691,11 +1578,13 @@ class DatabaseManager:
                 
             }
 
-            result = self.supabase.table(self.passwords_table).update(data).eq("id", password_id).execute()
+            result = self._execute(self.supabase.table(self.passwords_table).update(data).eq("id", password_id),
+                                   operation="update_password")
             
             if not result.data:
                 raise Exception("Şifre güncelleme başarısız")
-                
+
+            self._invalidate(self.passwords_table, result.data, changed_columns=data)
             return True
         except Exception as e:
             self._handle_error("Şifre güncelleme", e)
@@ -703,7 +1592,9 @@ class DatabaseManager:
 
     def delete_password(self, password_id):
         try:
-            result = self.supabase.table(self.passwords_table).delete().eq("id", password_id).execute()
+            result = self._execute(self.supabase.table(self.passwords_table).delete().eq("id", password_id),
+                                   operation="delete_password")
+            self._invalidate(self.passwords_table, result.data, deleted=True)
             return len(result.data) > 0 if result.data else False
         except Exception as e:
             self._handle_error("Şifre silme", e)
@@ -711,7 +1602,9 @@ class DatabaseManager:
 
     def delete_all_passwords(self):
         try:
-            result = self.supabase.table(self.passwords_table).delete().neq("id", 0).execute()
+            result = self._execute(self.supabase.table(self.passwords_table).delete().neq("id", 0),
+                                   operation="delete_all_passwords")
+            self._invalidate(self.passwords_table)
             return len(result.data) > 0 if result.data else False
         except Exception as e:
             self._handle_error("Tüm şifreleri silme", e)
@@ -719,10 +1612,9 @@ class DatabaseManager:
         
         # ------------------ İMPORTS TABLE FONKSİYONLARI ------------------ #
     
-    def get_all_imports(self):
+    def get_all_imports(self, columns=None):
         try:
-            result = self.supabase.table("imports").select("*").execute()
-            return result.data if result.data else []
+            return self._read("imports", columns, operation="get_all_imports")
         except Exception as e:
             self._handle_error("İthalat verileri getirme", e)
             return []
@@ -751,7 +1643,8 @@ class DatabaseManager:
                 "notlar": notlar
             }
 
-            result = self.supabase.table("imports").insert(data).execute()
+            result = self._execute(self.supabase.table("imports").insert(data), operation="add_import_product")
+            self._invalidate("imports", result.data or None)
             return result.data[0] if result.data else None
         except Exception as e:
             self._handle_error("İthalat ürünü ekleme", e)
@@ -770,7 +1663,9 @@ class DatabaseManager:
                 except ValueError:
                     update_data['tarih'] = datetime.strptime(update_data['tarih'], "%Y-%m-%d").date().isoformat()
 
-            result = self.supabase.table("imports").update(update_data).eq("id", import_id).execute()
+            result = self._execute(self.supabase.table("imports").update(update_data).eq("id", import_id),
+                                   operation="update_import")
+            self._invalidate("imports", result.data or None, changed_columns=update_data)
             return result.data[0] if result.data else None
         except Exception as e:
             self._handle_error("İthalat güncelleme", e)
@@ -778,11 +1673,64 @@ class DatabaseManager:
 
     def delete_import(self, import_id):
         try:
-            result = self.supabase.table("imports").delete().eq("id", import_id).execute()
+            result = self._execute(self.supabase.table("imports").delete().eq("id", import_id),
+                                   operation="delete_import")
+            self._invalidate("imports", result.data, deleted=True)
             return len(result.data) > 0 if result.data else False
         except Exception as e:
             self._handle_error("İthalat silme", e)
             return False
+
+    # ------------------ CHANGE LOG FONKSİYONLARI ------------------ #
+
+    def get_change_cursor(self):
+        """Değişiklik akışının başlangıç imleci: (ufuk, 0).
+
+        Ufuktan (pg_snapshot_xmin) önce başlayan transaction'ların hepsi bitmiştir; değişiklikleri bu
+        çağrıdan sonra yapılan okumalarda görünür. Sonrakiler get_changes(imleç) ile gelir
+        (bkz. migrations/0016_change_log_commit_order.sql).
+        """
+        try:
+            # Açılışta dashboard_bootstrap'in verilerle aynı anlık görüntüden döndürdüğü ufuk önbellekte olabilir
+            # (ya da begin_dashboard_bootstrap onu getiriyor olabilir); eski bir ufuk da güvenlidir, sadece
+            # bazı değişiklikler ikinci kez uygulanır
+            hit, horizon = self.cache.get(CHANGE_HORIZON_KEY)
+            if not hit:
+                horizon = self._single_flight(CHANGE_HORIZON_KEY, "change_log", lambda: self._execute_retrying(
+                    lambda: self.supabase.rpc("change_horizon", {}), hedge=False, policy=self.read_retry,
+                    operation="get_change_cursor").data)
+            return (horizon, 0)
+        except Exception as e:
+            self._handle_error("Değişiklik akışı başlangıcını getirme", e)
+            return None
+
+    def get_changes(self, after, limit=500, table=None, columns=None):
+        """after (xid, id) imlecinden sonraki değişiklik kayıtlarını commit sırasıyla getirir.
+
+        Sadece bitmiş transaction'ların kayıtları döner; sonradan daha küçük id'li bir kayıt araya
+        giremez (bkz. migrations/0016_change_log_commit_order.sql). Sonraki imleç son kaydın
+        (xid, id) çiftidir; columns verilirse xid ve id'yi içermelidir.
+        table verilirse sadece o tablonun değişiklikleri döner.
+        """
+        try:
+            after_xid, after_id = after
+            params = {"p_after_xid": after_xid, "p_after_id": after_id, "p_limit": limit}
+            if table:
+                params["p_table"] = table
+            projection = self._projection(columns or ["id", "xid", "tbl", "op", "row_id", "row", "old_row"])
+            return self._execute_retrying(lambda: self.supabase.rpc("get_changes", params).select(projection),
+                                          hedge=False, policy=self.read_retry, operation="get_changes").data or []
+        except Exception as e:
+            self._handle_error("Değişiklik kayıtlarını getirme", e)
+            return []
+
+    def apply_change(self, change):
+        """Başka bir istemcinin yaptığı değişikliği önbelleğe ve yerel kopyaya işler"""
+        rows = [row for row in (change.get("old_row"), change.get("row")) if row]
+        self.cache.invalidate(change["tbl"], rows or None)
+        self._drop_inflight(change["tbl"])
+        if self.replica is not None and change.get("row"):
+            self.replica.apply(change["tbl"], [change["row"]], deleted=change["op"] == "DELETE")
         
 
           # ------------------ USERS FONKSİYONLARI ------------------ #
@@ -800,20 +1748,19 @@ class DatabaseManager:
                 "role": role
             }
             
-            result = self.supabase.table(self.users_table).insert(data).execute()
+            result = self._execute(self.supabase.table(self.users_table).insert(data), operation="add_user")
             return result.data[0] if result.data else None
         except Exception as e:
             self._handle_error("Kullanıcı ekleme", e)
             return None
 
     # Mevcut fonksiyonlara bu eklemeleri yapın
-    def get_user_by_username(self, username):
+    def get_user_by_username(self, username, columns=None):
         """Kullanıcı adına göre kullanıcı getirir"""
         try:
-            result = self.supabase.table(self.users_table)\
-                .select("*")\
-                .eq("username", username)\
-                .execute()
+            result = self._execute(self.supabase.table(self.users_table)
+                                   .select(self._projection(columns))
+                                   .eq("username", username), operation="get_user_by_username")
             return result.data[0] if result.data else None
         except Exception as e:
             self._handle_error("Kullanıcı getirme", e)
@@ -836,14 +1783,13 @@ class DatabaseManager:
             
 
    # ================= VERSION CONTROL FONKSİYONLARI ================= #
-    def get_latest_version_info(self):
+    def get_latest_version_info(self, columns=None):
         """Supabase'ten en son sürüm bilgisini getirir"""
         try:
-            result = self.supabase.table("version_control")\
-                       .select("*")\
-                       .order("created_at", desc=True)\
-                       .limit(1)\
-                       .execute()
+            result = self._execute(self.supabase.table("version_control")
+                                   .select(self._projection(columns))
+                                   .order("created_at", desc=True)
+                                   .limit(1), operation="get_latest_version_info")
             return result.data[0] if result.data else None
         except Exception as e:
             self._handle_error("Sürüm bilgisi getirme", e)
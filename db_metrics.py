@@ -0,0 +1,142 @@
+# db_metrics.py
+"""
+DatabaseManager'ın Supabase çağrıları için süre ölçümü ve yavaş sorgu kaydı.
+
+Her çağrı için işlem adı (DatabaseManager metodu), tablo, filtreler, satır sayısı,
+gönderilen + alınan JSON boyutu ve süre kaydedilir. İşlem başına süre histogramı
+tutulur; DB_SLOW_QUERY_MS'i (varsayılan 500 ms) aşan çağrılar "db.slow" logger'ı
+ile finance_app.log'a yazılır.
+
+Özet: db_metrics.summary() / db_metrics.to_json(); uygulamada Ctrl+Shift+D ile
+açılan tanılama penceresi (diagnostics_dialog.py).
+"""
+import json
+import logging
+import os
+import threading
+from collections import deque
+
+# Histogram kova üst sınırları (ms); son kova bunların üstü
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+slow_logger = logging.getLogger("db.slow")
+
+
+def describe_query(query):
+    """postgrest istek nesnesinden (yöntem, tablo, filtreler, gönderilen JSON) bilgisini çıkarır"""
+    request = query.request
+    path = str(request.path).rstrip("/")
+    if "/rpc/" in path:
+        table = "rpc:" + path.rsplit("/", 1)[-1]
+    else:
+        table = path.rsplit("/", 1)[-1]
+    filters = "&".join(f"{key}={value}" for key, value in request.params.multi_items() if key != "select")
+    return request.http_method, table, filters, request.json
+
+
+def _json_size(value):
+    if value is None:
+        return 0
+    return len(json.dumps(value, default=str, ensure_ascii=False).encode("utf-8"))
+
+
+class OperationStats:
+    """Tek bir işlemin (ör. get_account_transactions) birikmiş ölçümleri"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, elapsed_ms, rows, size, error):
+        self.count += 1
+        self.errors += bool(error)
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.rows += rows
+        self.bytes += size
+        index = next((i for i, bound in enumerate(BUCKETS_MS) if elapsed_ms <= bound), len(BUCKETS_MS))
+        self.buckets[index] += 1
+
+    def percentile(self, q):
+        """Histogramdan yüzdelik tahmini (kovanın üst sınırı, en fazla en büyük ölçüm)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target and index < len(BUCKETS_MS):
+                return round(min(float(BUCKETS_MS[index]), self.max_ms), 1)
+        return round(self.max_ms, 1)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max_ms, 1),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "histogram": {f"<={bound}ms": count for bound, count in zip(BUCKETS_MS, self.buckets)}
+                         | {f">{BUCKETS_MS[-1]}ms": self.buckets[-1]}
+        }
+
+
+class DbMetrics:
+    def __init__(self, slow_threshold_ms=500.0, keep_slow=50):
+        self.slow_threshold_ms = slow_threshold_ms
+        self._operations = {}
+        self._slow = deque(maxlen=keep_slow)
+        self._lock = threading.Lock()
+
+    def record(self, operation, query, data, elapsed_ms, error=None, rows=None, size=None):
+        """Bir Supabase çağrısının ölçümünü kaydeder.
+
+        Akışla okunan yanıtlarda veri tutulmadığı için rows ve size (alınan bayt) ayrıca verilir.
+        """
+        method, table, filters, payload = describe_query(query)
+        if rows is None:
+            rows = len(data) if isinstance(data, list) else int(data is not None)
+        if size is None:
+            size = _json_size(payload) + _json_size(data)
+
+        with self._lock:
+            self._operations.setdefault(operation, OperationStats()).add(elapsed_ms, rows, size, error)
+            if elapsed_ms < self.slow_threshold_ms:
+                return
+            entry = {
+                "operation": operation, "method": method, "table": table, "filters": filters,
+                "rows": rows, "bytes": size, "ms": round(elapsed_ms, 1), "error": error
+            }
+            self._slow.append(entry)
+
+        slow_logger.warning(
+            f"Yavaş sorgu: {operation} {method} {table} [{filters}] "
+            f"{rows} satır, {size} bayt, {elapsed_ms:.0f} ms" + (f", hata: {error}" if error else ""))
+
+    def summary(self):
+        """İşlem başına istatistikler ve son yavaş sorgular"""
+        with self._lock:
+            return {
+                "slow_threshold_ms": self.slow_threshold_ms,
+                "operations": {name: stats.as_dict() for name, stats in sorted(self._operations.items())},
+                "slow_queries": list(self._slow)
+            }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.summary(), indent=indent, ensure_ascii=False)
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
+            self._slow.clear()
+
+
+db_metrics = DbMetrics(slow_threshold_ms=float(os.getenv("DB_SLOW_QUERY_MS", "500")))
@@ -0,0 +1,328 @@
+# db_retry.py
+"""
+Supabase çağrılarının ağ hatalarına karşı dayanıklılık katmanı.
+
+RetryPolicy.run(fn), fn'i çağırır; zaman aşımı ya da bağlantı kopması gibi geçici bir
+hatada üstel bekleme + jitter ile yeniden dener. hedge_after verilirse ilk deneme bu
+süre içinde dönmezse aynı çağrının bir kopyası paralel başlatılır (hedged request) ve
+önce başarıyla biten kullanılır. budget verilirse yeniden denemeler RetryBudget ile
+sınırlanır: sunucu çöktüğünde her çağrının kat kat tekrarlanması yükü artırmaz.
+
+CircuitBreaker art arda geçici hatalardan sonra çağrıları hiç göndermeden reddeder
+(CircuitOpenError); ağ yokken her sayfa zaman aşımını tek tek beklemez. DatabaseManager
+bu durumda önbellekteki son veriyi döndürür, arayüz durumu çevrimdışı bandında gösterir
+(bkz. offline_banner.py).
+
+deadline(seconds) bloğu içindeki HTTP isteklerinin toplam süresini sınırlar; paylaşılan
+httpx istemcisi her isteğin zaman aşımını kalan süreye indirir (apply_deadline).
+
+Bir yazma çağrısı iki kez sunucuya ulaşabileceği için yeniden deneme sadece tekrarı
+güvenli çağrılarla kullanılır: okumalar ve idempotency_key'li eklemeler
+(bkz. migrations/0011_idempotency_keys.sql).
+"""
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+
+import httpx
+
+# Yeniden denenen hatalar: istek sunucuya ulaşmamış ya da yanıt gelmemiş olabilir
+RETRYABLE_ERRORS = (httpx.TransportError,)
+
+logger = logging.getLogger(__name__)
+
+# Hedged kopyaların çalıştığı havuz
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="db-hedge")
+
+
+# Çağrının bitmesi gereken an (time.monotonic); thread'e ve çağrı zincirine özel
+_deadline = contextvars.ContextVar("db_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds):
+    """Blok içindeki isteklerin toplam süresini seconds ile sınırlar; iç içe bloklarda kısa olan geçer"""
+    if seconds is None:
+        yield
+        return
+    end = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(end if current is None else min(current, end))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left():
+    """İçinde bulunulan deadline bloğunda kalan süre (saniye); blok yoksa None"""
+    end = _deadline.get()
+    return None if end is None else end - time.monotonic()
+
+
+def apply_deadline(request):
+    """httpx istek kancası: isteğin bağlantı/okuma/yazma zaman aşımlarını kalan süreye indirir"""
+    left = time_left()
+    if left is None:
+        return
+    if left <= 0:
+        raise httpx.ConnectTimeout("Çağrının süresi doldu", request=request)
+    timeout = request.extensions.get("timeout") or dict.fromkeys(("connect", "read", "write", "pool"))
+    request.extensions["timeout"] = {name: left if value is None else min(value, left)
+                                     for name, value in timeout.items()}
+
+
+class CircuitOpenError(Exception):
+    """Devre açık: sunucuya ulaşılamıyor, çağrı gönderilmeden reddedildi"""
+
+
+# Bu hatalarda sunucuya ulaşılamamıştır (okumalar önbellekten, yazmalar günlükten karşılanır)
+OFFLINE_ERRORS = (CircuitOpenError,) + RETRYABLE_ERRORS
+
+
+class CircuitBreaker:
+    """Art arda geçici hatalardan sonra çağrıları hemen reddeder.
+
+    closed: çağrılar gönderilir; failure_threshold art arda geçici hatada open olur.
+    open: çağrılar CircuitOpenError ile reddedilir; reset_timeout sonra half_open olur.
+    half_open: tek bir deneme çağrısı gönderilir; başarılıysa closed, hatalıysa yine open.
+    Sadece failure_errors hataları sayılır; sunucudan gelen hata yanıtları (APIError gibi)
+    sunucuya ulaşıldığını gösterir, başarı sayılır.
+    Durum değiştiğinde add_listener ile eklenen fonksiyonlar yeni durumla çağrılır.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=15.0, failure_errors=RETRYABLE_ERRORS,
+                 clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_errors = failure_errors
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._listeners = []
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    @property
+    def is_open(self):
+        return self.state != self.CLOSED
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def before_call(self):
+        """Çağrı gönderilebilirse döner, devre açıksa CircuitOpenError fırlatır"""
+        with self._lock:
+            changed = False
+            if self._state == self.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.name} şu anda ulaşılamıyor (çevrimdışı)")
+                changed = self._set_state(self.HALF_OPEN)
+            if self._state == self.HALF_OPEN:
+                if self._probing:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.name} şu anda ulaşılamıyor (bağlantı deneniyor)")
+                self._probing = True
+        self._notify(changed)
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            changed = self._set_state(self.CLOSED)
+        self._notify(changed)
+
+    def record_failure(self, error):
+        """Çağrı hatası; failure_errors'tan değilse sunucu yanıt vermiştir, başarı sayılır"""
+        if not isinstance(error, self.failure_errors):
+            self.record_success()
+            return
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            changed = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = self.clock()
+                changed = self._set_state(self.OPEN)
+        self._notify(changed)
+
+    def call(self, fn):
+        """fn()'i devre kapalıysa çalıştırır ve sonucunu kaydeder"""
+        self.before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    def _set_state(self, state):
+        if self._state == state:
+            return False
+        self._state = state
+        return True
+
+    def _notify(self, changed):
+        if not changed:
+            return
+        state = self.state
+        logger.warning(f"{self.name} devre durumu: {state}")
+        for listener in list(self._listeners):
+            try:
+                listener(state)
+            except Exception:
+                logger.exception("Devre dinleyicisi hata verdi")
+
+
+class RetryBudget:
+    """Son window saniyedeki yeniden denemeleri min_retries + ratio * çağrı sayısı ile sınırlar"""
+
+    def __init__(self, ratio=0.2, min_retries=5, window=10.0, clock=time.monotonic):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._calls = deque()
+        self._retries = deque()
+        self.exhausted = 0
+
+    def record_call(self):
+        with self._lock:
+            self._calls.append(self._trim())
+
+    def try_retry(self):
+        """Bütçe izin veriyorsa yeniden denemeyi kaydedip True döner"""
+        with self._lock:
+            now = self._trim()
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._calls):
+                self.exhausted += 1
+                return False
+            self._retries.append(now)
+            return True
+
+    def _trim(self):
+        now = self.clock()
+        for times in (self._calls, self._retries):
+            while times and now - times[0] > self.window:
+                times.popleft()
+        return now
+
+
+class RetryPolicy:
+    """Üstel bekleme (full jitter), yeniden deneme bütçesi ve isteğe bağlı hedged istekle yeniden deneme"""
+
+    def __init__(self, attempts=4, base_delay=0.2, max_delay=3.0, hedge_after=None, sleep=time.sleep, budget=None):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_after = hedge_after
+        self.sleep = sleep
+        self.budget = budget
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.hedged = 0
+
+    def is_retryable(self, error):
+        return isinstance(error, RETRYABLE_ERRORS)
+
+    def delay(self, attempt):
+        """attempt. başarısız denemeden sonra beklenecek süre (saniye)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def run(self, fn, hedge=True):
+        """fn()'in sonucunu döndürür; geçici hatalarda attempts kez dener, son hatayı fırlatır.
+
+        Bütçe tükendiyse ya da bekleme içinde bulunulan deadline'ı aşacaksa yeniden denemez.
+        """
+        if self.budget is not None:
+            self.budget.record_call()
+        for attempt in range(self.attempts):
+            try:
+                return self._attempt(fn) if hedge and self.hedge_after is not None else fn()
+            except Exception as e:
+                if attempt == self.attempts - 1 or not self.is_retryable(e):
+                    raise
+                delay = self.delay(attempt)
+                left = time_left()
+                if left is not None and left <= delay:
+                    raise
+                if self.budget is not None and not self.budget.try_retry():
+                    raise
+                with self._lock:
+                    self.retries += 1
+                logger.warning(f"Geçici hata, {delay:.2f} sn sonra tekrar denenecek ({attempt + 1}/{self.attempts}): {e}")
+                self.sleep(delay)
+
+    def _attempt(self, fn):
+        """Tek deneme: hedge_after içinde dönmezse ikinci bir kopya başlatılır, önce başarılı olan döner"""
+        # Kopyalar, çağıranın deadline'ıyla çalışır (her biri kendi bağlam kopyasında)
+        first = _executor.submit(contextvars.copy_context().run, fn)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        with self._lock:
+            self.hedged += 1
+        pending = {first, _executor.submit(contextvars.copy_context().run, fn)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+
+# Supabase çağrılarının ortak devresi ve yeniden deneme bütçesi
+supabase_breaker = CircuitBreaker(
+    "Supabase",
+    failure_threshold=int(os.getenv("SUPABASE_BREAKER_FAILURES", "3")),
+    reset_timeout=float(os.getenv("SUPABASE_BREAKER_RESET", "15"))
+)
+retry_budget = RetryBudget(ratio=float(os.getenv("SUPABASE_RETRY_RATIO", "0.2")))
+
+# Ekleme ve sipariş çağrıları için varsayılan politika
+write_retry = RetryPolicy(
+    attempts=int(os.getenv("SUPABASE_WRITE_ATTEMPTS", "4")),
+    hedge_after=float(os.getenv("SUPABASE_HEDGE_AFTER", "2.0")),
+    budget=retry_budget
+)
+
+# Okumalar: daha az deneme, kısa beklemeler; kullanıcı ekranın dolmasını bekliyor
+read_retry = RetryPolicy(
+    attempts=int(os.getenv("SUPABASE_READ_ATTEMPTS", "3")),
+    max_delay=1.0,
+    budget=retry_budget
+)
+
+# Döviz kuru servisi (income_page/expense_page) için ayrı devre: Supabase'den bağımsız.
+# requests'in bağlantı/zaman aşımı hataları OSError'dan türer
+exchange_rate_breaker = CircuitBreaker("Kur servisi", failure_threshold=2, reset_timeout=300.0,
+                                       failure_errors=(OSError,))
@@ -0,0 +1,147 @@
+# db_tasks.py
+"""
+DatabaseManager metotlarını GUI thread'ini bloklamadan QThreadPool üzerinde çalıştırır.
+
+Kullanım:
+    task = self.db.submit("get_all_stock_items", columns=PAGE_COLUMNS["stock"],
+                          on_result=self.populate_table, on_error=self.show_error,
+                          key="stock_page.load")
+
+submit() bir DbTask döndürür. Sonuç GUI thread'inde on_result'a (task.signals.finished
+sinyali) gelir; aynı sonuç task.future (concurrent.futures.Future) üzerinden de okunabilir.
+Aynı key ile yeni bir iş gönderildiğinde, henüz sonuçlanmamış eski iş iptal edilir;
+böylece art arda yapılan yenilemelerde sadece son sonuç tabloya yazılır.
+
+on_batch verilirse fn satır grupları üreten bir generator'dır (ör. iter_all_stock_items);
+her grup geldikçe on_batch'e, sonunda toplam satır sayısı on_result'a gelir.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import Future
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# QThreadPool.start önceliği: büyük sayı önce çalışır
+PRIORITY_HIGH = 10     # kullanıcının beklediği işlemler (kaydet, sil, filtrele)
+PRIORITY_NORMAL = 0    # sayfa yüklemeleri
+PRIORITY_LOW = -10     # arka plan yenilemeleri / ön yüklemeler
+
+logger = logging.getLogger(__name__)
+
+
+class DbTaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    batch = pyqtSignal(object)
+
+
+class DbTask(QRunnable):
+    """Tek bir DatabaseManager çağrısı"""
+
+    def __init__(self, fn, args, kwargs, streaming=False):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        # True ise fn satır grupları üretir; her grup batch sinyaliyle yayınlanır
+        self.streaming = streaming
+        self.signals = DbTaskSignals()
+        self.future = Future()
+        self.cancelled = False
+
+    def cancel(self):
+        """İşi iptal eder. Kuyruktaysa hiç çalışmaz; çalışıyorsa sonucu yayınlanmaz."""
+        self.cancelled = True
+        self.future.cancel()
+
+    def emit_batches(self, batches):
+        """Grupları geldikçe yayınlar; iptal edilirse okumayı bırakır. Dönüş: toplam satır sayısı"""
+        count = 0
+        for batch in batches:
+            if self.cancelled:
+                break
+            count += len(batch)
+            self.signals.batch.emit(batch)
+        return count
+
+    def run(self):
+        if self.cancelled or not self.future.set_running_or_notify_cancel():
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+            if self.streaming:
+                result = self.emit_batches(result)
+        except Exception as e:
+            self.future.set_exception(e)
+            if not self.cancelled:
+                self.signals.failed.emit(str(e))
+            return
+        self.future.set_result(result)
+        if not self.cancelled:
+            self.signals.finished.emit(result)
+
+
+class DbTaskRunner:
+    """DbTask'ları paylaşılan thread havuzuna gönderir ve key'e göre takip eder"""
+
+    def __init__(self, pool=None):
+        self.pool = pool or QThreadPool.globalInstance()
+        max_threads = os.getenv("DB_THREAD_POOL_SIZE")
+        if max_threads:
+            self.pool.setMaxThreadCount(int(max_threads))
+        self._latest = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, priority=PRIORITY_NORMAL, on_result=None, on_error=None, key=None,
+               on_batch=None, **kwargs):
+        task = DbTask(fn, args, kwargs, streaming=on_batch is not None)
+        if on_batch:
+            task.signals.batch.connect(on_batch)
+        if on_result:
+            task.signals.finished.connect(on_result)
+        if on_error:
+            task.signals.failed.connect(on_error)
+        else:
+            task.signals.failed.connect(lambda message: logger.error(f"Arka plan veritabanı işlemi başarısız: {message}"))
+
+        if key is not None:
+            with self._lock:
+                previous = self._latest.get(key)
+                self._latest[key] = task
+            if previous is not None:
+                self.cancel(previous)
+
+        self.pool.start(task, priority)
+        return task
+
+    def cancel(self, task):
+        task.cancel()
+        try:
+            self.pool.tryTake(task)
+        except RuntimeError:
+            # İş bitmiş ve havuz tarafından silinmiş
+            pass
+
+    def cancel_key(self, key):
+        with self._lock:
+            task = self._latest.pop(key, None)
+        if task is not None:
+            self.cancel(task)
+
+    def wait(self, msecs=-1):
+        """Kuyruktaki tüm işlerin bitmesini bekler (kapanışta ve testlerde)"""
+        return self.pool.waitForDone(msecs)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner():
+    """Süreç genelinde paylaşılan DbTaskRunner"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = DbTaskRunner()
+        return _runner
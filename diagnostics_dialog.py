@@ -0,0 +1,106 @@
+# diagnostics_dialog.py
+"""
+Veritabanı tanılama penceresi (ana pencerede Ctrl+Shift+D).
+
+İşlem başına çağrı sayısı, ortalama / p50 / p95 / en uzun süre, satır ve boyut
+toplamları (db_metrics), son yavaş sorgular ve sorgu önbelleği istatistikleri
+gösterilir. Özet JSON olarak kaydedilebilir.
+"""
+import json
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox)
+
+from db_metrics import db_metrics
+from query_cache import query_cache
+
+OPERATION_COLUMNS = ["İşlem", "Çağrı", "Hata", "Ort. ms", "p50 ms", "p95 ms", "En uzun ms", "Satır", "KB"]
+SLOW_COLUMNS = ["İşlem", "Yöntem", "Tablo", "Filtreler", "Satır", "KB", "ms"]
+
+
+class DiagnosticsDialog(QDialog):
+    def __init__(self, parent=None, metrics=db_metrics, cache=query_cache):
+        super().__init__(parent)
+        self.metrics = metrics
+        self.cache = cache
+        self.initUI()
+        self.refresh()
+
+    def initUI(self):
+        self.setWindowTitle("Veritabanı Tanılama")
+        self.resize(1000, 650)
+
+        layout = QVBoxLayout(self)
+        self.cache_label = QLabel()
+        layout.addWidget(self.cache_label)
+
+        layout.addWidget(QLabel("İşlemler"))
+        self.operations_table = QTableWidget(0, len(OPERATION_COLUMNS))
+        self.operations_table.setHorizontalHeaderLabels(OPERATION_COLUMNS)
+        self.operations_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.operations_table, 2)
+
+        self.slow_label = QLabel()
+        layout.addWidget(self.slow_label)
+        self.slow_table = QTableWidget(0, len(SLOW_COLUMNS))
+        self.slow_table.setHorizontalHeaderLabels(SLOW_COLUMNS)
+        self.slow_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        layout.addWidget(self.slow_table, 1)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        for text, slot in [("🔄 Yenile", self.refresh), ("💾 JSON Kaydet", self.save_json),
+                           ("🧹 Sıfırla", self.reset), ("Kapat", self.accept)]:
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            button_layout.addWidget(button)
+        layout.addLayout(button_layout)
+
+        self.setStyleSheet("""
+            QDialog { background-color: #1f2937; color: white; }
+            QLabel { color: white; font-size: 12px; }
+            QTableWidget { background-color: #2a2a2a; color: white; }
+            QPushButton {
+                padding: 8px 16px; background-color: #374151; color: white;
+                border: 1px solid #4b5563; border-radius: 4px;
+            }
+            QPushButton:hover { background-color: #4b5563; }
+        """)
+
+    def refresh(self):
+        summary = self.metrics.summary()
+        cache_stats = self.cache.stats()
+        self.cache_label.setText(
+            f"Önbellek: {cache_stats['hits']} isabet / {cache_stats['misses']} ıska "
+            f"(oran {cache_stats['hit_rate']:.0%}), {cache_stats['size']} kayıt")
+
+        operations = sorted(summary["operations"].items(), key=lambda item: item[1]["p95_ms"], reverse=True)
+        self.operations_table.setRowCount(len(operations))
+        for row, (name, stats) in enumerate(operations):
+            values = [name, stats["count"], stats["errors"], stats["avg_ms"], stats["p50_ms"], stats["p95_ms"],
+                      stats["max_ms"], stats["rows"], f"{stats['bytes'] / 1024:.1f}"]
+            for col, value in enumerate(values):
+                self.operations_table.setItem(row, col, QTableWidgetItem(str(value)))
+
+        slow = list(reversed(summary["slow_queries"]))
+        self.slow_label.setText(f"Son yavaş sorgular (> {summary['slow_threshold_ms']:.0f} ms)")
+        self.slow_table.setRowCount(len(slow))
+        for row, entry in enumerate(slow):
+            values = [entry["operation"], entry["method"], entry["table"], entry["filters"],
+                      entry["rows"], f"{entry['bytes'] / 1024:.1f}", entry["ms"]]
+            for col, value in enumerate(values):
+                self.slow_table.setItem(row, col, QTableWidgetItem(str(value)))
+
+    def save_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, "JSON Kaydet", "db_metrics.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({**self.metrics.summary(), "cache": self.cache.stats()}, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            QMessageBox.critical(self, "Hata", f"Dosya kaydedilemedi:\n{str(e)}")
+
+    def reset(self):
+        self.metrics.reset()
+        self.refresh()
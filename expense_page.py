@@ -6,14 +6,47 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
 from PyQt5.QtCore import QDate, QTimer, Qt
 import requests
 import json
-from database_manager import DatabaseManager
+from database_manager import DatabaseManager, PAGE_COLUMNS
+from write_journal import QueuedWrite
+from queued_rows import QueuedRowsMixin
+from db_tasks import get_runner
+from db_retry import exchange_rate_breaker
+from transaction_import_dialog import TransactionImportDialog
 
-class ExpensePageWidget(QWidget):
-    def __init__(self):
+
+def fetch_usd_try_rate():
+    """USD/TRY kurunu getirir (thread havuzunda çalışır); alınamazsa None döner.
+
+    Servis art arda yanıt vermezse devre açılır; sonraki denemeler beklemeden None döner.
+    """
+    try:
+        response = exchange_rate_breaker.call(
+            lambda: requests.get("https://api.exchangerate-api.com/v4/latest/USD", timeout=(2, 3)))
+        if response.status_code == 200:
+            return response.json()['rates'].get('TRY', 39.89)
+    except Exception as e:
+        print(f"Kur çekme hatası: {e}")
+    return None
+
+class ExpensePageWidget(QueuedRowsMixin, QWidget):
+    # Tablo her seferinde bu kadar kayıt yükler, kalanı kaydırdıkça gelir
+    PAGE_SIZE = 50
+    # Sıradaki kayıt gönderimde reddedilirse gösterilir (bkz. queued_rows.QueuedRowsMixin)
+    QUEUED_REJECTED_MESSAGE = "Sıradaki gider kaydı sunucu tarafından reddedildi"
+
+    def __init__(self, db=None):
         super().__init__()
-        self.db = DatabaseManager()
+        self.db = db or DatabaseManager.instance()
+        self.next_cursor = None
+        self.has_more_rows = False
+        # Sayfalar thread havuzunda gelir; tablo sıfırlanınca eski yanıtlar yok sayılır
+        self.fetching = False
+        self.load_generation = 0
+        # Düzenlenmekte olan kaydın id'si; form kaydedilince bu kaydın yerine geçer
+        self.editing_id = None
         self.setupUi()
         self.setup_timer()
+        self.watch_journal()
         self.load_exchange_rate()
         self.load_expenses()
 
@@ -249,6 +282,9 @@ class ExpensePageWidget(QWidget):
         self.table.setColumnWidth(6, 120)
         
         self.table.verticalHeader().setDefaultSectionSize(40)
+
+        # Tablonun sonuna yaklaşıldığında sonraki sayfayı yükle
+        self.table.verticalScrollBar().valueChanged.connect(self.on_table_scrolled)
         
         main_layout.addWidget(self.table)
         
@@ -323,8 +359,27 @@ class ExpensePageWidget(QWidget):
         """)
         delete_btn.clicked.connect(self.delete_selected_row)
         
+        # Toplu içe aktarma (CSV / XLSX)
+        import_btn = QPushButton("📥 İçe Aktar")
+        import_btn.setFixedSize(120, 40)
+        import_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #3498db;
+                color: white;
+                border: none;
+                padding: 10px 15px;
+                border-radius: 5px;
+                font-weight: bold;
+                font-size: 14px;
+            }
+            QPushButton:hover { background-color: #2980b9; }
+            QPushButton:pressed { background-color: #2471a3; }
+        """)
+        import_btn.clicked.connect(self.open_import_dialog)
+        
         buttons_layout.addWidget(edit_btn)
         buttons_layout.addWidget(delete_btn)
+        buttons_layout.addWidget(import_btn)
         
         self.total_tl_label = QLabel("Toplam TL Gider: ₺0.00")
         self.total_tl_label.setStyleSheet("""
@@ -351,52 +406,119 @@ class ExpensePageWidget(QWidget):
         self.timer.start(300000)
         
     def load_exchange_rate(self):
-        try:
-            response = requests.get("https://api.exchangerate-api.com/v4/latest/USD", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                rate = data['rates'].get('TRY', 39.89)
-                self.exchange_rate_input.setText(str(round(rate, 2)))
-                self.last_update_label.setText(f"Son güncelleme: {QDate.currentDate().toString('dd.MM.yyyy')}")
-            else:
+        """Kuru thread havuzunda çeker; arayüz istek sırasında donmaz"""
+        get_runner().submit(fetch_usd_try_rate, on_result=self.apply_exchange_rate,
+                            on_error=lambda error: self.apply_exchange_rate(None))
+
+    def apply_exchange_rate(self, rate):
+        if rate is None:
+            # Kur alınamadı; daha önce alınan (ya da girilen) kur korunur
+            if not self.exchange_rate_input.text():
                 self.exchange_rate_input.setText("39.89")
-        except Exception as e:
-            print(f"Kur çekme hatası: {e}")
-            self.exchange_rate_input.setText("39.89")
+            return
+        self.exchange_rate_input.setText(str(round(rate, 2)))
+        self.last_update_label.setText(f"Son güncelleme: {QDate.currentDate().toString('dd.MM.yyyy')}")
             
     def load_expenses(self):
-        expenses = sorted(self.db.get_all_expenses(), key=lambda x: x['id'], reverse=True)
+        """Tabloyu sıfırlar ve sadece ilk sayfayı yükler"""
         self.table.setRowCount(0)
-        
+        self.next_cursor = None
+        self.has_more_rows = True
+        self.fetching = False
+        self.load_generation += 1
+        self.fetch_more()
+
+    def open_import_dialog(self):
+        """CSV/XLSX dosyasından toplu kayıt ekler; bitince tablo baştan yüklenir"""
+        dialog = TransactionImportDialog(self.db, "expense", self)
+        if dialog.exec_() == dialog.Accepted and dialog.imported_count:
+            self.load_expenses()
+
+    def can_fetch_more(self):
+        """QAbstractItemModel.canFetchMore karşılığı: yüklenmemiş kayıt kaldı mı?"""
+        return self.has_more_rows and not self.fetching
+
+    def fetch_more(self):
+        """QAbstractItemModel.fetchMore karşılığı: (tarih, id) imlecinden sonraki sayfayı ekler"""
+        if not self.can_fetch_more():
+            return
+
+        self.fetching = True
+        generation = self.load_generation
+        self.db.submit("get_all_expenses", page_size=self.PAGE_SIZE, cursor=self.next_cursor,
+                       columns=PAGE_COLUMNS["expense"],
+                       on_result=lambda expenses: self.on_page_loaded(expenses, generation),
+                       on_error=self.on_page_load_failed,
+                       key=(id(self), "page"))
+
+    def on_page_loaded(self, expenses, generation):
+        if generation != self.load_generation:
+            return
+        self.fetching = False
+
         for expense in expenses:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            
-            tarih = QDate.fromString(expense['tarih'][:10], "yyyy-MM-dd").toString("dd.MM.yyyy")
-            self.table.setItem(row, 0, QTableWidgetItem(tarih))
-            
-            self.table.setItem(row, 1, QTableWidgetItem(expense['aciklama']))
-            self.table.setItem(row, 2, QTableWidgetItem(expense['para_birimi']))
-            self.table.setItem(row, 3, QTableWidgetItem(expense['odeme_turu']))
-            
-            amount_item = QTableWidgetItem(f"{expense['miktar']:.2f}")
-            amount_item.setTextAlignment(Qt.AlignRight|Qt.AlignVCenter)
-            self.table.setItem(row, 4, amount_item)
-            
-            if expense['para_birimi'] == "USD":
-                rate_item = QTableWidgetItem(f"{expense['usd_kuru']:.2f}")
-            else:
-                rate_item = QTableWidgetItem("-")
-            rate_item.setTextAlignment(Qt.AlignRight|Qt.AlignVCenter)
-            self.table.setItem(row, 5, rate_item)
-            
-            tl_item = QTableWidgetItem(f"₺{expense['tl_karsiligi']:.2f}")
-            tl_item.setTextAlignment(Qt.AlignRight|Qt.AlignVCenter)
-            self.table.setItem(row, 6, tl_item)
-            
-            self.table.item(row, 0).setData(Qt.UserRole, expense['id'])
-        
+            self.append_expense_row(expense)
+
+        if expenses:
+            self.next_cursor = (expenses[-1]['tarih'], expenses[-1]['id'])
+        self.has_more_rows = len(expenses) == self.PAGE_SIZE
+
         self.update_totals()
+        # Tablonun yerleşimi olay döngüsünde güncellenir; kaydırma çubuğuna sonra bakılır
+        QTimer.singleShot(0, self.fill_viewport)
+
+    def fill_viewport(self):
+        """Tablo kaydırma çubuğu çıkmayacak kadar kısaysa sonraki sayfayı da ister.
+
+        Sonraki sayfa sadece kaydırmayla istendiği için ilk sayfa pencereyi doldurmazsa (yüksek pencere,
+        dar filtre) kalan kayıtlar hiç yüklenmezdi. Gizli sayfada ölçü yoktur; gösterilince tekrar bakılır.
+        """
+        if self.table.isVisible() and self.can_fetch_more() and self.table.verticalScrollBar().maximum() == 0:
+            self.fetch_more()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        QTimer.singleShot(0, self.fill_viewport)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        QTimer.singleShot(0, self.fill_viewport)
+
+    def on_page_load_failed(self, error):
+        self.fetching = False
+        QMessageBox.warning(self, "Hata", f"Kayıtlar yüklenirken hata oluştu: {error}")
+
+    def on_table_scrolled(self, value):
+        if value >= self.table.verticalScrollBar().maximum() - 5 and self.can_fetch_more():
+            self.fetch_more()
+
+    def append_expense_row(self, expense, row=None):
+        row = self.table.rowCount() if row is None else row
+        self.table.insertRow(row)
+        
+        tarih = QDate.fromString(expense['tarih'][:10], "yyyy-MM-dd").toString("dd.MM.yyyy")
+        self.table.setItem(row, 0, QTableWidgetItem(tarih))
+        
+        self.table.setItem(row, 1, QTableWidgetItem(expense['aciklama']))
+        self.table.setItem(row, 2, QTableWidgetItem(expense['para_birimi']))
+        self.table.setItem(row, 3, QTableWidgetItem(expense['odeme_turu']))
+        
+        amount_item = QTableWidgetItem(f"{expense['miktar']:.2f}")
+        amount_item.setTextAlignment(Qt.AlignRight|Qt.AlignVCenter)
+        self.table.setItem(row, 4, amount_item)
+        
+        if expense['para_birimi'] == "USD":
+            rate_item = QTableWidgetItem(f"{expense['usd_kuru']:.2f}")
+        else:
+            rate_item = QTableWidgetItem("-")
+        rate_item.setTextAlignment(Qt.AlignRight|Qt.AlignVCenter)
+        self.table.setItem(row, 5, rate_item)
+        
+        tl_item = QTableWidgetItem(f"₺{expense['tl_karsiligi']:.2f}")
+        tl_item.setTextAlignment(Qt.AlignRight|Qt.AlignVCenter)
+        self.table.setItem(row, 6, tl_item)
+        
+        self.table.item(row, 0).setData(Qt.UserRole, expense['id'])
             
     def add_expense(self):
         try:
@@ -423,7 +545,7 @@ class ExpensePageWidget(QWidget):
             else:  # TL
                 tl_amount = amount
 
-            result = self.db.add_expense(
+            fields = dict(
                 tarih=date,
                 aciklama=description,
                 para_birimi=currency,
@@ -432,17 +554,34 @@ class ExpensePageWidget(QWidget):
                 usd_kuru=usd_rate,  # Orijinal kuru kaydediyoruz
                 tl_karsiligi=tl_amount
             )
+            if self.editing_id:
+                # Düzenleme: eski kaydın pasife alınması ve yeni halin eklenmesi tek işlemde
+                result = self.db.replace_expense(self.editing_id, **fields)
+            else:
+                result = self.db.add_expense(**fields)
 
             if not result:
                 QMessageBox.critical(self, "Hata", "Gider veritabanına kaydedilemedi!")
                 return
 
-            self.load_expenses()
+            self.editing_id = None
+            if isinstance(result, QueuedWrite):
+                # Kayıt günlükte sırada; tabloya hemen eklenir, gönderilince id'sini alır
+                self.append_expense_row(result, row=0)
+                self.mark_queued_row(0, result.seq)
+                self.update_totals()
+            else:
+                self.load_expenses()
             self.description_input.clear()
             self.amount_input.clear()
             
         except ValueError:
             QMessageBox.warning(self, "Uyarı", "Lütfen geçerli bir miktar giriniz!")
+        except Exception as e:
+            # Düzenlenen kayıt bu arada silinmiş/değişmiş olabilir; tablo güncel haliyle yüklenir
+            self.editing_id = None
+            QMessageBox.critical(self, "Hata", str(e))
+            self.load_expenses()
 
     def update_tl_amounts(self):
         try:
@@ -468,6 +607,8 @@ class ExpensePageWidget(QWidget):
 
     def edit_selected_row(self):
         current_row = self.table.currentRow()
+        if current_row >= 0 and self.refuse_queued_row(current_row, "düzenlenebilir"):
+            return
         if current_row >= 0:
             # Seçili satırdaki verileri al
             date_text = self.table.item(current_row, 0).text()
@@ -476,10 +617,8 @@ class ExpensePageWidget(QWidget):
             payment_type = self.table.item(current_row, 3).text()
             amount = self.table.item(current_row, 4).text()
             
-            # Veritabanından sil
-            expense_id = self.table.item(current_row, 0).data(Qt.UserRole)
-            if expense_id:
-                self.db.delete_expense(expense_id)
+            # Kayıt, formdaki yeni hali kaydedilince değiştirilir (bkz. add_expense)
+            self.editing_id = self.table.item(current_row, 0).data(Qt.UserRole)
             
             # Form alanlarını doldur
             self.date_input.setDate(QDate.fromString(date_text, "dd.MM.yyyy"))
@@ -487,15 +626,13 @@ class ExpensePageWidget(QWidget):
             self.currency_combo.setCurrentText(currency)
             self.payment_combo.setCurrentText(payment_type)
             self.amount_input.setText(amount)
-            
-            # Tablodan satırı sil
-            self.table.removeRow(current_row)
-            self.update_totals()
         else:
             QMessageBox.information(self, "Bilgi", "Lütfen düzenlemek istediğiniz gider kaydını seçin.")
     
     def delete_selected_row(self):
         current_row = self.table.currentRow()
+        if current_row >= 0 and self.refuse_queued_row(current_row, "silinebilir"):
+            return
         if current_row >= 0:
             reply = QMessageBox.question(self, 'Silme Onayı', 
                                        'Bu gider kaydını silmek istediğinizden emin misiniz?',
@@ -514,19 +651,19 @@ class ExpensePageWidget(QWidget):
     
     
     def update_totals(self):
-        total_usd = 0
-        total_tl = 0
-        
-        for row in range(self.table.rowCount()):
-            currency = self.table.item(row, 2).text()
-            amount = float(self.table.item(row, 4).text())
-            
-            if currency == "USD":
-                total_usd += amount
-            
-            tl_text = self.table.item(row, 6).text().replace('₺', '').replace(',', '.')
-            total_tl += float(tl_text)
-        
+        """Para birimine göre toplamları sunucudaki transaction_summary'den alır.
+
+        Tablo sayfa sayfa yüklendiği için toplamlar yüklenen satırlardan değil tüm kayıtlardan hesaplanır.
+        """
+        self.db.submit("get_transaction_summary", type="expense", group_by=["para_birimi"],
+                       on_result=self.show_totals,
+                       on_error=lambda error: print(f"Gider toplamları alınamadı: {error}"),
+                       key=(id(self), "totals"))
+
+    def show_totals(self, summary):
+        total_usd = sum(row["toplam"] for row in summary if row["para_birimi"] == "USD")
+        total_tl = sum(row["tl_toplam"] for row in summary)
+
         self.total_usd_label.setText(f"Toplam USD Gider: ${total_usd:.2f}")
         self.total_tl_label.setText(f"Toplam TL Gider: ₺{total_tl:.2f}")
 
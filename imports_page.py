@@ -6,7 +6,8 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QDateEdit, QTextEdit)
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QFont, QPalette, QColor
-from database_manager import DatabaseManager
+from database_manager import DatabaseManager, PAGE_COLUMNS
+from change_feed import get_change_feed
 
 class ProductDialog(QDialog):
     def __init__(self, parent=None, product_data=None):
@@ -100,9 +101,10 @@ class ProductDialog(QDialog):
         }
 
 class ImportsPage(QMainWindow):
-    def __init__(self):
+    def __init__(self, db=None):
         super().__init__()
-        self.db = DatabaseManager()
+        self.db = db or DatabaseManager.instance()
+        self.urunler = []
         self.setWindowTitle("İthalat Takip Sistemi")
         self.setGeometry(100, 100, 1200, 600)
         
@@ -124,6 +126,7 @@ class ImportsPage(QMainWindow):
         
         self.init_ui()
         self.load_data()
+        get_change_feed().changed.connect(self.on_remote_change)
     
     def init_ui(self):
         central_widget = QWidget()
@@ -370,65 +373,69 @@ class ImportsPage(QMainWindow):
         self.tablo.setRowCount(len(self.urunler))
         
         for row, urun in enumerate(self.urunler):
-            # Ürün bilgileri
-            urun_adi_item = QTableWidgetItem(urun['urun_adi'])
-            urun_adi_item.setFont(QFont("Arial", 12, QFont.Bold))
-            urun_adi_item.setData(Qt.UserRole, urun['id'])  # ID'yi sakla
-            self.tablo.setItem(row, 0, urun_adi_item)
-            
-            miktar_item = QTableWidgetItem(urun['miktar'])
-            miktar_item.setFont(QFont("Arial", 11))
-            self.tablo.setItem(row, 1, miktar_item)
-            
-            tarih_item = QTableWidgetItem(urun['tarih'])
-            tarih_item.setFont(QFont("Arial", 11))
-            self.tablo.setItem(row, 2, tarih_item)
-            
-            notlar_item = QTableWidgetItem(urun.get('notlar', ''))
-            notlar_item.setFont(QFont("Arial", 9))
-            self.tablo.setItem(row, 5, notlar_item)
-            
-            # Durum ComboBox
-            durum_combo = QComboBox()
-            durum_combo.addItems(list(self.durum_renkleri.keys()))
-            durum_combo.setCurrentText(urun['durum'])
-            
-            # Durum değişikliğinde alt durumun güncellenmesi için bağlantı
-            durum_combo.currentTextChanged.connect(lambda text, r=row: self.durum_degistir(r, text))
-            
-            durum_rengi = self.durum_renkleri.get(urun['durum'], '#666666')
-            durum_combo.setStyleSheet(f"""
-                QComboBox {{
-                    background-color: {durum_rengi};
-                    color: white;
-                    font-weight: bold;
-                    font-size: 11px;
-                    padding: 5px;
-                    border: 1px solid #333333;
-                    border-radius: 3px;
-                    min-height: 20px;
-                    max-width: 130px;
-                }}
-                QComboBox::drop-down {{
-                    background-color: {durum_rengi};
-                    border: none;
-                    width: 18px;
-                }}
-                QComboBox QAbstractItemView {{
-                    background-color: #3c3c3c;
-                    color: white;
-                    selection-background-color: #5a5a5a;
-                    font-size: 11px;
-                    border: 1px solid #555555;
-                }}
-            """)
-            
-            self.tablo.setCellWidget(row, 3, durum_combo)
-            
-            # Alt Durum ComboBox - Güncellenmiş hali
-            alt_durum_combo = QComboBox()
-            self.update_alt_durum_combo(alt_durum_combo, urun['durum'], urun.get('alt_durum', ''))
-            self.tablo.setCellWidget(row, 4, alt_durum_combo)
+            self.satiri_doldur(row, urun)
+
+    def satiri_doldur(self, row, urun):
+        """Tablodaki tek bir satırı ithalat kaydıyla doldurur"""
+        # Ürün bilgileri
+        urun_adi_item = QTableWidgetItem(urun['urun_adi'])
+        urun_adi_item.setFont(QFont("Arial", 12, QFont.Bold))
+        urun_adi_item.setData(Qt.UserRole, urun['id'])  # ID'yi sakla
+        self.tablo.setItem(row, 0, urun_adi_item)
+        
+        miktar_item = QTableWidgetItem(urun['miktar'])
+        miktar_item.setFont(QFont("Arial", 11))
+        self.tablo.setItem(row, 1, miktar_item)
+        
+        tarih_item = QTableWidgetItem(urun['tarih'])
+        tarih_item.setFont(QFont("Arial", 11))
+        self.tablo.setItem(row, 2, tarih_item)
+        
+        notlar_item = QTableWidgetItem(urun.get('notlar', ''))
+        notlar_item.setFont(QFont("Arial", 9))
+        self.tablo.setItem(row, 5, notlar_item)
+        
+        # Durum ComboBox
+        durum_combo = QComboBox()
+        durum_combo.addItems(list(self.durum_renkleri.keys()))
+        durum_combo.setCurrentText(urun['durum'])
+        
+        # Durum değişikliğinde alt durumun güncellenmesi için bağlantı
+        durum_combo.currentTextChanged.connect(lambda text, r=row: self.durum_degistir(r, text))
+        
+        durum_rengi = self.durum_renkleri.get(urun['durum'], '#666666')
+        durum_combo.setStyleSheet(f"""
+            QComboBox {{
+                background-color: {durum_rengi};
+                color: white;
+                font-weight: bold;
+                font-size: 11px;
+                padding: 5px;
+                border: 1px solid #333333;
+                border-radius: 3px;
+                min-height: 20px;
+                max-width: 130px;
+            }}
+            QComboBox::drop-down {{
+                background-color: {durum_rengi};
+                border: none;
+                width: 18px;
+            }}
+            QComboBox QAbstractItemView {{
+                background-color: #3c3c3c;
+                color: white;
+                selection-background-color: #5a5a5a;
+                font-size: 11px;
+                border: 1px solid #555555;
+            }}
+        """)
+        
+        self.tablo.setCellWidget(row, 3, durum_combo)
+        
+        # Alt Durum ComboBox - Güncellenmiş hali
+        alt_durum_combo = QComboBox()
+        self.update_alt_durum_combo(alt_durum_combo, urun['durum'], urun.get('alt_durum', ''))
+        self.tablo.setCellWidget(row, 4, alt_durum_combo)
 
     def update_alt_durum_combo(self, combo, durum, current_alt_durum):
         combo.clear()
@@ -487,12 +494,42 @@ class ImportsPage(QMainWindow):
                 self.tablo.setRowHidden(row, True)
     
     def load_data(self):
+        self.db.submit("get_all_imports", columns=PAGE_COLUMNS["imports"],
+                       on_result=self.on_imports_loaded, on_error=self.on_imports_load_failed,
+                       key=(id(self), "load"))
+
+    def on_imports_loaded(self, urunler):
+        self.urunler = urunler
+        self.tabloyu_guncelle()
+
+    def on_remote_change(self, change):
+        """Değişiklik akışından gelen ithalat kaydını tabloya uygular (veritabanından yeniden yüklenmez)"""
+        if change["tbl"] != "imports":
+            return
         try:
-            self.urunler = self.db.get_all_imports()
-            self.tabloyu_guncelle()
+            urun = change["row"]
+            index = next((i for i, u in enumerate(self.urunler) if u.get('id') == change["row_id"]), -1)
+
+            if change["op"] == "DELETE":
+                if index < 0:
+                    return
+                # Satır düğmeleri satır numarasını tuttuğu için silmede tablo yerel listeden yeniden çizilir
+                del self.urunler[index]
+                self.tabloyu_guncelle()
+            elif index >= 0:
+                self.urunler[index] = urun
+                self.satiri_doldur(index, urun)
+            else:
+                self.urunler.append(urun)
+                self.tablo.setRowCount(len(self.urunler))
+                self.satiri_doldur(len(self.urunler) - 1, urun)
+            self.arama_yap(self.arama_kutusu.text())
         except Exception as e:
-            QMessageBox.warning(self, "Hata", f"Veri yüklenirken hata oluştu: {str(e)}")
-            self.urunler = []
+            print(f"İthalat değişikliği uygulanamadı: {e}")
+
+    def on_imports_load_failed(self, error):
+        QMessageBox.warning(self, "Hata", f"Veri yüklenirken hata oluştu: {error}")
+        self.urunler = []
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -4,15 +4,48 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
                             QComboBox, QDateEdit, QHeaderView, QMessageBox)
 from PyQt5.QtCore import QDate, QTimer, Qt
 import requests
-from database_manager import DatabaseManager  
+from database_manager import DatabaseManager, PAGE_COLUMNS
+from write_journal import QueuedWrite
+from queued_rows import QueuedRowsMixin
+from db_tasks import get_runner
+from db_retry import exchange_rate_breaker
+from transaction_import_dialog import TransactionImportDialog
 from datetime import datetime
 
-class IncomePageWidget(QWidget):
-    def __init__(self):
+
+def fetch_usd_try_rate():
+    """USD/TRY kurunu getirir (thread havuzunda çalışır); alınamazsa None döner.
+
+    Servis art arda yanıt vermezse devre açılır; sonraki denemeler beklemeden None döner.
+    """
+    try:
+        response = exchange_rate_breaker.call(
+            lambda: requests.get("https://api.exchangerate-api.com/v4/latest/USD", timeout=(2, 3)))
+        if response.status_code == 200:
+            return response.json()['rates'].get('TRY', 39.89)
+    except Exception as e:
+        print(f"Kur çekme hatası: {e}")
+    return None
+
+class IncomePageWidget(QueuedRowsMixin, QWidget):
+    # Tablo her seferinde bu kadar kayıt yükler, kalanı kaydırdıkça gelir
+    PAGE_SIZE = 50
+    # Sıradaki kayıt gönderimde reddedilirse gösterilir (bkz. queued_rows.QueuedRowsMixin)
+    QUEUED_REJECTED_MESSAGE = "Sıradaki gelir kaydı sunucu tarafından reddedildi"
+
+    def __init__(self, db=None):
         super().__init__()
-        self.db = DatabaseManager()
+        self.db = db or DatabaseManager.instance()
+        self.next_cursor = None
+        self.has_more_rows = False
+        # Sayfalar thread havuzunda gelir; tablo sıfırlanınca eski yanıtlar yok sayılır
+        self.fetching = False
+        self.load_generation = 0
+        # Düzenlenmekte olan kaydın id'si; form kaydedilince bu kaydın yerine geçer
+        self.editing_id = None
         self.setupUi()
         self.setup_timer()
+        self.watch_journal()
         self.load_exchange_rate()
         self.load_incomes_from_db()
 
@@ -338,6 +371,9 @@ class IncomePageWidget(QWidget):
         self.table.setColumnWidth(0, 100)
         self.table.setColumnWidth(2, 90)
         self.table.setColumnWidth(4, 110)
+
+        # Tablonun sonuna yaklaşıldığında sonraki sayfayı yükle
+        self.table.verticalScrollBar().valueChanged.connect(self.on_table_scrolled)
         
         main_layout.addWidget(self.table)
 
@@ -406,8 +442,27 @@ class IncomePageWidget(QWidget):
         """)
         delete_btn.clicked.connect(self.delete_selected_row)
         
+        # Toplu içe aktarma (CSV / XLSX)
+        import_btn = QPushButton("📥 İçe Aktar")
+        import_btn.setFixedSize(120, 40)
+        import_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #3498db;
+                color: white;
+                border: none;
+                padding: 10px 15px;
+                border-radius: 5px;
+                font-weight: bold;
+                font-size: 14px;
+            }
+            QPushButton:hover { background-color: #2980b9; }
+            QPushButton:pressed { background-color: #2471a3; }
+        """)
+        import_btn.clicked.connect(self.open_import_dialog)
+        
         buttons_layout.addWidget(edit_btn)
         buttons_layout.addWidget(delete_btn)
+        buttons_layout.addWidget(import_btn)
         
         self.total_tl_label = QLabel("Toplam TL: ₺0.00")
         self.total_tl_label.setStyleSheet("""
@@ -434,18 +489,18 @@ class IncomePageWidget(QWidget):
         self.timer.start(300000)  # 5 dakikada bir
 
     def load_exchange_rate(self):
-        try:
-            response = requests.get("https://api.exchangerate-api.com/v4/latest/USD", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                rate = data['rates'].get('TRY', 39.89)
-                self.exchange_rate_input.setText(str(round(rate, 2)))
-                self.last_update_label.setText(f"Son güncelleme: {QDate.currentDate().toString('dd.MM.yyyy')}")
-            else:
+        """Kuru thread havuzunda çeker; arayüz istek sırasında donmaz"""
+        get_runner().submit(fetch_usd_try_rate, on_result=self.apply_exchange_rate,
+                            on_error=lambda error: self.apply_exchange_rate(None))
+
+    def apply_exchange_rate(self, rate):
+        if rate is None:
+            # Kur alınamadı; daha önce alınan (ya da girilen) kur korunur
+            if not self.exchange_rate_input.text():
                 self.exchange_rate_input.setText("39.89")
-        except Exception as e:
-            print(f"Kur çekme hatası: {e}")
-            self.exchange_rate_input.setText("39.89")
+            return
+        self.exchange_rate_input.setText(str(round(rate, 2)))
+        self.last_update_label.setText(f"Son güncelleme: {QDate.currentDate().toString('dd.MM.yyyy')}")
 
     def on_amount_changed(self):
         pass
@@ -489,22 +544,19 @@ class IncomePageWidget(QWidget):
             pass
 
     def update_totals(self):
-        total_usd = 0
-        total_tl = 0
-        
-        for row in range(self.table.rowCount()):
-            try:
-                currency = self.table.item(row, 2).text()
-                amount = float(self.table.item(row, 3).text())
-                
-                if currency == "USD":
-                    total_usd += amount
-                
-                tl_text = self.table.item(row, 6).text().replace('₺', '').replace(',', '.')
-                total_tl += float(tl_text)
-            except (ValueError, AttributeError):
-                continue
-        
+        """Para birimine göre toplamları sunucudaki transaction_summary'den alır.
+
+        Tablo sayfa sayfa yüklendiği için toplamlar yüklenen satırlardan değil tüm kayıtlardan hesaplanır.
+        """
+        self.db.submit("get_transaction_summary", type="income", group_by=["para_birimi"],
+                       on_result=self.show_totals,
+                       on_error=lambda error: print(f"Gelir toplamları alınamadı: {error}"),
+                       key=(id(self), "totals"))
+
+    def show_totals(self, summary):
+        total_usd = sum(row["toplam"] for row in summary if row["para_birimi"] == "USD")
+        total_tl = sum(row["tl_toplam"] for row in summary)
+
         self.total_usd_label.setText(f"Toplam USD: ${total_usd:.2f}")
         self.total_tl_label.setText(f"Toplam TL: ₺{total_tl:.2f}")
 
@@ -531,7 +583,7 @@ class IncomePageWidget(QWidget):
             else:  # TL
                 tl_amount = amount
             
-            db_result = self.db.add_income(
+            fields = dict(
                 tarih=date,
                 aciklama=description,
                 para_birimi=currency,
@@ -540,21 +592,37 @@ class IncomePageWidget(QWidget):
                 usd_kuru=usd_rate,
                 tl_karsiligi=tl_amount
             )
+            if self.editing_id:
+                # Düzenleme: eski kaydın pasife alınması ve yeni halin eklenmesi tek işlemde
+                db_result = self.db.replace_income(self.editing_id, **fields)
+            else:
+                db_result = self.db.add_income(**fields)
 
             if not db_result:
                 QMessageBox.warning(self, "Hata", "Veritabanına kaydedilirken hata oluştu!")
                 return
+
+            if self.editing_id:
+                self.editing_id = None
+                self.description_input.clear()
+                self.amount_input.clear()
+                self.load_incomes_from_db()
+                return
             
             self.table.insertRow(0)
             row = 0
             
             self.table.setItem(row, 0, QTableWidgetItem(date))
+            # Yazma günlüğü açıksa kayıt sıradadır (QueuedWrite); id'sini gönderilince alır
+            self.table.item(row, 0).setData(Qt.UserRole, db_result.get('id'))
             self.table.setItem(row, 1, QTableWidgetItem(description))
             self.table.setItem(row, 2, QTableWidgetItem(currency))
             self.table.setItem(row, 3, QTableWidgetItem(f"{amount:.2f}"))
             self.table.setItem(row, 4, QTableWidgetItem(payment_type))
             self.table.setItem(row, 5, QTableWidgetItem(f"{usd_rate:.2f}" if usd_rate else "-"))
             self.table.setItem(row, 6, QTableWidgetItem(f"₺{tl_amount:.2f}"))
+            if isinstance(db_result, QueuedWrite):
+                self.mark_queued_row(row, db_result.seq)
             
             self.description_input.clear()
             self.amount_input.clear()
@@ -562,57 +630,122 @@ class IncomePageWidget(QWidget):
             self.update_totals()
         except ValueError:
             QMessageBox.warning(self, "Uyarı", "Lütfen geçerli bir miktar giriniz!")
+        except Exception as e:
+            # Düzenlenen kayıt bu arada silinmiş/değişmiş olabilir; tablo güncel haliyle yüklenir
+            if self.editing_id:
+                self.editing_id = None
+                self.load_incomes_from_db()
+            QMessageBox.warning(self, "Hata", str(e))
 
     def load_incomes_from_db(self):
-  
-        incomes = sorted(self.db.get_all_incomes(), key=lambda x: x['id'], reverse=True)
+        """Tabloyu sıfırlar ve sadece ilk sayfayı yükler"""
         self.table.setRowCount(0)
+        self.next_cursor = None
+        self.has_more_rows = True
+        self.fetching = False
+        self.load_generation += 1
+        self.fetch_more()
+
+    def open_import_dialog(self):
+        """CSV/XLSX dosyasından toplu kayıt ekler; bitince tablo baştan yüklenir"""
+        dialog = TransactionImportDialog(self.db, "income", self)
+        if dialog.exec_() == dialog.Accepted and dialog.imported_count:
+            self.load_incomes_from_db()
+
+    def can_fetch_more(self):
+        """QAbstractItemModel.canFetchMore karşılığı: yüklenmemiş kayıt kaldı mı?"""
+        return self.has_more_rows and not self.fetching
+
+    def fetch_more(self):
+        """QAbstractItemModel.fetchMore karşılığı: (tarih, id) imlecinden sonraki sayfayı ekler"""
+        if not self.can_fetch_more():
+            return
+
+        self.fetching = True
+        generation = self.load_generation
+        self.db.submit("get_all_incomes", page_size=self.PAGE_SIZE, cursor=self.next_cursor,
+                       columns=PAGE_COLUMNS["income"],
+                       on_result=lambda incomes: self.on_page_loaded(incomes, generation),
+                       on_error=self.on_page_load_failed,
+                       key=(id(self), "page"))
+
+    def on_page_loaded(self, incomes, generation):
+        if generation != self.load_generation:
+            return
+        self.fetching = False
 
         for income in incomes:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
+            self.append_income_row(income)
+
+        if incomes:
+            self.next_cursor = (incomes[-1]['tarih'], incomes[-1]['id'])
+        self.has_more_rows = len(incomes) == self.PAGE_SIZE
 
-            date_obj = datetime.strptime(income['tarih'], "%Y-%m-%d")
-            date_str = date_obj.strftime("%d.%m.%Y")
-            
-            self.table.setItem(row, 0, QTableWidgetItem(date_str))
-            self.table.setItem(row, 1, QTableWidgetItem(income['aciklama']))
-            self.table.setItem(row, 2, QTableWidgetItem(income['para_birimi']))
-            self.table.setItem(row, 3, QTableWidgetItem(f"{income['miktar']:.2f}"))
-            self.table.setItem(row, 4, QTableWidgetItem(income.get('odeme_turu', 'Nakit')))
-
-            if income['usd_kuru']:
-                self.table.setItem(row, 5, QTableWidgetItem(f"{income['usd_kuru']:.2f}"))
-            else:
-                self.table.setItem(row, 5, QTableWidgetItem("-"))
-            if income['tl_karsiligi']:
-                self.table.setItem(row, 6, QTableWidgetItem(f"₺{income['tl_karsiligi']:.2f}"))
-            else:
-                self.recalculate_row(row)
-        
         self.update_totals()
+        # Tablonun yerleşimi olay döngüsünde güncellenir; kaydırma çubuğuna sonra bakılır
+        QTimer.singleShot(0, self.fill_viewport)
 
-        
+    def fill_viewport(self):
+        """Tablo kaydırma çubuğu çıkmayacak kadar kısaysa sonraki sayfayı da ister.
+
+        Sonraki sayfa sadece kaydırmayla istendiği için ilk sayfa pencereyi doldurmazsa (yüksek pencere,
+        dar filtre) kalan kayıtlar hiç yüklenmezdi. Gizli sayfada ölçü yoktur; gösterilince tekrar bakılır.
+        """
+        if self.table.isVisible() and self.can_fetch_more() and self.table.verticalScrollBar().maximum() == 0:
+            self.fetch_more()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        QTimer.singleShot(0, self.fill_viewport)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        QTimer.singleShot(0, self.fill_viewport)
+
+    def on_page_load_failed(self, error):
+        self.fetching = False
+        QMessageBox.warning(self, "Hata", f"Kayıtlar yüklenirken hata oluştu: {error}")
+
+    def on_table_scrolled(self, value):
+        if value >= self.table.verticalScrollBar().maximum() - 5 and self.can_fetch_more():
+            self.fetch_more()
+
+    def append_income_row(self, income):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+
+        date_obj = datetime.strptime(income['tarih'], "%Y-%m-%d")
+        date_str = date_obj.strftime("%d.%m.%Y")
+        
+        self.table.setItem(row, 0, QTableWidgetItem(date_str))
+        self.table.item(row, 0).setData(Qt.UserRole, income.get('id'))
+        self.table.setItem(row, 1, QTableWidgetItem(income['aciklama']))
+        self.table.setItem(row, 2, QTableWidgetItem(income['para_birimi']))
+        self.table.setItem(row, 3, QTableWidgetItem(f"{income['miktar']:.2f}"))
+        self.table.setItem(row, 4, QTableWidgetItem(income.get('odeme_turu', 'Nakit')))
+
+        if income['usd_kuru']:
+            self.table.setItem(row, 5, QTableWidgetItem(f"{income['usd_kuru']:.2f}"))
+        else:
+            self.table.setItem(row, 5, QTableWidgetItem("-"))
+        if income['tl_karsiligi']:
+            self.table.setItem(row, 6, QTableWidgetItem(f"₺{income['tl_karsiligi']:.2f}"))
+        else:
+            self.recalculate_row(row)
 
     def delete_selected_row(self):
         current_row = self.table.currentRow()
+        if current_row >= 0 and self.refuse_queued_row(current_row, "silinebilir"):
+            return
         if current_row >= 0:
             reply = QMessageBox.question(self, 'Silme Onayı', 
                                     'Bu gelir kaydını silmek istediğinizden emin misiniz?',
                                     QMessageBox.Yes | QMessageBox.No, 
                                     QMessageBox.No)
             if reply == QMessageBox.Yes:
-                # Veritabanından silme işlemi
-                income_data = []
-                for col in range(self.table.columnCount()):
-                    item = self.table.item(current_row, col)
-                    if item:
-                        income_data.append(item.text())
-
-                if len(income_data) > 1:
-                    incomes = self.db.search_incomes(income_data[1])
-                    if incomes:
-                        self.db.delete_income(incomes[0]['id'])  # veya update_income ile aktif=False
+                income_id = self.table.item(current_row, 0).data(Qt.UserRole)
+                if income_id:
+                    self.db.delete_income(income_id)
                 
                 self.table.removeRow(current_row)
                 self.update_totals()
@@ -621,6 +754,8 @@ class IncomePageWidget(QWidget):
 
     def edit_selected_row(self):
         current_row = self.table.currentRow()
+        if current_row >= 0 and self.refuse_queued_row(current_row, "düzenlenebilir"):
+            return
         if current_row >= 0:
             # Seçili satırdaki verileri al
             date_text = self.table.item(current_row, 0).text()
@@ -629,17 +764,8 @@ class IncomePageWidget(QWidget):
             amount = self.table.item(current_row, 3).text()
             payment_type = self.table.item(current_row, 4).text()
             
-            # Veritabanından sil (veya pasif hale getir)
-            income_data = []
-            for col in range(self.table.columnCount()):
-                item = self.table.item(current_row, col)
-                if item:
-                    income_data.append(item.text())
-            
-            if len(income_data) > 1:
-                incomes = self.db.search_incomes(income_data[1])
-                if incomes:
-                    self.db.delete_income(incomes[0]['id'])  # veya update_income ile aktif=False
+            # Kayıt, formdaki yeni hali kaydedilince değiştirilir (bkz. add_income)
+            self.editing_id = self.table.item(current_row, 0).data(Qt.UserRole)
             
             # Form alanlarını doldur
             self.date_input.setDate(QDate.fromString(date_text, "dd.MM.yyyy"))
@@ -647,10 +773,6 @@ class IncomePageWidget(QWidget):
             self.currency_combo.setCurrentText(currency)
             self.amount_input.setText(amount)
             self.payment_combo.setCurrentText(payment_type)
-            
-            # Tablodan satırı sil
-            self.table.removeRow(current_row)
-            self.update_totals()
         else:
             QMessageBox.information(self, "Bilgi", "Lütfen düzenlemek istediğiniz gelir kaydını seçin.")
 
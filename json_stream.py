@@ -0,0 +1,62 @@
+# json_stream.py
+"""
+PostgREST yanıtlarını gövdenin tamamını beklemeden çözmek için yardımcılar.
+
+PostgREST okuma yanıtı bir JSON dizisidir ([{...}, {...}, ...]). iter_json_array,
+HTTP gövdesinden gelen bayt parçalarını okudukça dizideki nesneleri tek tek döndürür;
+bellekte gövdenin tamamı ya da satırların ikinci bir kopyası tutulmaz.
+batched, satırları sayfalara aktarılacak gruplara böler.
+"""
+import codecs
+import json
+
+_WHITESPACE = " \t\r\n"
+
+
+def iter_json_array(chunks):
+    """Bayt parçalarından (ör. httpx response.iter_bytes()) JSON dizisinin elemanlarını sırayla üretir"""
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer, pos, started = "", 0, False
+
+    for chunk in chunks:
+        buffer = buffer[pos:] + utf8.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE + ",":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError(f"JSON dizisi bekleniyordu: {buffer[pos:pos + 40]!r}")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Eleman henüz tamamlanmadı; sonraki parçayı bekle
+                break
+            if end == len(buffer) and not isinstance(item, (dict, list)):
+                # Parçanın sonunda biten sayı/literal devam ediyor olabilir
+                break
+            pos = end
+            yield item
+
+    # "]" gelmeden gövde bitti
+    raise ValueError("JSON dizisi eksik bitti")
+
+
+def batched(items, size):
+    """Öğeleri en fazla size elemanlı listeler halinde üretir"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,404 @@
+# local_replica.py
+"""
+Sık okunan tabloların yerel SQLite kopyası.
+
+LOCAL_REPLICA_PATH ortam değişkeni verilirse DatabaseManager.instance() bir
+LocalReplica bağlar. Ana pencere açılınca arka plandaki thread tabloları
+Supabase'den çeker; ilk eşitlemesi tamamlanan tablodaki okumalar ağa gitmeden
+SQLite'tan cevaplanır.
+
+Eşitleme artımlıdır: her tablo için görülen en büyük (updated_at, id) değeri
+saklanır ve sonraki turda sadece bundan yeni satırlar istenir (updated_at
+sütunu ve tetikleyicisi: migrations/0005_replica_updated_at.sql). Sunucuda silinen
+satırlar her RECONCILE_EVERY turda bir, sadece (id, updated_at) indirilerek
+tespit edilir. DatabaseManager'ın kendi yazmaları apply() ile hemen kopyaya
+işlenir.
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+
+REPLICA_TABLES = ["transactions", "stock_table", "daily_orders", "contacts", "imports"]
+
+# Sık filtrelenen sütunlar için ifade indeksleri
+INDEXED_COLUMNS = {
+    "transactions": ["tarih", "odeme_turu"],
+    "stock_table": ["urun_kodu"],
+    "daily_orders": ["order_date"],
+}
+
+SYNC_PAGE_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def _column(name):
+    """SQLite'ta JSON olarak saklanan satırdaki sütun ifadesi"""
+    if not re.match(r"^\w+$", name):
+        raise ValueError(f"Geçersiz sütun adı: {name}")
+    return f"json_extract(data, '$.{name}')"
+
+
+def _param(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _is_number(value):
+    return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+
+
+def _compared_column(name, value):
+    """Filtrede karşılaştırılacak sütun ifadesi.
+
+    numeric sütunlar JSON'a metin olarak yazılmış olabilir (json.dumps(default=str) ile Decimal);
+    değer sayıysa sütun da sayıya çevrilir, böylece PostgREST gibi sayısal karşılaştırılır.
+    """
+    if _is_number(value):
+        return f"cast({_column(name)} as real)"
+    return _column(name)
+
+
+def _like(pattern, value):
+    regex = "^" + re.escape(str(pattern)).replace("%", ".*").replace("_", ".") + "$"
+    return re.match(regex, str(value), re.IGNORECASE | re.DOTALL) is not None
+
+
+def _coerce(value, sample):
+    """PostgREST ifadesindeki (metin) değeri satırdaki değerin tipine çevirir"""
+    if sample is None or isinstance(sample, str):
+        return value
+    if isinstance(sample, bool):
+        return value.lower() == "true"
+    try:
+        return type(sample)(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _split_top_level(expression):
+    parts, depth, current = [], 0, ""
+    for char in expression:
+        if char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current += char
+    parts.append(current)
+    return parts
+
+
+@lru_cache(maxsize=128)
+def _logic_expression(expression, mode="or"):
+    """PostgREST or=/and= ifadesini satır -> bool fonksiyonuna çevirir"""
+    checks = []
+    for part in _split_top_level(expression):
+        part = part.strip()
+        match = re.match(r"^(and|or)\((.*)\)$", part)
+        if match:
+            checks.append(_logic_expression(match.group(2), match.group(1)))
+            continue
+        column, op, value = part.split(".", 2)
+        checks.append(lambda row, column=column, op=op, value=value: _compare(op, row.get(column), value))
+
+    def evaluate(row):
+        results = (check(row) for check in checks)
+        return all(results) if mode == "and" else any(results)
+
+    return evaluate
+
+
+def _compare(op, row_value, value):
+    if op == "is":
+        return row_value is None if value == "null" else row_value is _coerce(value, True)
+    if row_value is None:
+        return False
+    value = _coerce(value, row_value)
+    try:
+        if op == "eq":
+            return row_value == value
+        if op == "neq":
+            return row_value != value
+        if op == "gt":
+            return row_value > value
+        if op == "gte":
+            return row_value >= value
+        if op == "lt":
+            return row_value < value
+        if op == "lte":
+            return row_value <= value
+    except TypeError:
+        return False
+    if op in ("like", "ilike"):
+        return _like(value.replace("*", "%"), row_value)
+    raise ValueError(f"Desteklenmeyen operatör: {op}")
+
+
+def _sql_ilike(value, pattern):
+    return value is not None and _like(pattern, value)
+
+
+def _sql_logic(expression, data):
+    return _logic_expression(expression)(json.loads(data))
+
+
+class LocalReplica:
+    """Supabase tablolarının SQLite kopyası ve arka plan eşitleyicisi"""
+
+    def __init__(self, path, supabase, tables=REPLICA_TABLES, interval=30.0, reconcile_every=10):
+        self.path = path
+        self.supabase = supabase
+        self.tables = list(tables)
+        self.interval = interval
+        self.reconcile_every = reconcile_every
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._cycles = 0
+        # İlk eşitlemesi bitmemiş ya da bir yazma sonrası güncelliği bilinmeyen tablolar
+        # SQLite'tan cevaplanmaz
+        self._ready = set()
+        self._stale = {}
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.create_function("pg_ilike", 2, _sql_ilike, deterministic=True)
+        self.conn.create_function("pg_logic", 2, _sql_logic, deterministic=True)
+        if path != ":memory:":
+            self.conn.execute("pragma journal_mode=wal")
+        self._create_schema()
+
+    @classmethod
+    def from_env(cls, supabase):
+        """LOCAL_REPLICA_PATH verilmişse bir LocalReplica, yoksa None döndürür"""
+        path = os.getenv("LOCAL_REPLICA_PATH")
+        if not path:
+            return None
+        return cls(path, supabase,
+                   interval=float(os.getenv("LOCAL_REPLICA_INTERVAL", "30")),
+                   reconcile_every=int(os.getenv("LOCAL_REPLICA_RECONCILE_EVERY", "10")))
+
+    def _create_schema(self):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                create table if not exists sync_state (
+                    tbl text primary key,
+                    watermark_at text,
+                    watermark_id integer,
+                    synced_at real
+                )
+            """)
+            for table in self.tables:
+                self.conn.execute(f"""
+                    create table if not exists "{table}" (
+                        id integer primary key,
+                        updated_at text,
+                        data text not null
+                    )
+                """)
+                for column in INDEXED_COLUMNS.get(table, []):
+                    self.conn.execute(f'create index if not exists "{table}_{column}" on "{table}" ({_column(column)})')
+
+    # ----- okuma ----- #
+
+    def is_ready(self, table):
+        return table in self._ready and table not in self._stale
+
+    def query(self, table, columns=None, filters=(), order=(), limit=None):
+        """DatabaseManager._read sorgusunu SQLite'tan cevaplar.
+
+        Tablo hazır değilse ya da filtre yerelde çalıştırılamıyorsa None döner;
+        bu durumda okuma Supabase'e gider.
+        """
+        if table not in self.tables or not self.is_ready(table):
+            return None
+
+        where, params = [], []
+        for op, column, value in filters:
+            if op == "or_":
+                where.append("pg_logic(?, data)")
+                params.append(value)
+            elif op in ("eq", "neq", "gt", "gte", "lt", "lte"):
+                sql_op = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}[op]
+                where.append(f"{_compared_column(column, value)} {sql_op} ?")
+                params.append(_param(value))
+            elif op == "in_":
+                values = list(value)
+                expression = _compared_column(column, values[0]) if values and all(map(_is_number, values)) \
+                    else _column(column)
+                where.append(f"{expression} in ({','.join('?' * len(values))})" if values else "0")
+                params.extend(_param(v) for v in values)
+            elif op == "ilike":
+                where.append(f"pg_ilike({_column(column)}, ?)")
+                params.append(value)
+            else:
+                return None
+
+        sql = f'select data from "{table}"'
+        if where:
+            sql += " where " + " and ".join(where)
+        if order:
+            # PostgreSQL'deki gibi: artan sırada NULL'lar sonda, azalan sırada başta
+            sql += " order by " + ", ".join(
+                f"{_column(column)} is null {'desc' if desc else 'asc'}, {_column(column)} {'desc' if desc else 'asc'}"
+                for column, desc in order)
+        if limit:
+            sql += f" limit {int(limit)}"
+
+        with self._lock:
+            rows = [json.loads(data) for (data,) in self.conn.execute(sql, params)]
+
+        if columns in (None, "", "*"):
+            return rows
+        if isinstance(columns, str):
+            columns = [column.strip() for column in columns.split(",")]
+        return [{column: row.get(column) for column in columns} for row in rows]
+
+    # ----- yazma ----- #
+
+    def _upsert(self, table, rows, merge=False):
+        """Satırları kopyaya yazar. Eşitlemeden gelen eski bir sürüm, yereldeki yeni sürümün üstüne yazılmaz."""
+        if merge:
+            ids = [row["id"] for row in rows]
+            existing = dict(self.conn.execute(
+                f'select id, data from "{table}" where id in ({",".join("?" * len(ids))})', ids))
+            rows = [{**json.loads(existing[row["id"]]), **row} if row["id"] in existing else row for row in rows]
+        self.conn.executemany(f"""
+            insert into "{table}" (id, updated_at, data) values (?, ?, ?)
+            on conflict (id) do update set updated_at = excluded.updated_at, data = excluded.data
+            where excluded.updated_at is null or "{table}".updated_at is null
+               or excluded.updated_at >= "{table}".updated_at
+        """, [(row["id"], row.get("updated_at"), json.dumps(row, default=str)) for row in rows])
+
+    def apply(self, table, rows=None, deleted=False):
+        """DatabaseManager'ın yaptığı bir yazmayı kopyaya işler.
+
+        rows verilmezse ya da satırlarda id yoksa (ör. returning="minimal" ile toplu ekleme)
+        tablo bir sonraki eşitlemeye kadar SQLite'tan cevaplanmaz.
+        """
+        if table not in self.tables:
+            return
+        if rows == []:
+            return
+        with self._lock, self.conn:
+            if rows is None or any(row.get("id") is None for row in rows):
+                self._stale[table] = self._stale.get(table, 0) + 1
+                self._wake.set()
+                return
+            if deleted:
+                self.conn.executemany(f'delete from "{table}" where id = ?', [(row["id"],) for row in rows])
+            else:
+                self._upsert(table, rows, merge=True)
+
+    # ----- eşitleme ----- #
+
+    def _state(self, table):
+        row = self.conn.execute("select watermark_at, watermark_id from sync_state where tbl = ?", (table,)).fetchone()
+        return row or (None, None)
+
+    def sync_table(self, table):
+        """Son eşitlemeden bu yana değişen satırları çeker; çekilen satır sayısını döndürür"""
+        with self._lock:
+            stale_marker = self._stale.get(table)
+            watermark_at, watermark_id = self._state(table)
+        fetched = 0
+        while True:
+            query = self.supabase.table(table).select("*")
+            if watermark_at is not None:
+                query = query.or_(f"updated_at.gt.{watermark_at},"
+                                  f"and(updated_at.eq.{watermark_at},id.gt.{watermark_id})")
+            rows = query.order("updated_at").order("id").limit(SYNC_PAGE_SIZE).execute().data or []
+            if rows:
+                watermark_at, watermark_id = rows[-1]["updated_at"], rows[-1]["id"]
+            with self._lock, self.conn:
+                self._upsert(table, rows)
+                self.conn.execute("""
+                    insert into sync_state (tbl, watermark_at, watermark_id, synced_at) values (?, ?, ?, ?)
+                    on conflict (tbl) do update set watermark_at = excluded.watermark_at,
+                        watermark_id = excluded.watermark_id, synced_at = excluded.synced_at
+                """, (table, watermark_at, watermark_id, time.time()))
+            fetched += len(rows)
+            if len(rows) < SYNC_PAGE_SIZE:
+                break
+
+        with self._lock:
+            self._ready.add(table)
+            # Eşitleme sürerken yeni bir yazma gelmediyse tablo tekrar güncel sayılır
+            if stale_marker is not None and self._stale.get(table) == stale_marker:
+                del self._stale[table]
+        return fetched
+
+    def reconcile_table(self, table):
+        """Sunucuda silinmiş satırları kopyadan siler; kaçırılmış güncellemeleri yeniden çeker"""
+        remote, last_id = {}, None
+        while True:
+            query = self.supabase.table(table).select("id,updated_at")
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            rows = query.order("id").limit(SYNC_PAGE_SIZE).execute().data or []
+            remote.update((row["id"], row["updated_at"]) for row in rows)
+            if len(rows) < SYNC_PAGE_SIZE:
+                break
+            last_id = rows[-1]["id"]
+
+        with self._lock:
+            local = dict(self.conn.execute(f'select id, updated_at from "{table}"'))
+        removed = [(row_id,) for row_id in local if row_id not in remote]
+        changed = [row_id for row_id, updated_at in remote.items() if local.get(row_id) != updated_at]
+
+        for start in range(0, len(changed), SYNC_PAGE_SIZE):
+            rows = self.supabase.table(table).select("*")\
+                .in_("id", changed[start:start + SYNC_PAGE_SIZE]).execute().data or []
+            with self._lock, self.conn:
+                self._upsert(table, rows)
+        with self._lock, self.conn:
+            self.conn.executemany(f'delete from "{table}" where id = ?', removed)
+        return len(removed), len(changed)
+
+    def sync_all(self):
+        """Tüm tabloları bir tur eşitler"""
+        reconcile = self.reconcile_every and self._cycles % self.reconcile_every == self.reconcile_every - 1
+        for table in self.tables:
+            try:
+                self.sync_table(table)
+                if reconcile:
+                    self.reconcile_table(table)
+            except Exception as e:
+                logger.warning(f"{table} yerel kopyası eşitlenemedi: {e}")
+        self._cycles += 1
+
+    def start(self):
+        """Eşitleme thread'ini başlatır (GUI thread'ini bloklamaz)"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="local-replica-sync", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sync_all()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        with self._lock:
+            self._ready.clear()
+            self.conn.close()
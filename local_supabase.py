@@ -0,0 +1,786 @@
+# local_supabase.py
+"""
+Supabase istemcisinin bellek içi (yerel) karşılığı.
+
+Testlerde supabase_client.supabase yerine kullanılır. DatabaseManager'ın
+kullandığı sorgu zinciri (table().select().eq()...execute(), rpc()) aynı
+şekilde çalışır; tablolar bellekte tutulur ve her execute() çağrısı
+`requests` listesine PostgREST parametreleriyle (select=, filtreler) kaydedilir.
+"""
+import copy
+import json
+import re
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+import httpx
+from postgrest.exceptions import APIError
+
+
+class LocalResponse:
+    """postgrest APIResponse karşılığı"""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _coerce(value, sample):
+    """PostgREST filtre değerini (metin) tablodaki değerin tipine çevirir"""
+    if isinstance(value, str) and sample is not None and not isinstance(sample, str):
+        if isinstance(sample, bool):
+            return value.lower() == "true"
+        try:
+            return type(sample)(value)
+        except (TypeError, ValueError):
+            return value
+    return value
+
+
+def _like(pattern, value, case_insensitive):
+    regex = "^" + re.escape(pattern).replace("%", ".*").replace("_", ".") + "$"
+    flags = re.IGNORECASE if case_insensitive else 0
+    return value is not None and re.match(regex, str(value), flags) is not None
+
+
+def _compare(op, row_value, value):
+    value = _coerce(value, row_value)
+    if op == "eq":
+        return row_value == value
+    if op == "neq":
+        return row_value != value
+    if op == "is":
+        if value in (None, "null"):
+            return row_value is None
+        return row_value is _coerce(value, True)
+    if row_value is None:
+        return False
+    if op == "gt":
+        return row_value > value
+    if op == "gte":
+        return row_value >= value
+    if op == "lt":
+        return row_value < value
+    if op == "lte":
+        return row_value <= value
+    if op == "in":
+        return row_value in [_coerce(v, row_value) for v in value]
+    if op == "like":
+        return _like(value, row_value, False)
+    if op == "ilike":
+        return _like(value, row_value, True)
+    raise ValueError(f"Desteklenmeyen filtre: {op}")
+
+
+def _split_top_level(expression):
+    """'a.eq.1,and(b.eq.2,c.eq.3)' ifadesini üst seviyedeki virgüllerden böler"""
+    parts, depth, current = [], 0, ""
+    for char in expression:
+        if char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _logic_tree(expression):
+    """PostgREST or=/and= söz dizimini (sütun, değer) -> bool fonksiyonuna çevirir"""
+    conditions = []
+    for part in _split_top_level(expression):
+        part = part.strip()
+        match = re.match(r"^(and|or)\((.*)\)$", part)
+        if match:
+            conditions.append((match.group(1), _logic_tree(match.group(2))))
+            continue
+        column, op, value = part.split(".", 2)
+        conditions.append(("filter", (column, op, value)))
+
+    def evaluate(row, mode):
+        results = []
+        for kind, payload in conditions:
+            if kind == "filter":
+                column, op, value = payload
+                results.append(_compare(op, row.get(column), value))
+            else:
+                results.append(payload(row, kind))
+        return all(results) if mode == "and" else any(results)
+
+    return evaluate
+
+
+class LocalQuery:
+    """postgrest SyncRequestBuilder zincirinin bellek içi karşılığı"""
+
+    def __init__(self, client, table_name):
+        self.client = client
+        self.table_name = table_name
+        self.method = "GET"
+        self.columns = "*"
+        self.count = None
+        self.head = False
+        self.payload = None
+        self.upsert_options = {}
+        self.returning = "representation"
+        self.filters = []
+        self.params = {}
+        self.orders = []
+        self.limit_count = None
+        self.offset = 0
+        self.single_row = False
+
+    # ----- işlem türleri ----- #
+
+    def select(self, *columns, count=None, head=None):
+        self.columns = ",".join(columns) if columns else "*"
+        self.count = count
+        self.head = bool(head)
+        self.params["select"] = self.columns
+        return self
+
+    def insert(self, json, returning="representation", **kwargs):
+        self.method = "POST"
+        self.payload = json
+        self.returning = returning
+        return self
+
+    def upsert(self, json, on_conflict="", ignore_duplicates=False, returning="representation", **kwargs):
+        self.method = "POST"
+        self.payload = json
+        self.returning = returning
+        self.upsert_options = {"on_conflict": on_conflict, "ignore_duplicates": ignore_duplicates}
+        self.params["on_conflict"] = on_conflict
+        return self
+
+    def update(self, json, **kwargs):
+        self.method = "PATCH"
+        self.payload = json
+        return self
+
+    def delete(self, **kwargs):
+        self.method = "DELETE"
+        return self
+
+    # ----- filtreler ----- #
+
+    def _filter(self, column, op, value):
+        self.filters.append(lambda row: _compare(op, row.get(column), value))
+        shown = f"({','.join(str(v) for v in value)})" if op == "in" else value
+        self.params.setdefault(column, [])
+        self.params[column].append(f"{op}.{shown}")
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "neq", value)
+
+    def gt(self, column, value):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._filter(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "lte", value)
+
+    def in_(self, column, values):
+        return self._filter(column, "in", list(values))
+
+    def like(self, column, pattern):
+        return self._filter(column, "like", pattern)
+
+    def ilike(self, column, pattern):
+        return self._filter(column, "ilike", pattern)
+
+    def is_(self, column, value):
+        return self._filter(column, "is", value)
+
+    def or_(self, filters, reference_table=None):
+        evaluate = _logic_tree(filters)
+        self.filters.append(lambda row: evaluate(row, "or"))
+        self.params["or"] = f"({filters})"
+        return self
+
+    # ----- sıralama / sınırlama ----- #
+
+    def order(self, column, desc=False, nullsfirst=None, foreign_table=None):
+        self.orders.append((column, desc))
+        self.params["order"] = ",".join(f"{c}.{'desc' if d else 'asc'}" for c, d in self.orders)
+        return self
+
+    def limit(self, size, foreign_table=None):
+        self.limit_count = size
+        self.params["limit"] = str(size)
+        return self
+
+    def range(self, start, end, foreign_table=None):
+        self.offset = start
+        self.limit_count = end - start + 1
+        self.params["offset"] = str(start)
+        self.params["limit"] = str(self.limit_count)
+        return self
+
+    def single(self):
+        self.single_row = True
+        return self
+
+    # ----- çalıştırma ----- #
+
+    def iter_bytes(self, chunk_size=4096):
+        """Yanıt gövdesini HTTP'deki gibi parça parça döndürür (akışla okuma için)"""
+        body = json.dumps(self.execute().data, ensure_ascii=False, default=str).encode("utf-8")
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+    @property
+    def request(self):
+        """postgrest RequestConfig karşılığı (db_metrics.describe_query için)"""
+        params = [(key, item) for key, value in self.params.items()
+                  for item in (value if isinstance(value, list) else [value])]
+        return SimpleNamespace(path=f"/rest/v1/{self.table_name}", http_method=self.method,
+                               params=httpx.QueryParams(params), json=self.payload)
+
+    def _project(self, row):
+        if self.columns in ("*", ""):
+            return copy.deepcopy(row)
+        selected = {}
+        for column in self.columns.split(","):
+            column = column.strip()
+            if column == "count":
+                continue
+            selected[column] = copy.deepcopy(row.get(column))
+        return selected
+
+    def _matching(self, rows):
+        return [row for row in rows if all(check(row) for check in self.filters)]
+
+    def execute(self):
+        self.client.requests.append({
+            "method": self.method,
+            "table": self.table_name,
+            "params": dict(self.params),
+            "head": self.head,
+            "payload": copy.deepcopy(self.payload)
+        })
+        rows = self.client.tables.setdefault(self.table_name, [])
+
+        if self.method == "GET":
+            matched = self._matching(rows)
+            for column, desc in reversed(self.orders):
+                matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+            total = len(matched)
+            if self.limit_count is not None:
+                matched = matched[self.offset:self.offset + self.limit_count]
+            data = [] if self.head else [self._project(row) for row in matched]
+            if self.single_row:
+                if len(data) != 1:
+                    raise Exception("JSON object requested, multiple (or no) rows returned")
+                data = data[0]
+            return LocalResponse(data, total if self.count else None)
+
+        if self.method == "POST":
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            inserted = []
+            for item in payload:
+                conflict = self.upsert_options.get("on_conflict") or ("id" if self.upsert_options else None)
+                existing = None
+                if conflict and item.get(conflict) is not None:
+                    existing = next((row for row in rows if row.get(conflict) == item[conflict]), None)
+                if existing is not None:
+                    if self.upsert_options.get("ignore_duplicates"):
+                        continue
+                    old_row = copy.deepcopy(existing)
+                    existing.update(copy.deepcopy(item))
+                    self.client._apply_defaults(self.table_name, existing, update=True)
+                    self.client._log_change(self.table_name, "UPDATE", existing, old_row)
+                    inserted.append(self._project(existing))
+                    continue
+                row = copy.deepcopy(item)
+                self.client._apply_defaults(self.table_name, row)
+                rows.append(row)
+                self.client._log_change(self.table_name, "INSERT", row)
+                inserted.append(self._project(row))
+            return LocalResponse([] if self.returning == "minimal" else inserted)
+
+        if self.method == "PATCH":
+            updated = []
+            for row in self._matching(rows):
+                old_row = copy.deepcopy(row)
+                row.update(copy.deepcopy(self.payload))
+                self.client._apply_defaults(self.table_name, row, update=True)
+                self.client._log_change(self.table_name, "UPDATE", row, old_row)
+                updated.append(self._project(row))
+            return LocalResponse(updated)
+
+        if self.method == "DELETE":
+            matched = self._matching(rows)
+            self.client.tables[self.table_name] = [
+                row for row in rows if not any(row is deleted for deleted in matched)
+            ]
+            for row in matched:
+                self.client._log_change(self.table_name, "DELETE", row)
+            return LocalResponse([self._project(row) for row in matched])
+
+        raise ValueError(f"Desteklenmeyen işlem: {self.method}")
+
+
+class LocalRpc:
+    """supabase.rpc(...) çağrısının bellek içi karşılığı"""
+
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params
+        self.columns = None
+
+    def select(self, *columns):
+        """Tablo satırı döndüren fonksiyonlarda select= projeksiyonu"""
+        self.columns = ",".join(columns)
+        return self
+
+    @property
+    def request(self):
+        query = {"select": self.columns} if self.columns else {}
+        return SimpleNamespace(path=f"/rest/v1/rpc/{self.name}", http_method="POST",
+                               params=httpx.QueryParams(query), json=self.params)
+
+    def execute(self):
+        self.client.requests.append({
+            "method": "RPC",
+            "table": self.name,
+            "params": copy.deepcopy(self.params),
+            "select": self.columns,
+            "payload": None
+        })
+        if self.name not in self.client.functions:
+            raise Exception(f"Could not find the function public.{self.name}")
+        data = self.client.functions[self.name](self.client, **self.params)
+        if self.columns and self.columns != "*" and isinstance(data, list):
+            columns = [column.strip() for column in self.columns.split(",")]
+            data = [{column: row.get(column) for column in columns} for row in data]
+        return LocalResponse(data)
+
+
+# ------------------ SUNUCU FONKSİYONLARININ YEREL KARŞILIKLARI ------------------ #
+
+def account_balances(client, p_start_date, p_end_date):
+    """migrations/0002_account_balances.sql karşılığı"""
+    totals = {}
+    for row in client.tables.get("transactions", []):
+        if not row.get("aktif", True) or not (p_start_date <= row["tarih"] <= p_end_date):
+            continue
+        key = (row["odeme_turu"], row["type"])
+        totals[key] = totals.get(key, 0.0) + float(row.get("tl_karsiligi") or 0)
+    return [{"odeme_turu": account, "type": type, "toplam": total}
+            for (account, type), total in totals.items()]
+
+
+def reserve_stock_and_add_order(client, p_product_code, p_customer_name, p_product_name,
+                                p_quantity, p_unit_price, p_is_real_order, p_order_date, p_idempotency_key=None):
+    """migrations/0011_idempotency_keys.sql'deki reserve_stock_and_add_order karşılığı (kilit ile tek işlem)"""
+    with client.lock:
+        if p_quantity <= 0 or p_unit_price <= 0:
+            raise Exception("Miktar ve birim fiyat pozitif olmalıdır")
+        stock = next((row for row in client.tables.get("stock_table", [])
+                      if row.get("urun_kodu") == p_product_code), None)
+        if stock is None:
+            raise Exception("Ürün stokta bulunamadı")
+        existing = p_idempotency_key and next((row for row in client.tables.get("daily_orders", [])
+                                               if row.get("idempotency_key") == p_idempotency_key), None)
+        if existing:
+            # Aynı anahtarla tekrar: sipariş zaten eklendi, stok tekrar düşülmez
+            return {
+                "order": copy.deepcopy(existing),
+                "stock": {"id": stock["id"], "miktar": stock["miktar"], "gercek_stok": stock.get("gercek_stok")}
+            }
+        if stock["miktar"] < p_quantity:
+            raise Exception(f"Stokta yeterli ürün yok! Mevcut stok: {stock['miktar']}")
+
+        old_stock = copy.deepcopy(stock)
+        if p_is_real_order:
+            real_stock = stock.get("gercek_stok")
+            real_stock = stock["miktar"] if real_stock is None else real_stock
+            stock["gercek_stok"] = max(real_stock - p_quantity, 0)
+        stock["miktar"] -= p_quantity
+        client._apply_defaults("stock_table", stock, update=True)
+        client._log_change("stock_table", "UPDATE", stock, old_stock)
+
+        order = {
+            "product_code": p_product_code,
+            "customer_name": p_customer_name,
+            "product_name": p_product_name,
+            "quantity": p_quantity,
+            "unit_price": p_unit_price,
+            "order_date": p_order_date,
+            "is_real_order": p_is_real_order,
+            "idempotency_key": p_idempotency_key
+        }
+        client._apply_defaults("daily_orders", order)
+        client.tables.setdefault("daily_orders", []).append(order)
+        client._log_change("daily_orders", "INSERT", order)
+        return {
+            "order": copy.deepcopy(order),
+            "stock": {"id": stock["id"], "miktar": stock["miktar"], "gercek_stok": stock.get("gercek_stok")}
+        }
+
+
+def _select(client, table, columns, where=None, order=(), limit=None):
+    """dashboard_bootstrap içindeki alt sorgular: filtre, sıra, limit ve projeksiyon"""
+    rows = [row for row in client.tables.get(table, []) if where is None or where(row)]
+    for column, desc in reversed(order):
+        rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+    if limit is not None:
+        rows = rows[:limit]
+    return [{column: copy.deepcopy(row.get(column)) for column in columns} for row in rows]
+
+
+def dashboard_bootstrap(client, p_account, p_start_date, p_end_date, p_today, p_page_size=50):
+    """migrations/0010_summaries.sql'deki (0007'nin özetler eklenmiş hali) dashboard_bootstrap karşılığı"""
+    ledger_columns = ["id", "tarih", "aciklama", "para_birimi", "miktar", "odeme_turu", "usd_kuru", "tl_karsiligi"]
+    with client.lock:
+        return {
+            # migrations/0016_change_log_commit_order.sql: latest_change_id yerine
+            "change_horizon": change_horizon(client),
+            "account_balances": account_balances(client, p_start_date, p_end_date),
+            "account_transactions": _select(
+                client, "transactions", ["id", "type", "tarih", "aciklama", "para_birimi", "miktar", "tl_karsiligi"],
+                lambda row: (row.get("odeme_turu") == p_account and row.get("aktif", True)
+                             and p_start_date <= row["tarih"] <= p_end_date),
+                order=[("tarih", True)]),
+            "incomes": _select(client, "transactions", ledger_columns,
+                               lambda row: row.get("type") == "income" and row.get("aktif", True),
+                               order=[("tarih", True), ("id", True)], limit=p_page_size),
+            "expenses": _select(client, "transactions", ledger_columns,
+                                lambda row: row.get("type") == "expense" and row.get("aktif", True),
+                                order=[("tarih", True), ("id", True)], limit=p_page_size),
+            "stock": _select(client, "stock_table",
+                             ["id", "urun_kodu", "urun_adi", "miktar", "gercek_stok", "birim_fiyat"],
+                             order=[("urun_adi", False)]),
+            "today_orders": _select(client, "daily_orders",
+                                    ["id", "product_code", "customer_name", "product_name", "quantity",
+                                     "unit_price", "total_amount", "is_real_order"],
+                                    lambda row: row.get("order_date") == p_today),
+            "contacts": _select(client, "contacts", ["id", "name", "phone", "description"],
+                                order=[("created_at", True)]),
+            "passwords": _select(client, "passwords", ["id", "platform", "username", "password", "description"]),
+            "imports": _select(client, "imports", ["id", "urun_adi", "miktar", "tarih", "durum", "alt_durum", "notlar"]),
+            # migrations/0010_summaries.sql ile eklenen özetler
+            "account_summary": transaction_summary(client, p_start_date, p_end_date, p_account=p_account,
+                                                   p_group_by=["type"]),
+            "stock_summary": stock_summary(client),
+            "today_orders_summary": daily_orders_summary(client, p_today, p_today),
+            "income_summary": transaction_summary(client, p_type="income", p_group_by=["para_birimi"]),
+            "expense_summary": transaction_summary(client, p_type="expense", p_group_by=["para_birimi"]),
+        }
+
+
+def change_horizon(client):
+    """migrations/0016_change_log_commit_order.sql change_horizon karşılığı (pg_snapshot_xmin).
+
+    client.running_xids, henüz commit olmamış transaction'ları taklit eder; boşsa ufuk son xid'in bir fazlasıdır.
+    """
+    if client.running_xids:
+        return min(client.running_xids)
+    return max((row["xid"] for row in client.tables.get("change_log", [])), default=0) + 1
+
+
+def get_changes(client, p_after_xid, p_after_id, p_limit=500, p_table=None):
+    """migrations/0016_change_log_commit_order.sql get_changes karşılığı"""
+    with client.lock:
+        horizon = change_horizon(client)
+        rows = [row for row in client.tables.get("change_log", [])
+                if (row["xid"], row["id"]) > (p_after_xid, p_after_id) and row["xid"] < horizon
+                and (p_table is None or row["tbl"] == p_table)]
+        rows.sort(key=lambda row: (row["xid"], row["id"]))
+        return [copy.deepcopy(row) for row in rows[:p_limit]]
+
+
+def _words(text):
+    return re.findall(r"\w+", str(text or "").lower())
+
+
+def _similarity(text, term):
+    """pg_trgm similarity() karşılığı: kelime trigramlarının Jaccard oranı"""
+    def trigrams(value):
+        grams = set()
+        for word in _words(value):
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return grams
+
+    text_grams, term_grams = trigrams(text), trigrams(term)
+    union = text_grams | term_grams
+    return len(text_grams & term_grams) / len(union) if union else 0.0
+
+
+def _search(rows, term, columns, limit, default_order=()):
+    """migrations/0008_search.sql fonksiyonlarının eşleşme ve sıralaması.
+
+    Eşleşme: sütunlardan biri terimi alt metin olarak içerir (ilike) ya da terimin tüm
+    kelimeleri ilk sütunda kelime olarak geçer (tam metin, sadece search_transactions).
+    Sıra: kelime eşleşmesi, en yüksek trigram benzerliği, ardından default_order.
+    """
+    needle = term.lower()
+    term_words = set(_words(term))
+
+    def word_match(row):
+        return bool(term_words) and term_words <= set(_words(row.get(columns[0])))
+
+    matched = [row for row in rows
+               if any(row.get(column) is not None and needle in str(row[column]).lower() for column in columns)
+               or (len(columns) == 1 and word_match(row))]
+    for column, desc in reversed(default_order):
+        matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+    matched.sort(key=lambda row: max(_similarity(row.get(column), term) for column in columns), reverse=True)
+    if len(columns) == 1:
+        matched.sort(key=word_match, reverse=True)
+    return [copy.deepcopy(row) for row in matched[:limit]]
+
+
+def search_transactions(client, p_type, p_term, p_limit=200):
+    """migrations/0008_search.sql search_transactions karşılığı"""
+    rows = [row for row in client.tables.get("transactions", [])
+            if row.get("type") == p_type and row.get("aktif", True)]
+    return _search(rows, p_term, ["aciklama"], p_limit, default_order=[("tarih", True)])
+
+
+def search_daily_orders(client, p_term, p_order_date=None, p_limit=200):
+    """migrations/0008_search.sql search_daily_orders karşılığı"""
+    rows = [row for row in client.tables.get("daily_orders", [])
+            if p_order_date is None or row.get("order_date") == p_order_date]
+    return _search(rows, p_term, ["customer_name", "product_name", "product_code"], p_limit,
+                   default_order=[("id", False)])
+
+
+def search_contacts(client, p_term, p_limit=200):
+    """migrations/0008_search.sql search_contacts karşılığı"""
+    return _search(client.tables.get("contacts", []), p_term, ["name", "phone", "description"], p_limit,
+                   default_order=[("name", False)])
+
+
+def search_passwords(client, p_term, p_limit=200):
+    """migrations/0008_search.sql search_passwords karşılığı"""
+    return _search(client.tables.get("passwords", []), p_term, ["platform", "username", "description"], p_limit,
+                   default_order=[("id", False)])
+
+
+def _aggregate(rows, group, amount, extra=None):
+    """migrations/0010_summaries.sql fonksiyonlarının gruplama ve toplamları"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(group(row), []).append(row)
+    result = []
+    for key in sorted(groups, key=lambda key: tuple((value is None, value) for value in key)):
+        values = [float(row.get(amount) or 0) for row in groups[key]]
+        summary = {"adet": len(values), "toplam": sum(values),
+                   "en_az": min(values), "en_cok": max(values)}
+        if extra:
+            summary.update(extra(groups[key]))
+        result.append((key, summary))
+    return result
+
+
+def transaction_summary(client, p_start_date=None, p_end_date=None, p_type=None, p_account=None, p_group_by=()):
+    """migrations/0010_summaries.sql transaction_summary karşılığı"""
+    columns = ["tarih", "odeme_turu", "para_birimi", "type"]
+    rows = [row for row in client.tables.get("transactions", [])
+            if row.get("aktif", True)
+            and (p_start_date is None or row["tarih"] >= p_start_date)
+            and (p_end_date is None or row["tarih"] <= p_end_date)
+            and (p_type is None or row.get("type") == p_type)
+            and (p_account is None or row.get("odeme_turu") == p_account)]
+    grouped = _aggregate(
+        rows, lambda row: tuple(row.get(column) if column in p_group_by else None for column in columns),
+        "miktar", lambda group: {"tl_toplam": sum(float(row.get("tl_karsiligi") or 0) for row in group)})
+    return [dict(zip(columns, key), **summary) for key, summary in grouped]
+
+
+def daily_orders_summary(client, p_start_date=None, p_end_date=None, p_by_day=False):
+    """migrations/0010_summaries.sql daily_orders_summary karşılığı"""
+    rows = [row for row in client.tables.get("daily_orders", [])
+            if (p_start_date is None or row["order_date"] >= p_start_date)
+            and (p_end_date is None or row["order_date"] <= p_end_date)]
+    grouped = _aggregate(rows, lambda row: (row["order_date"] if p_by_day else None,), "total_amount")
+    return [dict(order_date=key[0], **summary) for key, summary in grouped]
+
+
+def stock_summary(client):
+    """migrations/0010_summaries.sql stock_summary karşılığı"""
+    rows = client.tables.get("stock_table", [])
+    quantities = [row.get("miktar") or 0 for row in rows]
+    return [{
+        "adet": len(rows),
+        "toplam_miktar": sum(quantities),
+        "toplam_deger": sum((row.get("miktar") or 0) * float(row.get("birim_fiyat") or 0) for row in rows),
+        "en_az_miktar": min(quantities, default=None),
+        "en_cok_miktar": max(quantities, default=None),
+    }]
+
+
+# commit_unit_of_work'ün yazabildiği tablolar (migrations/0013_commit_unit_of_work.sql)
+UNIT_OF_WORK_TABLES = {"transactions", "stock_table", "daily_orders", "contacts", "passwords", "imports",
+                       "app_status", "system_info", "update_logs", "update_errors"}
+
+
+def _apply_operation(client, operation):
+    """commit_unit_of_work içindeki tek işlem; etkilenen satırları döndürür"""
+    table, op = operation.get("table"), operation.get("op")
+    if table not in UNIT_OF_WORK_TABLES:
+        raise Exception(f"Bu tabloya toplu yazma yapılamaz: {table}")
+    values = operation.get("values") or {}
+    match = operation.get("match") or {}
+
+    if op == "insert":
+        if not values:
+            raise Exception(f"Eklenecek değer verilmedi: {table}")
+        query = client.table(table)
+        query = query.upsert(values, on_conflict=operation["on_conflict"]) if operation.get("on_conflict") \
+            else query.insert(values)
+        return query.execute().data
+
+    if op not in ("update", "delete"):
+        raise Exception(f"Bilinmeyen işlem: {op}")
+    if not match:
+        raise Exception(f"Güncelleme/silme için eşleşme koşulu gerekli: {table}")
+    if op == "update" and not values:
+        raise Exception(f"Güncellenecek değer verilmedi: {table}")
+    query = client.table(table).update(values) if op == "update" else client.table(table).delete()
+    for column, value in match.items():
+        query = query.eq(column, value)
+    rows = query.execute().data
+    if not rows and not operation.get("optional"):
+        raise APIError({"code": "P0002", "details": json.dumps(match),
+                        "message": f"{table}: eşleşen kayıt yok ya da başka bir kullanıcı tarafından değiştirildi"})
+    return rows
+
+
+def commit_unit_of_work(client, p_operations):
+    """migrations/0013_commit_unit_of_work.sql karşılığı: işlemlerden biri hata verirse hiçbiri kalmaz"""
+    with client.lock:
+        snapshot = copy.deepcopy((client.tables, client._next_ids))
+        logged = len(client.requests)
+        try:
+            return [_apply_operation(client, operation) for operation in p_operations]
+        except Exception:
+            client.tables, client._next_ids = snapshot
+            raise
+        finally:
+            # İç sorgular tek RPC isteğinin parçasıdır; istek kaydında görünmez
+            del client.requests[logged:]
+
+
+FUNCTIONS = {
+    "account_balances": account_balances,
+    "transaction_summary": transaction_summary,
+    "daily_orders_summary": daily_orders_summary,
+    "stock_summary": stock_summary,
+    "reserve_stock_and_add_order": reserve_stock_and_add_order,
+    "commit_unit_of_work": commit_unit_of_work,
+    "dashboard_bootstrap": dashboard_bootstrap,
+    "change_horizon": change_horizon,
+    "get_changes": get_changes,
+    "search_transactions": search_transactions,
+    "search_daily_orders": search_daily_orders,
+    "search_contacts": search_contacts,
+    "search_passwords": search_passwords,
+}
+
+# Sunucuda varsayılan değeri olan sütunlar
+TABLE_DEFAULTS = {
+    "transactions": {"aktif": True},
+}
+
+# updated_at sütunu tetikleyiciyle tutulan tablolar (migrations/0005_replica_updated_at.sql)
+UPDATED_AT_TABLES = {"transactions", "stock_table", "daily_orders", "contacts", "imports"}
+
+# Değişiklikleri change_log'a yazılan tablolar (migrations/0006_change_log.sql)
+CHANGE_LOG_TABLES = UPDATED_AT_TABLES
+
+# version sütunu her güncellemede tetikleyiciyle artan tablolar (migrations/0012_stock_version.sql)
+VERSIONED_TABLES = {"stock_table"}
+
+# Sunucuda hesaplanan (generated) sütunlar
+GENERATED_COLUMNS = {
+    "daily_orders": {
+        "total_amount": lambda row: float(row.get("quantity") or 0) * float(row.get("unit_price") or 0)
+    },
+}
+
+
+class LocalSupabase:
+    """supabase.Client yerine geçen bellek içi istemci"""
+
+    def __init__(self):
+        self.tables = {}
+        self.requests = []
+        self.functions = dict(FUNCTIONS)
+        # Sunucu fonksiyonlarının transaction'ını taklit eder
+        self.lock = threading.RLock()
+        self._next_ids = {}
+        # Sürmekte olan transaction'ların xid'leri (bkz. change_horizon); testler commit sırasını bununla taklit eder
+        self.running_xids = set()
+
+    def table(self, table_name):
+        return LocalQuery(self, table_name)
+
+    from_ = table
+
+    def rpc(self, fn, params=None):
+        return LocalRpc(self, fn, params or {})
+
+    def seed(self, table_name, rows):
+        """Tabloya doğrudan (istek kaydı oluşturmadan) satır ekler"""
+        for row in rows:
+            row = copy.deepcopy(row)
+            self._apply_defaults(table_name, row)
+            self.tables.setdefault(table_name, []).append(row)
+
+    def _log_change(self, table_name, op, row, old_row=None):
+        """migrations/0006_change_log.sql tetikleyicisinin karşılığı"""
+        if table_name not in CHANGE_LOG_TABLES:
+            return
+        log = self.tables.setdefault("change_log", [])
+        log.append({
+            "id": len(log) + 1,
+            # Yerelde her yazma kendi transaction'ıdır
+            "xid": len(log) + 1,
+            "tbl": table_name,
+            "op": op,
+            "row_id": row.get("id"),
+            "row": copy.deepcopy(row),
+            "old_row": copy.deepcopy(old_row),
+            "changed_at": datetime.now().isoformat()
+        })
+
+    def _apply_defaults(self, table_name, row, update=False):
+        for column, compute in GENERATED_COLUMNS.get(table_name, {}).items():
+            row[column] = compute(row)
+        if table_name in UPDATED_AT_TABLES:
+            row["updated_at"] = datetime.now().isoformat(timespec="microseconds")
+        if table_name in VERSIONED_TABLES:
+            row["version"] = row.get("version", 0) + 1 if update else row.get("version", 1)
+        if update:
+            return
+        if row.get("id") is None:
+            if table_name not in self._next_ids:
+                existing = [r.get("id") for r in self.tables.get(table_name, []) if isinstance(r.get("id"), int)]
+                self._next_ids[table_name] = max([1] + [i + 1 for i in existing])
+            row["id"] = self._next_ids[table_name]
+            self._next_ids[table_name] += 1
+        elif isinstance(row["id"], int) and row["id"] >= self._next_ids.get(table_name, 1):
+            self._next_ids[table_name] = row["id"] + 1
+        for column, value in TABLE_DEFAULTS.get(table_name, {}).items():
+            row.setdefault(column, value)
+        row.setdefault("created_at", datetime.now().isoformat())
@@ -21,7 +21,7 @@ class LoginWindow(QtWidgets.QWidget):
         super().__init__()
         self.ui = Ui_loginForm()
         self.ui.setupUi(self)
-        self.db = DatabaseManager()
+        self.db = DatabaseManager.instance()
         self.auth = AuthorizationManager()
 
         # Buton bağlantıları
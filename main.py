@@ -6,6 +6,11 @@ from login import LoginWindow
 from version_check import is_new_version_available
 from update import perform_update
 from ui_userInterface import Ui_MainWindow
+from query_cache import query_cache
+from db_metrics import db_metrics
+from database_manager import DatabaseManager
+from change_feed import get_change_feed
+from offline_banner import OfflineBanner
 
 # Log ayarları
 logging.basicConfig(
@@ -59,7 +64,16 @@ class FinanceApp:
                 self.login_window.switch_window.connect(self.show_main_window)
                 self.login_window.show()
                 
-                sys.exit(self.app.exec_())
+                exit_code = self.app.exec_()
+                logging.info(f"Sorgu önbelleği istatistikleri: {query_cache.stats()}")
+                logging.info(f"Veritabanı işlem metrikleri: {db_metrics.to_json(indent=None)}")
+                replica = DatabaseManager.instance().replica
+                if replica is not None:
+                    replica.stop()
+                journal = DatabaseManager.instance().journal
+                if journal is not None:
+                    journal.stop()
+                sys.exit(exit_code)
                 
         except Exception as e:
             logging.critical(f"Uygulama başlatma hatası: {str(e)}", exc_info=True)
@@ -87,6 +101,19 @@ class FinanceApp:
             self.main_window.setWindowTitle("Finansal Yönetim Sistemi")
             self.main_window.setMinimumSize(1240, 969)
             
+            # Yerel kopya açıksa (LOCAL_REPLICA_PATH) arka plan eşitlemesini başlat
+            replica = DatabaseManager.instance().replica
+            if replica is not None:
+                replica.start()
+            # Başka istemcilerin değişiklikleri açık sayfalara satır satır uygulanır
+            get_change_feed().start()
+            # Sunucuya ulaşılamadan kaydedilen yazmalar bağlantı gelince sırayla gönderilir
+            journal = DatabaseManager.instance().journal
+            if journal is not None:
+                journal.start()
+            # Sunucuya ulaşılamadığında pencerenin altında çevrimdışı bandı gösterilir
+            self.offline_banner = OfflineBanner(DatabaseManager.instance().breaker, self.main_window, journal)
+            
             # Pencereyi göster ve login penceresini kapat
             self.main_window.show()
             self.login_window.close()
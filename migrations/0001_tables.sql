@@ -0,0 +1,76 @@
+-- Uygulamanın kullandığı tablolar (DatabaseManager'daki tablo ve sütun adlarıyla).
+-- Mevcut Supabase projesinde bu tablolar zaten vardır; "if not exists" sayesinde dokunulmaz.
+-- Yeni bir veritabanı (ör. testlerdeki yerel Postgres) bu dosyadan başlar.
+
+create table if not exists public.transactions (
+    id bigserial primary key,
+    type text not null,
+    tarih date not null,
+    aciklama text,
+    para_birimi text,
+    miktar numeric,
+    usd_kuru numeric,
+    tl_karsiligi numeric,
+    odeme_turu text,
+    aktif boolean not null default true,
+    created_at timestamptz not null default now()
+);
+
+create table if not exists public.stock_table (
+    id bigserial primary key,
+    urun_kodu text not null,
+    urun_adi text,
+    miktar integer not null default 0,
+    gercek_stok integer,
+    birim_fiyat numeric,
+    created_at timestamptz not null default now()
+);
+
+create table if not exists public.daily_orders (
+    id bigserial primary key,
+    product_code text,
+    customer_name text,
+    product_name text,
+    quantity integer,
+    unit_price numeric,
+    total_amount numeric,
+    order_date date not null default current_date,
+    is_real_order boolean not null default true,
+    created_at timestamptz not null default now()
+);
+
+create table if not exists public.contacts (
+    id bigserial primary key,
+    name text not null,
+    phone text,
+    description text,
+    created_at timestamptz not null default now()
+);
+
+create table if not exists public.passwords (
+    id bigserial primary key,
+    platform text not null,
+    username text,
+    password text,
+    description text,
+    created_at timestamptz not null default now()
+);
+
+create table if not exists public.imports (
+    id bigserial primary key,
+    urun_adi text not null,
+    miktar integer,
+    tarih date,
+    durum text,
+    alt_durum text,
+    notlar text,
+    created_at timestamptz not null default now()
+);
+
+create table if not exists public.users (
+    id bigserial primary key,
+    username text not null,
+    password_hash text not null,
+    role text not null,
+    created_at timestamptz not null default now()
+);
@@ -0,0 +1,19 @@
+-- account_balances: ana ekrandaki hesap kartları için bakiye özeti.
+-- transactions tablosunu odeme_turu ve type'a göre gruplar ve tl_karsiligi toplamını döndürür.
+-- python -m migrations ile uygulanır; istemci DatabaseManager.get_account_balances ile çağırır.
+
+create or replace function public.account_balances(p_start_date date, p_end_date date)
+returns table (odeme_turu text, type text, toplam numeric)
+language sql
+stable
+as $$
+    select t.odeme_turu,
+           t.type,
+           coalesce(sum(t.tl_karsiligi), 0) as toplam
+      from public.transactions t
+     where t.aktif = true
+       and t.tarih between p_start_date and p_end_date
+     group by t.odeme_turu, t.type;
+$$;
+
+grant execute on function public.account_balances(date, date) to anon, authenticated;
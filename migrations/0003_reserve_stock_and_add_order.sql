@@ -0,0 +1,67 @@
+-- reserve_stock_and_add_order: günlük sipariş ekleme.
+-- Stok kontrolü, miktar/gercek_stok düşümü ve daily_orders kaydı tek transaction'da yapılır.
+-- Stok satırı "for update" ile kilitlenir; aynı ürüne eşzamanlı gelen siparişler sırayla
+-- işlenir ve stok eksiye düşmez.
+-- python -m migrations ile uygulanır; istemci DatabaseManager.add_daily_order ile çağırır.
+-- total_amount sunucuda hesaplanır (migrations/0004_daily_orders_total_amount.sql).
+-- Dönüş: {"order": <eklenen daily_orders satırı>, "stock": {"id": .., "miktar": .., "gercek_stok": ..}}
+
+create or replace function public.reserve_stock_and_add_order(
+    p_product_code text,
+    p_customer_name text,
+    p_product_name text,
+    p_quantity integer,
+    p_unit_price numeric,
+    p_is_real_order boolean,
+    p_order_date date
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_stock public.stock_table%rowtype;
+    v_order public.daily_orders%rowtype;
+begin
+    if p_quantity <= 0 or p_unit_price <= 0 then
+        raise exception 'Miktar ve birim fiyat pozitif olmalıdır';
+    end if;
+
+    select * into v_stock
+      from public.stock_table
+     where urun_kodu = p_product_code
+       for update;
+
+    if not found then
+        raise exception 'Ürün stokta bulunamadı';
+    end if;
+
+    if v_stock.miktar < p_quantity then
+        raise exception 'Stokta yeterli ürün yok! Mevcut stok: %', v_stock.miktar;
+    end if;
+
+    -- Gerçek siparişte gerçek stok da düşer (en az 0); demo siparişte sadece stok düşer
+    update public.stock_table
+       set miktar = miktar - p_quantity,
+           gercek_stok = case
+               when p_is_real_order then greatest(coalesce(gercek_stok, miktar) - p_quantity, 0)
+               else gercek_stok
+           end
+     where id = v_stock.id
+    returning * into v_stock;
+
+    insert into public.daily_orders
+        (product_code, customer_name, product_name, quantity, unit_price, order_date, is_real_order)
+    values
+        (p_product_code, p_customer_name, p_product_name, p_quantity, p_unit_price,
+         p_order_date, p_is_real_order)
+    returning * into v_order;
+
+    return jsonb_build_object(
+        'order', to_jsonb(v_order),
+        'stock', jsonb_build_object('id', v_stock.id, 'miktar', v_stock.miktar, 'gercek_stok', v_stock.gercek_stok)
+    );
+end;
+$$;
+
+grant execute on function public.reserve_stock_and_add_order(text, text, text, integer, numeric, boolean, date)
+    to anon, authenticated;
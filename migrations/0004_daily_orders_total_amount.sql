@@ -0,0 +1,10 @@
+-- daily_orders.total_amount: quantity * unit_price olarak sunucuda hesaplanan sütun.
+-- Sipariş düzenlemede istemci mevcut quantity/unit_price'ı okuyup toplamı hesaplamaz;
+-- tek PATCH gönderilir ve güncel satır (total_amount dahil) geri döner.
+-- python -m migrations ile bir kez uygulanır. Mevcut satırların toplamları yeniden hesaplanır.
+
+alter table public.daily_orders drop column if exists total_amount;
+
+alter table public.daily_orders
+    add column total_amount numeric
+    generated always as (quantity * unit_price) stored;
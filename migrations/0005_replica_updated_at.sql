@@ -0,0 +1,29 @@
+-- updated_at: yerel SQLite kopyasının (local_replica.py) artımlı eşitlemesi için.
+-- Her satır eklenip güncellendiğinde updated_at tetikleyiciyle yenilenir; istemci
+-- sadece son gördüğü (updated_at, id) değerinden yeni satırları ister.
+-- clock_timestamp() kullanılır: aynı transaction'daki satırlar da farklı zaman alır.
+-- python -m migrations ile bir kez uygulanır.
+
+create or replace function public.set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := clock_timestamp();
+    return new;
+end;
+$$;
+
+do $$
+declare
+    t text;
+begin
+    foreach t in array array['transactions', 'stock_table', 'daily_orders', 'contacts', 'imports'] loop
+        execute format('alter table public.%I add column if not exists updated_at timestamptz not null default clock_timestamp()', t);
+        execute format('drop trigger if exists set_updated_at on public.%I', t);
+        execute format('create trigger set_updated_at before insert or update on public.%I '
+                       'for each row execute function public.set_updated_at()', t);
+        execute format('create index if not exists %I on public.%I (updated_at, id)', t || '_updated_at_id_idx', t);
+    end loop;
+end;
+$$;
@@ -0,0 +1,54 @@
+-- change_log: açık sayfaların başka istemcilerin değişikliklerini görmesi için satır bazlı değişiklik kaydı.
+-- Tetikleyiciler her insert/update/delete'i buraya yazar; istemci (change_feed.py) son gördüğü
+-- id'den sonraki kayıtları kısa aralıklarla okur ve sayfalardaki tabloları satır satır günceller.
+-- row: eklenen/güncellenen satırın yeni hali ya da silinen satır; old_row: güncellemede eski hal.
+-- python -m migrations ile bir kez uygulanır.
+
+create table if not exists public.change_log (
+    id bigserial primary key,
+    tbl text not null,
+    op text not null,
+    row_id bigint,
+    row jsonb,
+    old_row jsonb,
+    changed_at timestamptz not null default now()
+);
+
+create index if not exists change_log_changed_at_idx on public.change_log (changed_at);
+
+create or replace function public.log_change()
+returns trigger
+language plpgsql
+security definer
+as $$
+begin
+    if tg_op = 'DELETE' then
+        insert into public.change_log (tbl, op, row_id, row)
+        values (tg_table_name, tg_op, old.id, to_jsonb(old));
+        return old;
+    end if;
+
+    insert into public.change_log (tbl, op, row_id, row, old_row)
+    values (tg_table_name, tg_op, new.id, to_jsonb(new),
+            case when tg_op = 'UPDATE' then to_jsonb(old) end);
+    return new;
+end;
+$$;
+
+do $$
+declare
+    t text;
+begin
+    foreach t in array array['transactions', 'stock_table', 'daily_orders', 'contacts', 'imports'] loop
+        execute format('drop trigger if exists log_change on public.%I', t);
+        execute format('create trigger log_change after insert or update or delete on public.%I '
+                       'for each row execute function public.log_change()', t);
+    end loop;
+end;
+$$;
+
+grant select on public.change_log to anon, authenticated;
+
+-- Eski kayıtlar istemciler için gereksizdir; pg_cron varsa günlük temizlenebilir:
+-- select cron.schedule('change_log_cleanup', '0 3 * * *',
+--     $$delete from public.change_log where changed_at < now() - interval '7 days'$$);
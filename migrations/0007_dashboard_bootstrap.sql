@@ -0,0 +1,73 @@
+-- dashboard_bootstrap: ana pencerenin açılışta gösterdiği verilerin hepsini tek çağrıda döndürür.
+-- Hesap bakiyeleri, açılış hesabının (CASH) detay tablosu, gelir/gider sayfalarının ilk sayfası,
+-- stok, bugünkü siparişler, kişiler, şifreler ve ithalat; her biri sadece sayfanın gösterdiği
+-- sütunlarla (database_manager.PAGE_COLUMNS) ve sayfanın kullandığı sıra/limitle.
+-- Tek bir sorgu olduğu için hepsi aynı anlık görüntüden okunur; latest_change_id de bu
+-- görüntüdeki son change_log id'sidir (bkz. migrations/0006_change_log.sql).
+-- python -m migrations ile uygulanır; istemci DatabaseManager.load_dashboard_bootstrap ile çağırır.
+
+create or replace function public.dashboard_bootstrap(
+    p_account text,
+    p_start_date date,
+    p_end_date date,
+    p_today date,
+    p_page_size integer default 50
+)
+returns json
+language sql
+stable
+as $$
+    select json_build_object(
+        'latest_change_id', (select coalesce(max(c.id), 0) from public.change_log c),
+
+        'account_balances', (select coalesce(json_agg(b), '[]')
+                               from public.account_balances(p_start_date, p_end_date) b),
+
+        'account_transactions', (select coalesce(json_agg(t), '[]') from (
+            select id, type, tarih, aciklama, para_birimi, miktar, tl_karsiligi
+              from public.transactions
+             where odeme_turu = p_account and aktif = true
+               and tarih between p_start_date and p_end_date
+             order by tarih desc) t),
+
+        'incomes', (select coalesce(json_agg(t), '[]') from (
+            select id, tarih, aciklama, para_birimi, miktar, odeme_turu, usd_kuru, tl_karsiligi
+              from public.transactions
+             where type = 'income' and aktif = true
+             order by tarih desc, id desc
+             limit p_page_size) t),
+
+        'expenses', (select coalesce(json_agg(t), '[]') from (
+            select id, tarih, aciklama, para_birimi, miktar, odeme_turu, usd_kuru, tl_karsiligi
+              from public.transactions
+             where type = 'expense' and aktif = true
+             order by tarih desc, id desc
+             limit p_page_size) t),
+
+        'stock', (select coalesce(json_agg(t), '[]') from (
+            select id, urun_kodu, urun_adi, miktar, gercek_stok, birim_fiyat
+              from public.stock_table
+             order by urun_adi) t),
+
+        'today_orders', (select coalesce(json_agg(t), '[]') from (
+            select id, product_code, customer_name, product_name, quantity,
+                   unit_price, total_amount, is_real_order
+              from public.daily_orders
+             where order_date = p_today) t),
+
+        'contacts', (select coalesce(json_agg(t), '[]') from (
+            select id, name, phone, description
+              from public.contacts
+             order by created_at desc) t),
+
+        'passwords', (select coalesce(json_agg(t), '[]') from (
+            select id, platform, username, password, description
+              from public.passwords) t),
+
+        'imports', (select coalesce(json_agg(t), '[]') from (
+            select id, urun_adi, miktar, tarih, durum, alt_durum, notlar
+              from public.imports) t)
+    );
+$$;
+
+grant execute on function public.dashboard_bootstrap(text, date, date, date, integer) to anon, authenticated;
@@ -0,0 +1,114 @@
+-- Arama fonksiyonları ve indeksleri: gelir/gider açıklaması, günlük siparişler, kişiler ve şifreler.
+-- ilike '%terim%' normal bir B-tree indeksini kullanamaz; her aramada tablonun tamamı taranır.
+-- Burada her aranan sütuna pg_trgm GIN indeksi, transactions.aciklama'ya ayrıca tam metin
+-- (tsvector) indeksi eklenir. Fonksiyonlar aynı eşleşmeyi (büyük/küçük harf duyarsız alt metin)
+-- indeksle bulur, sonucu sıralayıp p_limit satırla sınırlar:
+--   1. terimdeki tüm kelimeleri kelime olarak içeren satırlar önce,
+--   2. sonra trigram benzerliği (similarity) yüksek olanlar,
+--   3. eşitlikte tablonun önceki varsayılan sırası (ör. tarih yeniden eskiye).
+-- Fonksiyonlar tablo satırı döndürür; istemci select= ile sadece gereken sütunları ister.
+-- python -m migrations ile uygulanır; istemci DatabaseManager.search_* ile çağırır.
+
+create extension if not exists pg_trgm;
+
+create index if not exists transactions_aciklama_trgm_idx
+    on public.transactions using gin (aciklama gin_trgm_ops);
+create index if not exists transactions_aciklama_fts_idx
+    on public.transactions using gin (to_tsvector('simple', coalesce(aciklama, '')));
+
+create index if not exists daily_orders_customer_name_trgm_idx
+    on public.daily_orders using gin (customer_name gin_trgm_ops);
+create index if not exists daily_orders_product_name_trgm_idx
+    on public.daily_orders using gin (product_name gin_trgm_ops);
+create index if not exists daily_orders_product_code_trgm_idx
+    on public.daily_orders using gin (product_code gin_trgm_ops);
+
+create index if not exists contacts_name_trgm_idx on public.contacts using gin (name gin_trgm_ops);
+create index if not exists contacts_phone_trgm_idx on public.contacts using gin (phone gin_trgm_ops);
+create index if not exists contacts_description_trgm_idx on public.contacts using gin (description gin_trgm_ops);
+
+create index if not exists passwords_platform_trgm_idx on public.passwords using gin (platform gin_trgm_ops);
+create index if not exists passwords_username_trgm_idx on public.passwords using gin (username gin_trgm_ops);
+create index if not exists passwords_description_trgm_idx on public.passwords using gin (description gin_trgm_ops);
+
+-- Terimi ilike kalıbına çevirir; terimdeki % ve _ joker olarak değil harf olarak aranır
+create or replace function public.search_pattern(p_term text)
+returns text
+language sql
+immutable
+as $$
+    select '%' || replace(replace(replace(p_term, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+$$;
+
+create or replace function public.search_transactions(p_type text, p_term text, p_limit integer default 200)
+returns setof public.transactions
+language sql
+stable
+as $$
+    select t.*
+      from public.transactions t
+     where t.type = p_type
+       and t.aktif = true
+       and (t.aciklama ilike public.search_pattern(p_term)
+            or to_tsvector('simple', coalesce(t.aciklama, '')) @@ plainto_tsquery('simple', p_term))
+     order by (to_tsvector('simple', coalesce(t.aciklama, '')) @@ plainto_tsquery('simple', p_term)) desc,
+              similarity(t.aciklama, p_term) desc,
+              t.tarih desc
+     limit p_limit;
+$$;
+
+create or replace function public.search_daily_orders(p_term text, p_order_date date default null,
+                                                      p_limit integer default 200)
+returns setof public.daily_orders
+language sql
+stable
+as $$
+    select o.*
+      from public.daily_orders o
+     where (p_order_date is null or o.order_date = p_order_date)
+       and (o.customer_name ilike public.search_pattern(p_term)
+            or o.product_name ilike public.search_pattern(p_term)
+            or o.product_code ilike public.search_pattern(p_term))
+     order by greatest(similarity(o.customer_name, p_term), similarity(o.product_name, p_term),
+                       similarity(o.product_code, p_term)) desc,
+              o.id
+     limit p_limit;
+$$;
+
+create or replace function public.search_contacts(p_term text, p_limit integer default 200)
+returns setof public.contacts
+language sql
+stable
+as $$
+    select c.*
+      from public.contacts c
+     where c.name ilike public.search_pattern(p_term)
+        or c.phone ilike public.search_pattern(p_term)
+        or c.description ilike public.search_pattern(p_term)
+     order by greatest(similarity(c.name, p_term), similarity(c.phone, p_term),
+                       similarity(c.description, p_term)) desc,
+              c.name
+     limit p_limit;
+$$;
+
+create or replace function public.search_passwords(p_term text, p_limit integer default 200)
+returns setof public.passwords
+language sql
+stable
+as $$
+    select p.*
+      from public.passwords p
+     where p.platform ilike public.search_pattern(p_term)
+        or p.username ilike public.search_pattern(p_term)
+        or p.description ilike public.search_pattern(p_term)
+     order by greatest(similarity(p.platform, p_term), similarity(p.username, p_term),
+                       similarity(p.description, p_term)) desc,
+              p.id
+     limit p_limit;
+$$;
+
+grant execute on function public.search_pattern(text) to anon, authenticated;
+grant execute on function public.search_transactions(text, text, integer) to anon, authenticated;
+grant execute on function public.search_daily_orders(text, date, integer) to anon, authenticated;
+grant execute on function public.search_contacts(text, integer) to anon, authenticated;
+grant execute on function public.search_passwords(text, integer) to anon, authenticated;
@@ -0,0 +1,30 @@
+-- Sık çalışan sorguların indeksleri.
+-- Her indeks, yanında adı geçen DatabaseManager okumasına göre seçilmiştir;
+-- test_migrations.py bu okumaları büyük sentetik tablolarda EXPLAIN ile dener.
+-- Okumaların hepsi aktif = true satırları istediği için transactions indeksleri kısmidir.
+-- Ürün kodu ve kullanıcı adı benzersizliği burada değil 0015_unique_codes.sql'de, mevcut
+-- tekrarlar kontrol edildikten sonra eklenir (baz şema bunları zorlamıyordu).
+
+-- get_all_incomes / get_all_expenses (keyset sayfalama), get_*_by_date_range, search_* eşitlikleri
+create index if not exists transactions_type_tarih_idx
+    on public.transactions (type, tarih desc, id desc) where aktif = true;
+
+-- get_account_transactions: hesap + tarih aralığı (+ tür)
+create index if not exists transactions_odeme_turu_tarih_idx
+    on public.transactions (odeme_turu, tarih desc) where aktif = true;
+
+-- account_balances: tarih aralığındaki satırların toplamları tablo okunmadan indeksten alınır
+create index if not exists transactions_tarih_balances_idx
+    on public.transactions (tarih) include (odeme_turu, type, tl_karsiligi) where aktif = true;
+
+-- get_stock_item_by_code, update_stock_quantity
+create index if not exists stock_table_urun_kodu_idx on public.stock_table (urun_kodu);
+
+-- get_today_orders, get_all_daily_orders(order_date)
+create index if not exists daily_orders_order_date_idx on public.daily_orders (order_date);
+
+-- get_user_by_username
+create index if not exists users_username_idx on public.users (username);
+
+-- get_changes(table=...): tek tablonun değişiklikleri id sırasıyla
+create index if not exists change_log_tbl_id_idx on public.change_log (tbl, id);
@@ -0,0 +1,166 @@
+-- Özet etiketleri için sunucu tarafı toplam fonksiyonları.
+-- Sayfalar adet/toplam/en az/en çok değerlerini detay satırlarını indirmeden bu fonksiyonlardan alır;
+-- istemci DatabaseManager.get_transaction_summary, get_account_summary, get_daily_orders_summary
+-- ve get_stock_summary ile çağırır. Açılışta gösterilen özetler dashboard_bootstrap'e de eklenir.
+
+-- Gruplama sütunları p_group_by ile seçilir ('tarih', 'odeme_turu', 'para_birimi', 'type');
+-- seçilmeyen sütunlar null döner. Hiç satır yoksa sonuç boştur.
+create or replace function public.transaction_summary(
+    p_start_date date default null,
+    p_end_date date default null,
+    p_type text default null,
+    p_account text default null,
+    p_group_by text[] default '{}'
+)
+returns table (tarih date, odeme_turu text, para_birimi text, type text,
+               adet bigint, toplam numeric, tl_toplam numeric, en_az numeric, en_cok numeric)
+language sql
+stable
+as $$
+    select case when 'tarih' = any(p_group_by) then t.tarih end,
+           case when 'odeme_turu' = any(p_group_by) then t.odeme_turu end,
+           case when 'para_birimi' = any(p_group_by) then t.para_birimi end,
+           case when 'type' = any(p_group_by) then t.type end,
+           count(*),
+           coalesce(sum(t.miktar), 0),
+           coalesce(sum(t.tl_karsiligi), 0),
+           min(t.miktar),
+           max(t.miktar)
+      from public.transactions t
+     where t.aktif = true
+       and (p_start_date is null or t.tarih >= p_start_date)
+       and (p_end_date is null or t.tarih <= p_end_date)
+       and (p_type is null or t.type = p_type)
+       and (p_account is null or t.odeme_turu = p_account)
+     group by 1, 2, 3, 4
+     order by 1, 2, 3, 4;
+$$;
+
+-- p_by_day = false ise tek satır (tüm aralığın toplamı), true ise gün başına bir satır döner.
+create or replace function public.daily_orders_summary(
+    p_start_date date default null,
+    p_end_date date default null,
+    p_by_day boolean default false
+)
+returns table (order_date date, adet bigint, toplam numeric, en_az numeric, en_cok numeric)
+language sql
+stable
+as $$
+    select case when p_by_day then o.order_date end,
+           count(*),
+           coalesce(sum(o.total_amount), 0),
+           min(o.total_amount),
+           max(o.total_amount)
+      from public.daily_orders o
+     where (p_start_date is null or o.order_date >= p_start_date)
+       and (p_end_date is null or o.order_date <= p_end_date)
+     group by 1
+     order by 1;
+$$;
+
+-- Stok sayfasının alt satırı: ürün sayısı, toplam miktar ve toplam değer (miktar * birim_fiyat).
+create or replace function public.stock_summary()
+returns table (adet bigint, toplam_miktar bigint, toplam_deger numeric, en_az_miktar integer, en_cok_miktar integer)
+language sql
+stable
+as $$
+    select count(*),
+           coalesce(sum(s.miktar), 0),
+           coalesce(sum(s.miktar * s.birim_fiyat), 0),
+           min(s.miktar),
+           max(s.miktar)
+      from public.stock_table s;
+$$;
+
+-- transaction_summary'nin tüm filtre/gruplama biçimleri tabloya gitmeden bu indeksten okunur
+create index if not exists transactions_summary_idx
+    on public.transactions (type, odeme_turu, tarih) include (para_birimi, miktar, tl_karsiligi)
+    where aktif = true;
+
+-- check_product_code_exists: satırları indirmeden sayar (HEAD, count=exact)
+create index if not exists daily_orders_product_code_idx on public.daily_orders (product_code);
+
+-- migrations/0007_dashboard_bootstrap.sql'deki fonksiyon; açılış hesabının, stoğun, bugünkü siparişlerin
+-- ve gelir/gider sayfalarının alt satırlarındaki özetler de aynı çağrıda döner
+create or replace function public.dashboard_bootstrap(
+    p_account text,
+    p_start_date date,
+    p_end_date date,
+    p_today date,
+    p_page_size integer default 50
+)
+returns json
+language sql
+stable
+as $$
+    select json_build_object(
+        'latest_change_id', (select coalesce(max(c.id), 0) from public.change_log c),
+
+        'account_balances', (select coalesce(json_agg(b), '[]')
+                               from public.account_balances(p_start_date, p_end_date) b),
+
+        'account_transactions', (select coalesce(json_agg(t), '[]') from (
+            select id, type, tarih, aciklama, para_birimi, miktar, tl_karsiligi
+              from public.transactions
+             where odeme_turu = p_account and aktif = true
+               and tarih between p_start_date and p_end_date
+             order by tarih desc) t),
+
+        'incomes', (select coalesce(json_agg(t), '[]') from (
+            select id, tarih, aciklama, para_birimi, miktar, odeme_turu, usd_kuru, tl_karsiligi
+              from public.transactions
+             where type = 'income' and aktif = true
+             order by tarih desc, id desc
+             limit p_page_size) t),
+
+        'expenses', (select coalesce(json_agg(t), '[]') from (
+            select id, tarih, aciklama, para_birimi, miktar, odeme_turu, usd_kuru, tl_karsiligi
+              from public.transactions
+             where type = 'expense' and aktif = true
+             order by tarih desc, id desc
+             limit p_page_size) t),
+
+        'stock', (select coalesce(json_agg(t), '[]') from (
+            select id, urun_kodu, urun_adi, miktar, gercek_stok, birim_fiyat
+              from public.stock_table
+             order by urun_adi) t),
+
+        'today_orders', (select coalesce(json_agg(t), '[]') from (
+            select id, product_code, customer_name, product_name, quantity,
+                   unit_price, total_amount, is_real_order
+              from public.daily_orders
+             where order_date = p_today) t),
+
+        'contacts', (select coalesce(json_agg(t), '[]') from (
+            select id, name, phone, description
+              from public.contacts
+             order by created_at desc) t),
+
+        'passwords', (select coalesce(json_agg(t), '[]') from (
+            select id, platform, username, password, description
+              from public.passwords) t),
+
+        'imports', (select coalesce(json_agg(t), '[]') from (
+            select id, urun_adi, miktar, tarih, durum, alt_durum, notlar
+              from public.imports) t),
+
+        'account_summary', (select coalesce(json_agg(s), '[]')
+                              from public.transaction_summary(p_start_date, p_end_date, p_account => p_account,
+                                                              p_group_by => '{type}') s),
+
+        'stock_summary', (select coalesce(json_agg(s), '[]') from public.stock_summary() s),
+
+        'today_orders_summary', (select coalesce(json_agg(s), '[]')
+                                   from public.daily_orders_summary(p_today, p_today) s),
+
+        'income_summary', (select coalesce(json_agg(s), '[]')
+                             from public.transaction_summary(p_type => 'income', p_group_by => '{para_birimi}') s),
+
+        'expense_summary', (select coalesce(json_agg(s), '[]')
+                              from public.transaction_summary(p_type => 'expense', p_group_by => '{para_birimi}') s)
+    );
+$$;
+
+grant execute on function public.transaction_summary(date, date, text, text, text[]) to anon, authenticated;
+grant execute on function public.daily_orders_summary(date, date, boolean) to anon, authenticated;
+grant execute on function public.stock_summary() to anon, authenticated;
@@ -0,0 +1,95 @@
+-- İstemcinin ürettiği idempotency_key ile tekrarı güvenli eklemeler.
+-- DatabaseManager her eklemede yeni bir uuid gönderir; istek zaman aşımına uğrayıp tekrar
+-- denendiğinde (db_retry.py) aynı anahtar ikinci bir satır oluşturmaz:
+--   transactions, stock_table: upsert (on_conflict=idempotency_key, ignore-duplicates)
+--   daily_orders: reserve_stock_and_add_order(p_idempotency_key) aynı siparişi ve stoğu tekrar işlemez
+-- Eski satırlarda anahtar null kalır; null'lar benzersizlik kısıtına takılmaz.
+
+alter table public.transactions add column if not exists idempotency_key uuid;
+alter table public.stock_table add column if not exists idempotency_key uuid;
+alter table public.daily_orders add column if not exists idempotency_key uuid;
+
+-- on_conflict için kısmi olmayan benzersiz indeks gerekir
+create unique index if not exists transactions_idempotency_key_key on public.transactions (idempotency_key);
+create unique index if not exists stock_table_idempotency_key_key on public.stock_table (idempotency_key);
+create unique index if not exists daily_orders_idempotency_key_key on public.daily_orders (idempotency_key);
+
+-- migrations/0003_reserve_stock_and_add_order.sql'deki fonksiyon, p_idempotency_key ile.
+-- Parametre listesi değiştiği için eski imza kaldırılır (PostgREST iki aday arasında seçemez).
+drop function if exists public.reserve_stock_and_add_order(text, text, text, integer, numeric, boolean, date);
+
+create or replace function public.reserve_stock_and_add_order(
+    p_product_code text,
+    p_customer_name text,
+    p_product_name text,
+    p_quantity integer,
+    p_unit_price numeric,
+    p_is_real_order boolean,
+    p_order_date date,
+    p_idempotency_key uuid default null
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_stock public.stock_table%rowtype;
+    v_order public.daily_orders%rowtype;
+begin
+    if p_quantity <= 0 or p_unit_price <= 0 then
+        raise exception 'Miktar ve birim fiyat pozitif olmalıdır';
+    end if;
+
+    select * into v_stock
+      from public.stock_table
+     where urun_kodu = p_product_code
+       for update;
+
+    if not found then
+        raise exception 'Ürün stokta bulunamadı';
+    end if;
+
+    -- Aynı anahtarla gelen tekrar: sipariş zaten eklendi, stok tekrar düşülmez.
+    -- Kontrol stok satırı kilitlendikten sonra yapılır; aynı anda gelen iki kopyadan
+    -- ikincisi birincinin commit'ini bekler ve onun siparişini görür.
+    if p_idempotency_key is not null then
+        select * into v_order from public.daily_orders where idempotency_key = p_idempotency_key;
+        if found then
+            return jsonb_build_object(
+                'order', to_jsonb(v_order),
+                'stock', jsonb_build_object('id', v_stock.id, 'miktar', v_stock.miktar,
+                                            'gercek_stok', v_stock.gercek_stok)
+            );
+        end if;
+    end if;
+
+    if v_stock.miktar < p_quantity then
+        raise exception 'Stokta yeterli ürün yok! Mevcut stok: %', v_stock.miktar;
+    end if;
+
+    -- Gerçek siparişte gerçek stok da düşer (en az 0); demo siparişte sadece stok düşer
+    update public.stock_table
+       set miktar = miktar - p_quantity,
+           gercek_stok = case
+               when p_is_real_order then greatest(coalesce(gercek_stok, miktar) - p_quantity, 0)
+               else gercek_stok
+           end
+     where id = v_stock.id
+    returning * into v_stock;
+
+    insert into public.daily_orders
+        (product_code, customer_name, product_name, quantity, unit_price, order_date, is_real_order,
+         idempotency_key)
+    values
+        (p_product_code, p_customer_name, p_product_name, p_quantity, p_unit_price,
+         p_order_date, p_is_real_order, p_idempotency_key)
+    returning * into v_order;
+
+    return jsonb_build_object(
+        'order', to_jsonb(v_order),
+        'stock', jsonb_build_object('id', v_stock.id, 'miktar', v_stock.miktar, 'gercek_stok', v_stock.gercek_stok)
+    );
+end;
+$$;
+
+grant execute on function public.reserve_stock_and_add_order(text, text, text, integer, numeric, boolean, date, uuid)
+    to anon, authenticated;
@@ -0,0 +1,22 @@
+-- stock_table için iyimser eşzamanlılık: her güncellemede artan version sütunu.
+-- DatabaseManager stok güncellemelerini koşullu yapar (PATCH ...&version=eq.<okunan sürüm>);
+-- arada başka bir istemci satırı değiştirdiyse güncelleme boş döner, satır yeniden okunup
+-- tekrar denenir (bkz. DatabaseManager._update_versioned).
+-- Sürümü tetikleyici artırır; böylece reserve_stock_and_add_order gibi sunucu fonksiyonlarının
+-- yaptığı güncellemeler de eski sürüme dayanan yazmaları engeller.
+
+alter table public.stock_table add column if not exists version integer not null default 1;
+
+create or replace function public.bump_version()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.version := old.version + 1;
+    return new;
+end;
+$$;
+
+drop trigger if exists bump_version on public.stock_table;
+create trigger bump_version before update on public.stock_table
+    for each row execute function public.bump_version();
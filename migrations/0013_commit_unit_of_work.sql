@@ -0,0 +1,95 @@
+-- Birden çok tabloya yapılan yazmaları tek çağrıda ve tek transaction'da uygular.
+-- İstemci DatabaseManager.unit_of_work() ile ekleme/güncelleme/silmeleri toplar, commit'te
+-- hepsini sırasıyla bu fonksiyona gönderir (bkz. database_manager.UnitOfWork). Bir işlem hata
+-- verirse öncekiler de geri alınır; yarım kalmış değişiklik oluşmaz.
+--
+-- p_operations: [{"op": "insert" | "update" | "delete", "table": ..., "values": {...},
+--                 "match": {sütun: değer, ...}, "on_conflict": sütun, "optional": bool}, ...]
+--   insert: values eklenir; on_conflict verilirse çakışan satır values ile güncellenir (upsert)
+--   update/delete: match'teki sütunların hepsi eşit olan satırlar; match boş olamaz.
+--                  Hiç satır eşleşmezse (ör. match'teki version değişmiş) optional değilse
+--                  P0002 hatası verilir ve her şey geri alınır.
+-- Dönüş: her işlem için etkilenen satırların dizisi, işlem sırasıyla.
+-- Tablo adı izin listesinden olmalıdır; sütun adları quote_ident ile, değerler parametreyle geçer.
+-- Fonksiyon çağıranın yetkileriyle (security invoker) çalışır.
+
+create or replace function public.commit_unit_of_work(p_operations jsonb)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_op jsonb;
+    v_table text;
+    v_values jsonb;
+    v_match jsonb;
+    v_columns text;
+    v_record text;
+    v_where text;
+    v_sql text;
+    v_rows jsonb;
+    v_results jsonb := '[]';
+begin
+    for v_op in select * from jsonb_array_elements(p_operations) loop
+        v_table := v_op->>'table';
+        if v_table is null or not v_table = any(array[
+                'transactions', 'stock_table', 'daily_orders', 'contacts', 'passwords', 'imports',
+                'app_status', 'system_info', 'update_logs', 'update_errors']) then
+            raise exception 'Bu tabloya toplu yazma yapılamaz: %', v_table;
+        end if;
+
+        v_values := coalesce(v_op->'values', '{}');
+        v_match := coalesce(v_op->'match', '{}');
+        -- Değerler tablonun satır tipine çevrilir; sadece verilen sütunlar yazılır
+        v_record := format('jsonb_populate_record(null::public.%I, $1)', v_table);
+        select string_agg(quote_ident(k), ', ') into v_columns from jsonb_object_keys(v_values) k;
+        select string_agg(format('t.%1$I = m.%1$I', k), ' and ') into v_where from jsonb_object_keys(v_match) k;
+
+        if v_op->>'op' = 'insert' then
+            if v_columns is null then
+                raise exception 'Eklenecek değer verilmedi: %', v_table;
+            end if;
+            v_sql := format('insert into public.%I as t (%s) select %s from %s', v_table, v_columns, v_columns, v_record);
+            if v_op->>'on_conflict' is not null then
+                v_sql := v_sql || format(' on conflict (%I) do update set (%s) = row(%s)', v_op->>'on_conflict',
+                                         v_columns, (select string_agg('excluded.' || quote_ident(k), ', ')
+                                                       from jsonb_object_keys(v_values) k));
+            end if;
+        elsif v_op->>'op' in ('update', 'delete') then
+            if v_where is null then
+                raise exception 'Güncelleme/silme için eşleşme koşulu gerekli: %', v_table;
+            end if;
+            if v_op->>'op' = 'update' then
+                if v_columns is null then
+                    raise exception 'Güncellenecek değer verilmedi: %', v_table;
+                end if;
+                v_sql := format('update public.%I as t set (%s) = (select %s from %s) from %s m where %s',
+                                v_table, v_columns, v_columns, v_record,
+                                format('jsonb_populate_record(null::public.%I, $2)', v_table), v_where);
+            else
+                v_sql := format('delete from public.%I as t using %s m where %s',
+                                v_table, format('jsonb_populate_record(null::public.%I, $2)', v_table), v_where);
+            end if;
+        else
+            raise exception 'Bilinmeyen işlem: %', v_op->>'op';
+        end if;
+
+        execute format('with w as (%s returning to_jsonb(t) as r) select coalesce(jsonb_agg(r), ''[]'') from w', v_sql)
+           into v_rows
+          using v_values, v_match;
+
+        if v_op->>'op' <> 'insert' and jsonb_array_length(v_rows) = 0
+           and not coalesce((v_op->>'optional')::boolean, false) then
+            raise exception using
+                errcode = 'P0002',
+                message = format('%s: eşleşen kayıt yok ya da başka bir kullanıcı tarafından değiştirildi', v_table),
+                detail = v_match::text;
+        end if;
+
+        v_results := v_results || jsonb_build_array(v_rows);
+    end loop;
+
+    return v_results;
+end;
+$$;
+
+grant execute on function public.commit_unit_of_work(jsonb) to anon, authenticated;
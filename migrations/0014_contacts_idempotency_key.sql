@@ -0,0 +1,7 @@
+-- contacts için idempotency_key (bkz. 0011_idempotency_keys.sql).
+-- add_contact da yazma günlüğünden (write_journal.py) sonradan ve gerekirse tekrar gönderilebilir;
+-- aynı anahtarla gelen ikinci gönderim yeni satır oluşturmaz.
+
+alter table public.contacts add column if not exists idempotency_key uuid;
+
+create unique index if not exists contacts_idempotency_key_key on public.contacts (idempotency_key);
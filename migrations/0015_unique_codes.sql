@@ -0,0 +1,39 @@
+-- Ürün kodu ve kullanıcı adı benzersizliği.
+-- Baz şema bunları zorlamadığı için mevcut veritabanlarında aynı kodlu satırlar olabilir.
+-- Önce tekrarlar aranır; varsa hangi değerlerin kaç satırda geçtiği hata mesajında listelenir
+-- ve migration uygulanmaz (hangi stok satırının doğru olduğuna sistem karar veremez).
+-- Satırlar birleştirilip ya da kodları düzeltildikten sonra migration tekrar çalıştırılır.
+-- Benzersiz indeksler 0009'un benzersiz olmayan indekslerinin yerini alır. 0009'u benzersiz
+-- indekslerle uygulamış veritabanlarında indeksler zaten vardır; burada değişen bir şey olmaz.
+
+do $$
+declare
+    v_duplicates text;
+begin
+    select string_agg(format('%s (%s satır)', urun_kodu, n), ', ' order by urun_kodu) into v_duplicates
+      from (select urun_kodu, count(*) as n from public.stock_table
+             where urun_kodu is not null group by urun_kodu having count(*) > 1) d;
+    if v_duplicates is not null then
+        raise exception using
+            message = 'stock_table.urun_kodu tekrar ediyor; benzersiz indeks oluşturulamadı',
+            detail = 'Tekrar eden ürün kodları: ' || v_duplicates,
+            hint = 'Aynı kodlu satırları birleştirin ya da kodlarını düzeltin, sonra migration''ı tekrar çalıştırın.';
+    end if;
+
+    select string_agg(format('%s (%s satır)', username, n), ', ' order by username) into v_duplicates
+      from (select username, count(*) as n from public.users
+             where username is not null group by username having count(*) > 1) d;
+    if v_duplicates is not null then
+        raise exception using
+            message = 'users.username tekrar ediyor; benzersiz indeks oluşturulamadı',
+            detail = 'Tekrar eden kullanıcı adları: ' || v_duplicates,
+            hint = 'Aynı adlı kullanıcıları birleştirin ya da yeniden adlandırın, sonra migration''ı tekrar çalıştırın.';
+    end if;
+end;
+$$;
+
+create unique index if not exists stock_table_urun_kodu_key on public.stock_table (urun_kodu);
+drop index if exists public.stock_table_urun_kodu_idx;
+
+create unique index if not exists users_username_key on public.users (username);
+drop index if exists public.users_username_idx;
@@ -0,0 +1,129 @@
+-- Değişiklik akışının commit sırasına göre okunması.
+-- change_log.id bigserial'dır ve tetikleyici içinde, yazan transaction sürerken alınır. İki
+-- transaction id'lerinin tersi sırada commit olabilir (ör. id N'yi alan commit_unit_of_work,
+-- N+1'i alan kısa bir eklemeden sonra biter). Sadece "son görülen id'den büyük" kayıtları okuyan
+-- istemci N+1'i gördükten sonra N'yi hiç görmez.
+--
+-- Her kayda yazan transaction'ın numarası (xid) eklenir. get_changes sadece şu anki anlık görüntünün
+-- xmin'inden küçük xid'li kayıtları döndürür. Bu transaction'ların hepsi bitmiştir ve sonradan
+-- bunlardan yeni kayıt gelmez. Kayıtlar (xid, id) sırasıyla döner; istemci son gördüğü (xid, id)
+-- çiftinden devam eder (bkz. change_feed.py, DatabaseManager.get_changes).
+-- Başlangıç noktası change_horizon() ya da dashboard_bootstrap'in aynı anlık görüntüden döndürdüğü
+-- change_horizon'dur: (ufuk, 0) imlecinden sonraki kayıtlar o anda görünmeyen ya da sonra gelen
+-- değişikliklerdir (görünmüş olanlar tekrar gelebilir; sayfalar değişikliği satır id'siyle uygular).
+
+alter table public.change_log
+    add column if not exists xid bigint not null default (pg_current_xact_id()::text::bigint);
+
+create index if not exists change_log_xid_id_idx on public.change_log (xid, id);
+create index if not exists change_log_tbl_xid_id_idx on public.change_log (tbl, xid, id);
+
+create or replace function public.change_horizon()
+returns bigint
+language sql
+stable
+as $$
+    select pg_snapshot_xmin(pg_current_snapshot())::text::bigint;
+$$;
+
+create or replace function public.get_changes(
+    p_after_xid bigint,
+    p_after_id bigint,
+    p_limit integer default 500,
+    p_table text default null
+)
+returns setof public.change_log
+language sql
+stable
+as $$
+    select *
+      from public.change_log c
+     where (c.xid, c.id) > (p_after_xid, p_after_id)
+       and c.xid < pg_snapshot_xmin(pg_current_snapshot())::text::bigint
+       and (p_table is null or c.tbl = p_table)
+     order by c.xid, c.id
+     limit p_limit;
+$$;
+
+-- migrations/0010_summaries.sql'deki fonksiyon; latest_change_id yerine aynı anlık görüntünün change_horizon'u döner
+create or replace function public.dashboard_bootstrap(
+    p_account text,
+    p_start_date date,
+    p_end_date date,
+    p_today date,
+    p_page_size integer default 50
+)
+returns json
+language sql
+stable
+as $$
+    select json_build_object(
+        'change_horizon', pg_snapshot_xmin(pg_current_snapshot())::text::bigint,
+
+        'account_balances', (select coalesce(json_agg(b), '[]')
+                               from public.account_balances(p_start_date, p_end_date) b),
+
+        'account_transactions', (select coalesce(json_agg(t), '[]') from (
+            select id, type, tarih, aciklama, para_birimi, miktar, tl_karsiligi
+              from public.transactions
+             where odeme_turu = p_account and aktif = true
+               and tarih between p_start_date and p_end_date
+             order by tarih desc) t),
+
+        'incomes', (select coalesce(json_agg(t), '[]') from (
+            select id, tarih, aciklama, para_birimi, miktar, odeme_turu, usd_kuru, tl_karsiligi
+              from public.transactions
+             where type = 'income' and aktif = true
+             order by tarih desc, id desc
+             limit p_page_size) t),
+
+        'expenses', (select coalesce(json_agg(t), '[]') from (
+            select id, tarih, aciklama, para_birimi, miktar, odeme_turu, usd_kuru, tl_karsiligi
+              from public.transactions
+             where type = 'expense' and aktif = true
+             order by tarih desc, id desc
+             limit p_page_size) t),
+
+        'stock', (select coalesce(json_agg(t), '[]') from (
+            select id, urun_kodu, urun_adi, miktar, gercek_stok, birim_fiyat
+              from public.stock_table
+             order by urun_adi) t),
+
+        'today_orders', (select coalesce(json_agg(t), '[]') from (
+            select id, product_code, customer_name, product_name, quantity,
+                   unit_price, total_amount, is_real_order
+              from public.daily_orders
+             where order_date = p_today) t),
+
+        'contacts', (select coalesce(json_agg(t), '[]') from (
+            select id, name, phone, description
+              from public.contacts
+             order by created_at desc) t),
+
+        'passwords', (select coalesce(json_agg(t), '[]') from (
+            select id, platform, username, password, description
+              from public.passwords) t),
+
+        'imports', (select coalesce(json_agg(t), '[]') from (
+            select id, urun_adi, miktar, tarih, durum, alt_durum, notlar
+              from public.imports) t),
+
+        'account_summary', (select coalesce(json_agg(s), '[]')
+                              from public.transaction_summary(p_start_date, p_end_date, p_account => p_account,
+                                                              p_group_by => '{type}') s),
+
+        'stock_summary', (select coalesce(json_agg(s), '[]') from public.stock_summary() s),
+
+        'today_orders_summary', (select coalesce(json_agg(s), '[]')
+                                   from public.daily_orders_summary(p_today, p_today) s),
+
+        'income_summary', (select coalesce(json_agg(s), '[]')
+                             from public.transaction_summary(p_type => 'income', p_group_by => '{para_birimi}') s),
+
+        'expense_summary', (select coalesce(json_agg(s), '[]')
+                              from public.transaction_summary(p_type => 'expense', p_group_by => '{para_birimi}') s)
+    );
+$$;
+
+grant execute on function public.change_horizon() to anon, authenticated;
+grant execute on function public.get_changes(bigint, bigint, integer, text) to anon, authenticated;
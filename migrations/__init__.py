@@ -0,0 +1,86 @@
+# migrations/__init__.py
+"""
+Veritabanı şemasının sürümlü migration'ları.
+
+Her dosya NNNN_ad.sql biçimindedir ve numara sırasıyla bir kez çalıştırılır;
+uygulanan sürümler schema_migrations tablosunda tutulur. Şemadaki her değişiklik
+yeni numaralı bir dosyadır, uygulanmış bir dosya sonradan değiştirilmez.
+
+    python -m migrations                 # bekleyenleri uygular (DATABASE_URL)
+    python -m migrations --list          # hangi sürümlerin uygulandığını gösterir
+    python -m migrations --baseline 8    # 1..8 elle (SQL Editor'de) çalıştırılmış: sadece kaydeder
+
+Fonksiyonlar bir psycopg (3) bağlantısı alır. Dosyalar Supabase SQL Editor'de
+sırayla elle de çalıştırılabilir.
+"""
+import os
+import re
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_FILE_PATTERN = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+_CREATE_TABLE_SQL = """
+create table if not exists public.schema_migrations (
+    version integer primary key,
+    name text not null,
+    applied_at timestamptz not null default now()
+)
+"""
+
+
+def list_migrations(directory=MIGRATIONS_DIR):
+    """(sürüm, ad, dosya yolu) listesi, sürüm sırasıyla"""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _FILE_PATTERN.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    migrations.sort()
+    versions = [version for version, _, _ in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f"Aynı numaralı birden fazla migration var: {versions}")
+    return migrations
+
+
+def applied_versions(conn):
+    """schema_migrations'a kayıtlı sürümler"""
+    with conn.cursor() as cur:
+        cur.execute(_CREATE_TABLE_SQL)
+        cur.execute("select version from public.schema_migrations")
+        return {row[0] for row in cur.fetchall()}
+
+
+def apply_migrations(conn, target=None, directory=MIGRATIONS_DIR):
+    """Uygulanmamış migration'ları (target'a kadar) sırayla, her birini kendi transaction'ında çalıştırır.
+
+    Dönüş: uygulanan (sürüm, ad) listesi. Hata veren migration geri alınır ve hata yukarı fırlatılır.
+    """
+    done = applied_versions(conn)
+    applied = []
+    for version, name, path in list_migrations(directory):
+        if version in done or (target is not None and version > target):
+            continue
+        with open(path, encoding="utf-8") as f:
+            sql = f.read()
+        with conn.transaction():
+            with conn.cursor() as cur:
+                cur.execute(sql)
+                cur.execute("insert into public.schema_migrations (version, name) values (%s, %s)",
+                            (version, name))
+        applied.append((version, name))
+    return applied
+
+
+def baseline(conn, version, directory=MIGRATIONS_DIR):
+    """version'a kadarki migration'ları çalıştırmadan uygulanmış olarak kaydeder"""
+    done = applied_versions(conn)
+    marked = []
+    with conn.transaction():
+        with conn.cursor() as cur:
+            for number, name, _ in list_migrations(directory):
+                if number <= version and number not in done:
+                    cur.execute("insert into public.schema_migrations (version, name) values (%s, %s)",
+                                (number, name))
+                    marked.append((number, name))
+    return marked
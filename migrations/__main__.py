@@ -0,0 +1,46 @@
+# migrations/__main__.py
+"""python -m migrations: bekleyen migration'ları DATABASE_URL'deki veritabanına uygular"""
+import argparse
+import os
+import sys
+
+from migrations import list_migrations, applied_versions, apply_migrations, baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m migrations", description="Veritabanı migration'ları")
+    parser.add_argument("--url", default=os.getenv("DATABASE_URL"),
+                        help="Postgres bağlantı adresi (varsayılan: DATABASE_URL)")
+    parser.add_argument("--list", action="store_true", help="Durumu göster, bir şey uygulama")
+    parser.add_argument("--target", type=int, help="Bu sürüme kadar uygula")
+    parser.add_argument("--baseline", type=int, metavar="SÜRÜM",
+                        help="Bu sürüme kadarkileri çalıştırmadan uygulanmış say")
+    args = parser.parse_args()
+
+    if not args.url:
+        parser.error("DATABASE_URL tanımlı değil (ya da --url verin)")
+    try:
+        import psycopg
+    except ImportError:
+        sys.exit("psycopg kurulu değil: pip install 'psycopg[binary]'")
+
+    with psycopg.connect(args.url, autocommit=True) as conn:
+        if args.list:
+            done = applied_versions(conn)
+            for version, name, _ in list_migrations():
+                print(f"{'✓' if version in done else ' '} {version:04d} {name}")
+            return
+        if args.baseline is not None:
+            changed = baseline(conn, args.baseline)
+            verb = "uygulanmış sayıldı"
+        else:
+            changed = apply_migrations(conn, target=args.target)
+            verb = "uygulandı"
+        for version, name in changed:
+            print(f"{version:04d} {name} {verb}")
+        if not changed:
+            print("Bekleyen migration yok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# offline_banner.py
+"""
+Sunucuya ulaşılamadığında ana pencerenin altında gösterilen çevrimdışı bandı.
+
+DatabaseManager.breaker'ın (bkz. db_retry.CircuitBreaker) durumunu izler. Devre açıkken
+okumalar önbellekteki son veriyle cevaplanır, yazmalar günlüğe alınır (bkz. write_journal);
+bant kullanıcıya bunu ve gönderilmeyi bekleyen kayıt sayısını söyler. Devre ve günlük
+herhangi bir thread'de değişebilir; durum sinyalle GUI thread'ine taşınır:
+
+    OfflineBanner(DatabaseManager.instance().breaker, main_window, DatabaseManager.instance().journal)
+"""
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QLabel
+
+from db_retry import CircuitBreaker
+
+MESSAGES = {
+    CircuitBreaker.OPEN: "⚠ Sunucuya ulaşılamıyor. Son alınan veriler gösteriliyor, kayıtlar sıraya alınıyor.",
+    CircuitBreaker.HALF_OPEN: "⚠ Sunucuya yeniden bağlanılıyor...",
+}
+
+
+class OfflineBanner(QObject):
+    state_changed = pyqtSignal(str)
+    journal_changed = pyqtSignal(dict)
+
+    def __init__(self, breaker, main_window, journal=None):
+        super().__init__(main_window)
+        self.breaker = breaker
+        self.journal_stats = journal.stats() if journal is not None else {"pending": 0, "failed": 0}
+        self.status_bar = main_window.statusBar()
+        self.label = QLabel()
+        self.label.setStyleSheet("color: white; background-color: #c0392b; padding: 4px; font-weight: bold;")
+        self.status_bar.addPermanentWidget(self.label, 1)
+
+        self.state_changed.connect(self.show_state)
+        # Dinleyici devrenin thread'inde çağrılır; emit GUI thread'ine kuyruklar
+        listener = self.state_changed.emit
+        breaker.add_listener(listener)
+        self.destroyed.connect(lambda: breaker.remove_listener(listener))
+        if journal is not None:
+            self.journal_changed.connect(self.show_journal)
+            journal_listener = self.journal_changed.emit
+            journal.add_listener(journal_listener)
+            self.destroyed.connect(lambda: journal.remove_listener(journal_listener))
+        self.show_state(breaker.state)
+
+    def show_journal(self, stats):
+        self.journal_stats = stats
+        self.show_state(self.breaker.state)
+
+    def show_state(self, state):
+        parts = [MESSAGES[state]] if state in MESSAGES else []
+        if self.journal_stats["pending"]:
+            parts.append(f"Gönderilmeyi bekleyen kayıt: {self.journal_stats['pending']}")
+        if self.journal_stats["failed"]:
+            parts.append(f"Sunucunun reddettiği kayıt: {self.journal_stats['failed']} (günlüğe bakın)")
+        self.label.setText("  ".join(parts))
+        self.status_bar.setVisible(bool(parts))
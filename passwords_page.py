@@ -8,7 +8,7 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                             QScrollArea, QSizePolicy, QSpacerItem)
 from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QRect, pyqtSignal
 from PyQt5.QtGui import QFont, QPixmap, QIcon, QPalette, QColor, QPainter, QBrush
-from database_manager import DatabaseManager
+from database_manager import DatabaseManager, PAGE_COLUMNS
 
 class PasswordCard(QFrame):
     delete_requested = pyqtSignal(object)
@@ -377,9 +377,9 @@ class AddPasswordDialog(QDialog):
         }
 
 class PasswordManager(QMainWindow):
-    def __init__(self):
+    def __init__(self, db=None):
         super().__init__()
-        self.db = DatabaseManager()
+        self.db = db or DatabaseManager.instance()
         self.setup_ui()
         self.load_passwords()
         
@@ -588,8 +588,13 @@ class PasswordManager(QMainWindow):
         self.count_label.setText(f"Toplam: {len(passwords)} şifre")
     
     def filter_passwords(self, text):
-        passwords = self.db.search_passwords(text) if text else self.db.get_all_passwords()
-        self.refresh_password_list(passwords)
+        # Yazarken gönderilen aramalar aynı key'i kullanır; sadece sonuncusunun sonucu listelenir
+        if text:
+            self.db.submit("search_passwords", text, columns=PAGE_COLUMNS["passwords"],
+                           on_result=self.refresh_password_list, on_error=self.on_passwords_load_failed,
+                           key=(id(self), "load"))
+        else:
+            self.load_passwords()
     
     def remove_password_card(self, card):
         if self.db.delete_password(card.password_id):
@@ -648,11 +653,12 @@ class PasswordManager(QMainWindow):
                 QMessageBox.warning(self, "Hata", "Şifreler silinirken bir hata oluştu!")
     
     def load_passwords(self):
-        try:
-            passwords = self.db.get_all_passwords()
-            self.refresh_password_list(passwords)
-        except Exception as e:
-            QMessageBox.warning(self, "Hata", f"Şifreler yüklenirken hata oluştu: {str(e)}")
+        self.db.submit("get_all_passwords", columns=PAGE_COLUMNS["passwords"],
+                       on_result=self.refresh_password_list, on_error=self.on_passwords_load_failed,
+                       key=(id(self), "load"))
+
+    def on_passwords_load_failed(self, error):
+        QMessageBox.warning(self, "Hata", f"Şifreler yüklenirken hata oluştu: {error}")
 
 def main():
     app = QApplication(sys.argv)
@@ -0,0 +1,157 @@
+# query_cache.py
+"""
+DatabaseManager okumaları için süreç genelinde paylaşılan önbellek.
+
+Her sayfa kendi DatabaseManager'ını oluştursa da hepsi aynı `query_cache`
+nesnesini kullanır; aynı sorgu (tablo, filtreler, projeksiyon) ikinci kez
+sunucuya gitmez. Kayıtlar TTL süresi dolunca ve LRU sınırı aşılınca düşer.
+
+Yazma işlemleri invalidate() ile sadece etkilenen kayıtları siler: yazılan
+satırın filtrelerine uyduğu (ya da uymuş olabileceği) sorgular düşer,
+aynı tablodaki diğer sorgular önbellekte kalır.
+
+Süresi dolan kayıtlar normal okumada ıska sayılır ama LRU sınırına kadar
+saklanır; sunucuya ulaşılamadığında get(key, stale=True) ile son veri döner.
+
+Önceden doldurulan kayıtların (put(..., until_read=True), ör. dashboard_bootstrap) TTL'i
+ilk okundukları anda başlar; sayfa ne zaman açılırsa açılsın ilk okuma önbellekten karşılanır.
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+def _like(pattern, value):
+    regex = "^" + re.escape(str(pattern)).replace("%", ".*").replace("_", ".") + "$"
+    return re.match(regex, str(value), re.IGNORECASE) is not None
+
+
+def _matches(op, row_value, value):
+    """Tek bir filtrenin satıra uyup uymadığı; karar verilemiyorsa True"""
+    try:
+        if op == "eq":
+            return row_value == value
+        if op == "neq":
+            return row_value != value
+        if row_value is None:
+            return False
+        if op == "gt":
+            return row_value > value
+        if op == "gte":
+            return row_value >= value
+        if op == "lt":
+            return row_value < value
+        if op == "lte":
+            return row_value <= value
+        if op == "in_":
+            return row_value in value
+        if op == "ilike":
+            return _like(value, row_value)
+    except TypeError:
+        pass
+    return True
+
+
+class QueryCache:
+    """TTL ve LRU sınırlı, yazmalarla geçersiz kılınan okuma önbelleği"""
+
+    def __init__(self, ttl=30.0, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_hits = 0
+
+    def get(self, key, stale=False):
+        """(bulundu_mu, veri) döndürür; stale=True ise süresi dolmuş kayıt da döner"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if not stale:
+                    self.misses += 1
+                return False, None
+            if stale:
+                self.stale_hits += 1
+                return True, entry["data"]
+            if entry["stored_at"] is None:
+                # Önceden doldurulmuş kayıt ilk kez okunuyor; TTL şimdi başlar
+                entry["stored_at"] = time.monotonic()
+            elif time.monotonic() - entry["stored_at"] > self.ttl:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry["data"]
+
+    def put(self, key, data, table, filters=(), until_read=False):
+        """Sorgu sonucunu saklar; filters, invalidate() eşleştirmesi için kullanılır.
+
+        until_read=True ise kayıt ilk okunana kadar TTL ile düşmez (LRU ve invalidate() yine düşürür).
+        """
+        with self._lock:
+            self._entries[key] = {
+                "data": data,
+                "table": table,
+                "filters": tuple(filters),
+                "stored_at": None if until_read else time.monotonic()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, table, rows=None, changed_columns=None):
+        """Yazılan satırlardan etkilenen kayıtları siler.
+
+        rows verilmezse tablonun tüm kayıtları düşer. changed_columns, bir
+        güncellemede değişen sütunlardır: satırın eski değerleri bilinmediği
+        için bu sütunlara ait filtreler "uymuş olabilir" kabul edilir.
+        """
+        changed_columns = set(changed_columns or ())
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if entry["table"] == table
+                     and (rows is None or any(self._affects(entry["filters"], row, changed_columns)
+                                               for row in rows))]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def _affects(self, filters, row, changed_columns):
+        for op, column, value in filters:
+            if column is None or column in changed_columns or column not in row:
+                continue
+            if not _matches(op, row[column], value):
+                return False
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """İsabet/ıska istatistikleri"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale_hits": self.stale_hits,
+                "size": len(self._entries)
+            }
+
+
+query_cache = QueryCache(
+    ttl=float(os.getenv("QUERY_CACHE_TTL", "30")),
+    max_entries=int(os.getenv("QUERY_CACHE_SIZE", "256"))
+)
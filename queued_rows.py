@@ -0,0 +1,96 @@
+# queued_rows.py
+"""
+Yazma günlüğünde (write_journal.py) bekleyen kayıtların sayfalardaki karşılığı.
+
+JournalWatcher, WriteJournal.add_sent_listener sonuçlarını GUI thread'ine taşır; sayfa bir
+callback(seq, sonuç, hata) verir. QueuedRowsMixin, QTableWidget'lı sayfalarda (self.table)
+sıradaki satırı QueuedWrite.seq'iyle işaretler: satır gri gösterilir, düzenlenip silinemez;
+gönderilince sunucudaki id'sini alır, sunucu reddederse tablodan kaldırılır:
+
+    class IncomePageWidget(QueuedRowsMixin, QWidget):
+        QUEUED_REJECTED_MESSAGE = "Sıradaki gelir kaydı sunucu tarafından reddedildi"
+
+        def __init__(self, ...):
+            ...
+            self.watch_journal()
+"""
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QMessageBox
+
+# Sunucuya henüz gönderilmemiş (günlükte bekleyen) satırın QueuedWrite.seq'i
+QUEUED_SEQ_ROLE = Qt.UserRole + 1
+
+
+class JournalWatcher(QObject):
+    """Günlüğün gönderim sonuçlarını parent'ın thread'inde callback(seq, result, error) ile bildirir.
+
+    journal None ise (günlük kapalı) hiçbir şey yapmaz. Dinleyici parent silinince kaldırılır.
+    """
+    sent = pyqtSignal(int, object, object)
+
+    def __init__(self, journal, parent, callback):
+        super().__init__(parent)
+        self.sent.connect(callback)
+        if journal is None:
+            return
+        # Dinleyici gönderimin thread'inde çağrılır; emit GUI thread'ine kuyruklar
+        listener = self.sent.emit
+        journal.add_sent_listener(listener)
+        self.destroyed.connect(lambda: journal.remove_sent_listener(listener))
+
+
+class QueuedRowsMixin:
+    """self.table (QTableWidget) ve self.db'si olan sayfalar için sıradaki satır işlemleri.
+
+    Satırın sunucu id'si 0. sütunda Qt.UserRole'dedir. Sayfa QUEUED_REJECTED_MESSAGE'ı tanımlar;
+    update_totals varsa gönderim sonucundan sonra çağrılır.
+    """
+    QUEUED_REJECTED_MESSAGE = "Sıradaki kayıt sunucu tarafından reddedildi"
+
+    def watch_journal(self):
+        self.journal_watcher = JournalWatcher(self.db.journal, self, self.on_queued_write_sent)
+
+    def mark_queued_row(self, row, seq):
+        """Satırı sunucuya gönderilmeyi bekliyor olarak işaretler (gri, düzenlenemez/silinemez)"""
+        self._set_queued_style(row, QColor("gray"), "Sunucuya gönderilmeyi bekliyor")
+        self.table.item(row, 0).setData(QUEUED_SEQ_ROLE, seq)
+
+    def is_queued_row(self, row):
+        return self.table.item(row, 0).data(QUEUED_SEQ_ROLE) is not None
+
+    def refuse_queued_row(self, row, action):
+        """Satır sıradaysa kullanıcıya söyler ve True döner; action: "düzenlenebilir", "silinebilir" """
+        if not self.is_queued_row(row):
+            return False
+        QMessageBox.information(self, "Bilgi", f"Bu kayıt henüz sunucuya gönderilmedi; gönderildikten sonra {action}.")
+        return True
+
+    def find_queued_row(self, seq):
+        return next((row for row in range(self.table.rowCount())
+                     if self.table.item(row, 0) and self.table.item(row, 0).data(QUEUED_SEQ_ROLE) == seq), -1)
+
+    def on_queued_write_sent(self, seq, result, error):
+        row = self.find_queued_row(seq)
+        if row < 0:
+            return
+        if error is not None:
+            self.table.removeRow(row)
+            QMessageBox.warning(self, "Hata", f"{self.QUEUED_REJECTED_MESSAGE}:\n{error}")
+        else:
+            # Satır sunucudaki id'sini alır; artık düzenlenip silinebilir
+            self._set_queued_style(row, None, "")
+            self.table.item(row, 0).setData(Qt.UserRole, result.get('id'))
+            self.table.item(row, 0).setData(QUEUED_SEQ_ROLE, None)
+        if hasattr(self, "update_totals"):
+            self.update_totals()
+
+    def _set_queued_style(self, row, color, tooltip):
+        # itemChanged (ör. satırın yeniden hesaplanması) tetiklenmesin
+        self.table.blockSignals(True)
+        for col in range(self.table.columnCount()):
+            item = self.table.item(row, col)
+            if item:
+                item.setData(Qt.ForegroundRole, color)
+                item.setToolTip(tooltip)
+        self.table.blockSignals(False)
@@ -6,6 +6,8 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
 from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QFont, QIcon, QPalette, QColor
 from database_manager import DatabaseManager
+from write_journal import QueuedWrite
+from queued_rows import JournalWatcher
 
 class ReferencePageItem(QWidget):
     def __init__(self, contact_id, name, phone, description, parent_window):
@@ -167,11 +169,23 @@ class ReferencePageItem(QWidget):
         self.parent_window.delete_contact(self.contact_id, self.name)
 
 class ReferencePage(QMainWindow):
-    def __init__(self):
+    def __init__(self, db=None):
         super().__init__()
-        self.db_manager = DatabaseManager()
+        self.db_manager = db or DatabaseManager.instance()
+        # Günlükte sırada bekleyen kişilerin QueuedWrite.seq'leri; gönderilince liste yenilenir
+        self.queued_contacts = set()
         self.setup_ui()
         self.load_contacts()
+        self.journal_watcher = JournalWatcher(self.db_manager.journal, self, self.on_queued_write_sent)
+
+    def on_queued_write_sent(self, seq, result, error):
+        if seq not in self.queued_contacts:
+            return
+        self.queued_contacts.discard(seq)
+        if error is not None:
+            QMessageBox.warning(self, "Hata", f"Sıradaki kişi sunucu tarafından reddedildi:\n{error}")
+        else:
+            self.load_contacts()
         
     def setup_ui(self):
         self.setWindowTitle("Referans Sayfası - Kişi Yönetimi")
@@ -389,15 +403,18 @@ class ReferencePage(QMainWindow):
         self.editing_contact_id = None
         
     def load_contacts(self):
-        """Tüm kişileri yükle"""
+        """Tüm kişileri arka planda yükle"""
+        self.db_manager.submit("get_all_contacts", on_result=self.show_contacts,
+                               on_error=lambda error: QMessageBox.critical(
+                                   self, "Hata", f"Kişiler yüklenirken hata oluştu: {error}"),
+                               key=(id(self), "load"))
+
+    def show_contacts(self, contacts):
+        """Gelen kişileri listeye yaz"""
         self.contact_list.clear()
-        try:
-            contacts = self.db_manager.get_all_contacts()
-            for contact in contacts:
-                contact_id, name, phone, description = contact
-                self.add_contact_to_list(contact_id, name, phone, description)
-        except Exception as e:
-            QMessageBox.critical(self, "Hata", f"Kişiler yüklenirken hata oluştu: {str(e)}")
+        for contact in contacts:
+            contact_id, name, phone, description = contact
+            self.add_contact_to_list(contact_id, name, phone, description)
     
     def add_contact_to_list(self, contact_id, name, phone, description):
         """Listeye kişi ekle"""
@@ -431,7 +448,16 @@ class ReferencePage(QMainWindow):
             else:
                 # Yeni ekleme
                 contact_id = self.db_manager.add_contact(name, phone, description)
-                if contact_id:
+                if isinstance(contact_id, QueuedWrite):
+                    # Kişi günlükte sırada; gönderilince liste yenilenir (on_queued_write_sent)
+                    self.queued_contacts.add(contact_id.seq)
+                    if self.db_manager.breaker.is_open:
+                        QMessageBox.information(self, "Sıraya Alındı",
+                                                "Sunucuya ulaşılamadı. Kişi kaydedildi ve bağlantı gelince gönderilecek.")
+                    else:
+                        QMessageBox.information(self, "Başarılı", "Kişi kaydedildi!")
+                    self.clear_form()
+                elif contact_id:
                     QMessageBox.information(self, "Başarılı", "Kişi başarıyla eklendi!")
                     self.clear_form()
                     self.load_contacts()
@@ -485,18 +511,13 @@ class ReferencePage(QMainWindow):
     
     def search_contacts(self, text):
         """Kişi ara"""
-        self.contact_list.clear()
-        try:
-            if text.strip():
-                contacts = self.db_manager.search_contacts(text)
-            else:
-                contacts = self.db_manager.get_all_contacts()
-            
-            for contact in contacts:
-                contact_id, name, phone, description = contact
-                self.add_contact_to_list(contact_id, name, phone, description)
-        except Exception as e:
-            QMessageBox.critical(self, "Hata", f"Arama sırasında hata oluştu: {str(e)}")
+        if not text.strip():
+            self.load_contacts()
+            return
+        self.db_manager.submit("search_contacts", text, on_result=self.show_contacts,
+                               on_error=lambda error: QMessageBox.critical(
+                                   self, "Hata", f"Arama sırasında hata oluştu: {error}"),
+                               key=(id(self), "load"))
     
     def clear_form(self):
         """Formu temizle"""
@@ -8,7 +8,8 @@ from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QPalette, QColor, QIcon
 import json
 import os
-from database_manager import DatabaseManager
+from database_manager import DatabaseManager, PAGE_COLUMNS, ConflictError
+from change_feed import get_change_feed
 import logging
 
 class StockAddPage(QDialog):
@@ -95,21 +96,25 @@ class StockAddPage(QDialog):
         }
 
 class StockPage(QMainWindow):
-    def __init__(self, user_role, parent=None):  # user_role parametresi eklendi
+    def __init__(self, user_role, parent=None, db=None):  # user_role parametresi eklendi
         super().__init__(parent)
         self.user_role = user_role
         self.setWindowTitle("Stok Yönetim Sistemi")
         self.setGeometry(100, 100, 1000, 700)
         self.setMinimumSize(800, 500)
-        self.db = DatabaseManager()
-        self.stok_verileri = self.db.get_all_stock_items()
+        self.db = db or DatabaseManager.instance()
+        self.stok_verileri = []
+        self.load_generation = 0
+        self.stream_started = False
         
         # Veri dosyası
         
         
         
         self.setupUI()
-        self.load_table_data()
+        # Stok verisi arka planda gelir; pencere bu sırada donmaz
+        self.reload_stock()
+        get_change_feed().changed.connect(self.on_remote_change)
         
         # Otomatik kayıt için timer
         self.save_timer = QTimer()
@@ -404,33 +409,61 @@ class StockPage(QMainWindow):
     def save_data(self):
         self.statusBar().showMessage("Veriler Supabase'e kaydedildi ✓", 2000)
     
+    def reload_stock(self, message=None):
+        """Stok verilerini thread havuzunda, geldikçe gruplar halinde getirir.
+
+        İlk grup gelince tablo temizlenip doldurulmaya başlar; yanıtın tamamı beklenmez.
+        """
+        # Önceki yüklemenin kuyrukta kalmış grupları yeni tabloya karışmasın
+        self.load_generation += 1
+        generation = self.load_generation
+        self.stream_started = False
+        self.db.submit("iter_all_stock_items", columns=PAGE_COLUMNS["stock"],
+                       on_batch=lambda rows: self.on_stock_batch(rows, generation),
+                       on_result=lambda count: self.on_stock_loaded(generation, message),
+                       on_error=self.on_stock_load_failed,
+                       key=(id(self), "load"))
+
+    def on_stock_batch(self, rows, generation):
+        """Gelen satır grubunu tablonun sonuna ekler"""
+        if generation != self.load_generation:
+            return
+        if not self.stream_started:
+            self.stream_started = True
+            self.stok_verileri = []
+            self.table.setRowCount(0)
+        start = len(self.stok_verileri)
+        self.stok_verileri.extend(rows)
+        self.table.setRowCount(len(self.stok_verileri))
+        for offset, item in enumerate(rows):
+            if item:
+                self.set_table_row(start + offset, item)
+        self.statusBar().showMessage(f"Yükleniyor... {len(self.stok_verileri)} ürün")
+
+    def on_stock_loaded(self, generation, message=None):
+        if generation != self.load_generation:
+            return
+        if not self.stream_started:
+            # Hiç satır gelmedi
+            self.stok_verileri = []
+            self.table.setRowCount(0)
+        self.filter_table()
+        self.update_statistics()
+        self.statusBar().showMessage(message or "Hazır", 3000 if message else 0)
+
+    def on_stock_load_failed(self, error):
+        QMessageBox.critical(self, "Hata", f"Veriler yüklenirken hata oluştu: {error}")
+        logging.error(f"Stok yükleme hatası: {error}")
+
     def load_table_data(self):
         try:
             self.table.setRowCount(0)  # Önce tabloyu temizle
-            if not self.stok_verileri:  # Eğer stok verileri boşsa
-                self.stok_verileri = self.db.get_all_stock_items()  # Yeniden yükle
-                
             self.table.setRowCount(len(self.stok_verileri))
             
             for row, item in enumerate(self.stok_verileri):
                 if not item:  # Eğer item None veya boşsa atla
                     continue
-                    
-                self.table.setItem(row, 0, QTableWidgetItem(item.get('urun_kodu', '')))
-                self.table.setItem(row, 1, QTableWidgetItem(item.get('urun_adi', '')))
-                self.table.setItem(row, 2, QTableWidgetItem(str(item.get('miktar', 0))))
-                self.table.setItem(row, 3, QTableWidgetItem(str(item.get('gercek_stok', item.get('miktar', 0)))))
-                self.table.setItem(row, 4, QTableWidgetItem(f"{item.get('birim_fiyat', 0):.2f} TL"))
-                
-                # Toplam değer hesaplama (daha güvenli)
-                try:
-                    miktar = float(item.get('miktar', 0))
-                    birim_fiyat = float(item.get('birim_fiyat', 0))
-                    toplam_deger = miktar * birim_fiyat
-                    self.table.setItem(row, 5, QTableWidgetItem(f"{toplam_deger:.2f} TL"))
-                except (TypeError, ValueError) as e:
-                    self.table.setItem(row, 5, QTableWidgetItem("0.00 TL"))
-                    logging.error(f"Toplam değer hesaplanırken hata: {str(e)}")
+                self.set_table_row(row, item)
             
             self.update_statistics()
             
@@ -438,6 +471,53 @@ class StockPage(QMainWindow):
             QMessageBox.critical(self, "Hata", f"Tablo yüklenirken hata oluştu: {str(e)}")
             logging.exception("Tablo yükleme hatası")
     
+    def set_table_row(self, row, item):
+        """Tablodaki tek bir satırı stok kaydıyla doldurur"""
+        self.table.setItem(row, 0, QTableWidgetItem(item.get('urun_kodu', '')))
+        self.table.setItem(row, 1, QTableWidgetItem(item.get('urun_adi', '')))
+        self.table.setItem(row, 2, QTableWidgetItem(str(item.get('miktar', 0))))
+        self.table.setItem(row, 3, QTableWidgetItem(str(item.get('gercek_stok', item.get('miktar', 0)))))
+        self.table.setItem(row, 4, QTableWidgetItem(f"{item.get('birim_fiyat', 0):.2f} TL"))
+        
+        # Toplam değer hesaplama (daha güvenli)
+        try:
+            miktar = float(item.get('miktar', 0))
+            birim_fiyat = float(item.get('birim_fiyat', 0))
+            toplam_deger = miktar * birim_fiyat
+            self.table.setItem(row, 5, QTableWidgetItem(f"{toplam_deger:.2f} TL"))
+        except (TypeError, ValueError) as e:
+            self.table.setItem(row, 5, QTableWidgetItem("0.00 TL"))
+            logging.error(f"Toplam değer hesaplanırken hata: {str(e)}")
+
+    def on_remote_change(self, change):
+        """Değişiklik akışından gelen stok kaydını tabloya uygular (tablo baştan yüklenmez)"""
+        if change["tbl"] != "stock_table":
+            return
+        try:
+            item = change["row"]
+            index = next((i for i, x in enumerate(self.stok_verileri) if x.get('id') == change["row_id"]), -1)
+
+            if change["op"] == "DELETE":
+                if index < 0:
+                    return
+                del self.stok_verileri[index]
+                self.table.removeRow(index)
+            elif index >= 0:
+                self.stok_verileri[index] = item
+                self.set_table_row(index, item)
+            else:
+                # Liste ürün adına göre sıralı
+                index = next((i for i, x in enumerate(self.stok_verileri)
+                              if x.get('urun_adi', '') > item.get('urun_adi', '')), len(self.stok_verileri))
+                self.stok_verileri.insert(index, item)
+                self.table.insertRow(index)
+                self.set_table_row(index, item)
+
+            self.filter_table()
+            self.update_statistics()
+        except Exception:
+            logging.exception("Stok değişikliği uygulanamadı")
+
     def filter_table(self):
         search_text = self.search_input.text().lower()
         
@@ -471,9 +551,7 @@ class StockPage(QMainWindow):
                     )
                     if result:
                         # Verileri yeniden yükle
-                        self.stok_verileri = self.db.get_all_stock_items()
-                        self.load_table_data()
-                        self.statusBar().showMessage(f"'{data['urun_adi']}' ürünü eklendi ✓", 3000)
+                        self.reload_stock(f"'{data['urun_adi']}' ürünü eklendi ✓")
                     else:
                         QMessageBox.warning(self, "Hata", "Ürün eklenemedi!")
                 except Exception as e:
@@ -497,21 +575,25 @@ class StockPage(QMainWindow):
             if dialog.exec_() == QDialog.Accepted:
                 data = dialog.get_data()
                 if data['urun_kodu'] and data['urun_adi']:
-                    result = self.db.update_stock_item(
-                        item_id=self.stok_verileri[current_row]['id'],
-                        urun_kodu=data['urun_kodu'],
-                        urun_adi=data['urun_adi'],
-                        miktar=data['miktar'],
-                        birim_fiyat=data['birim_fiyat']
-                    )
+                    try:
+                        # current_data: düzenlemenin başladığı değerler; arada başka bir istemci
+                        # aynı alanı değiştirdiyse üzerine yazılmaz
+                        result = self.db.update_stock_item(
+                            item_id=current_data['id'],
+                            base=current_data,
+                            urun_kodu=data['urun_kodu'],
+                            urun_adi=data['urun_adi'],
+                            miktar=data['miktar'],
+                            birim_fiyat=data['birim_fiyat']
+                        )
+                    except ConflictError as e:
+                        QMessageBox.warning(self, "Çakışma", f"{e}\nGüncel veriler yüklendi, lütfen tekrar düzenleyin.")
+                        self.reload_stock()
+                        return
                     if result:
-                        self.stok_verileri = self.db.get_all_stock_items()
-                        self.load_table_data()
-                        self.statusBar().showMessage(f"'{data['urun_adi']}' ürünü güncellendi ✓", 3000)
+                        self.reload_stock(f"'{data['urun_adi']}' ürünü güncellendi ✓")
                     else:
                         QMessageBox.warning(self, "Hata", "Ürün güncellenemedi!")
-
-                    self.statusBar().showMessage(f"'{data['urun_adi']}' ürünü güncellendi ✓", 3000)
                 else:
                     QMessageBox.warning(self, "Hata", "Ürün kodu ve ürün adı boş olamaz!")
         else:
@@ -520,9 +602,7 @@ class StockPage(QMainWindow):
     def verileri_yenile(self):
         """Veritabanından verileri yeniden yükler ve tabloyu günceller"""
         try:
-            self.stok_verileri = self.db.get_all_stock_items()
-            self.load_table_data()
-            self.statusBar().showMessage("Veriler yenilendi ✓", 2000)
+            self.reload_stock("Veriler yenilendi ✓")
         except Exception as e:
             QMessageBox.critical(self, "Hata", f"Veriler yenilenirken hata oluştu: {str(e)}")
             logging.exception("Veri yenileme hatası")        
@@ -551,9 +631,7 @@ class StockPage(QMainWindow):
                     result = self.db.delete_stock_item(urun_id)
                     if result:
                         # Verileri yeniden yükle
-                        self.stok_verileri = self.db.get_all_stock_items()
-                        self.load_table_data()
-                        self.statusBar().showMessage(f"'{urun_adi}' ürünü silindi ✓", 3000)
+                        self.reload_stock(f"'{urun_adi}' ürünü silindi ✓")
                     else:
                         QMessageBox.warning(self, "Hata", "Ürün silinemedi!")
                         
@@ -564,11 +642,14 @@ class StockPage(QMainWindow):
             QMessageBox.information(self, "Bilgi", "Lütfen silmek istediğiniz ürünü seçin.")
         
     def update_statistics(self):
-        total_items = len(self.stok_verileri)
-        total_value = sum(item['miktar'] * item['birim_fiyat'] for item in self.stok_verileri)
-        
-        self.total_items_label.setText(f"📊 Toplam Ürün: {total_items}")
-        self.total_value_label.setText(f"💰 Toplam Değer: {total_value:.2f} TL")
+        """Alt satırdaki toplamları sunucudaki stock_summary'den alır (tablodaki satırlar gezilmez)"""
+        self.db.submit("get_stock_summary", on_result=self.show_statistics,
+                       on_error=lambda error: logging.error(f"Stok özeti alınamadı: {error}"),
+                       key=(id(self), "summary"))
+
+    def show_statistics(self, summary):
+        self.total_items_label.setText(f"📊 Toplam Ürün: {summary['total_items']}")
+        self.total_value_label.setText(f"💰 Toplam Değer: {summary['total_value']:.2f} TL")
     
     def closeEvent(self, event):
         self.save_data()
@@ -1,16 +1,35 @@
 # supabase_client.py
 import os
+import httpx
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from supabase import create_client, Client, ClientOptions
 from datetime import datetime
+from db_retry import apply_deadline
 
 load_dotenv()
 # Supabase connection credentials
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
+# Connection pool shared by every request in the process. TLS setup is paid
+# once per session; later requests reuse the keep-alive connections.
+POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "120"))
+
+http_client = httpx.Client(
+    limits=httpx.Limits(
+        max_connections=POOL_SIZE,
+        max_keepalive_connections=POOL_SIZE,
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    ),
+    timeout=httpx.Timeout(30.0, connect=10.0),
+    follow_redirects=True,
+    # DatabaseManager'ın çağrı başına süre sınırı (db_retry.deadline) zaman aşımlarını kısaltır
+    event_hooks={"request": [apply_deadline]}
+)
+
 # Create and export the Supabase client instance
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY, options=ClientOptions(httpx_client=http_client))
 
 def test_connection():
     """Test the Supabase connection"""
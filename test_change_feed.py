@@ -0,0 +1,62 @@
+# test_change_feed.py
+"""change_feed.ChangeFeed testleri"""
+from PyQt5.QtCore import QCoreApplication
+
+from change_feed import ChangeFeed
+from db_tasks import get_runner
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+
+def _settle():
+    get_runner().wait()
+    app.processEvents()
+
+
+def test_feed_delivers_row_changes_from_other_clients(local_db):
+    local_db.supabase.seed("daily_orders", [{"id": 1, "order_date": "2024-05-02", "quantity": 1, "unit_price": 5.0}])
+    local_db.get_all_daily_orders("2024-05-02")
+    feed = ChangeFeed(local_db, interval_ms=0)
+    changes = []
+    feed.changed.connect(changes.append)
+
+    feed.poll()
+    _settle()
+    # Başka bir masadan gelen sipariş ve güncelleme
+    local_db.supabase.table("daily_orders").insert({"order_date": "2024-05-02", "quantity": 2, "unit_price": 3.0}).execute()
+    local_db.supabase.table("daily_orders").update({"quantity": 4}).eq("id", 1).execute()
+    feed.poll()
+    _settle()
+
+    assert [(c["op"], c["row_id"]) for c in changes] == [("INSERT", 2), ("UPDATE", 1)]
+    assert changes[1]["row"]["total_amount"] == 20.0
+    # Önbellekteki sorgu düştü; sonraki okuma güncel
+    assert len(local_db.get_all_daily_orders("2024-05-02")) == 2
+
+
+def test_feed_does_not_skip_changes_committed_out_of_id_order(local_db):
+    feed = ChangeFeed(local_db, interval_ms=0)
+    changes = []
+    feed.changed.connect(changes.append)
+    feed.poll()
+    _settle()
+
+    def logged(id, xid):
+        return {"id": id, "xid": xid, "tbl": "daily_orders", "op": "INSERT", "row_id": id,
+                "row": {"id": id, "order_date": "2024-05-02"}, "old_row": None}
+
+    # Uzun bir transaction (xid 5) id 1'i aldı ama sürüyor; kısa olanı (xid 6) id 2 ile commit oldu
+    log = local_db.supabase.tables.setdefault("change_log", [])
+    local_db.supabase.running_xids.add(5)
+    log.append(logged(2, 6))
+    feed.poll()
+    _settle()
+    assert changes == []
+
+    # Uzun transaction commit olunca iki kayıt da, commit sırasıyla gelir
+    log.insert(0, logged(1, 5))
+    local_db.supabase.running_xids.discard(5)
+    feed.poll()
+    _settle()
+    assert [c["id"] for c in changes] == [1, 2]
+    assert feed.cursor == (6, 2)
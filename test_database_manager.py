@@ -0,0 +1,496 @@
+# test_database_manager.py
+"""DatabaseManager testleri (bellek içi LocalSupabase ile, bkz. conftest.py)"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from database_manager import PAGE_COLUMNS, ConflictError
+from db_retry import RetryPolicy
+
+
+def _last_select(db, table):
+    """Verilen tabloya gönderilen son GET isteğinin select= değeri"""
+    for request in reversed(db.supabase.requests):
+        if request["table"] == table and request["method"] == "GET":
+            return request["params"]["select"]
+    raise AssertionError(f"{table} tablosuna okuma isteği gönderilmedi")
+
+
+def test_account_page_load_projects_columns(local_db):
+    local_db.supabase.seed("transactions", [
+        {"type": "income", "tarih": "2024-05-02", "aciklama": "Satış", "para_birimi": "TL",
+         "miktar": 100.0, "tl_karsiligi": 100.0, "odeme_turu": "CASH", "usd_kuru": None},
+        {"type": "expense", "tarih": "2024-05-03", "aciklama": "Kira", "para_birimi": "TL",
+         "miktar": 40.0, "tl_karsiligi": 40.0, "odeme_turu": "Tonboo Ziraat", "usd_kuru": None},
+    ])
+
+    rows = local_db.get_account_transactions("CASH", "2024-05-01", "2024-05-31",
+                                             columns=PAGE_COLUMNS["account"])
+
+    assert _last_select(local_db, "transactions") == "id,type,tarih,aciklama,para_birimi,miktar,tl_karsiligi"
+    assert [row["aciklama"] for row in rows] == ["Satış"]
+    assert set(rows[0]) == set(PAGE_COLUMNS["account"])
+
+
+def test_income_and_expense_page_load_projects_columns(local_db):
+    expected = "id,tarih,aciklama,para_birimi,miktar,odeme_turu,usd_kuru,tl_karsiligi"
+
+    local_db.get_all_incomes(page_size=50, columns=PAGE_COLUMNS["income"])
+    assert _last_select(local_db, "transactions") == expected
+
+    local_db.get_all_expenses(page_size=50, columns=PAGE_COLUMNS["expense"])
+    assert _last_select(local_db, "transactions") == expected
+
+
+def test_other_page_loads_project_columns(local_db):
+    local_db.get_all_stock_items(columns=PAGE_COLUMNS["stock"])
+    assert _last_select(local_db, "stock_table") == "id,urun_kodu,urun_adi,miktar,gercek_stok,birim_fiyat"
+
+    local_db.get_today_orders(columns=PAGE_COLUMNS["daily_orders"])
+    assert _last_select(local_db, "daily_orders") == \
+        "id,product_code,customer_name,product_name,quantity,unit_price,total_amount,is_real_order"
+
+    local_db.get_all_passwords(columns=PAGE_COLUMNS["passwords"])
+    assert _last_select(local_db, "passwords") == "id,platform,username,password,description"
+
+    local_db.get_all_imports(columns=PAGE_COLUMNS["imports"])
+    assert _last_select(local_db, "imports") == "id,urun_adi,miktar,tarih,durum,alt_durum,notlar"
+
+    # Referans sayfası kişileri demet olarak alır; projeksiyon varsayılan olarak uygulanır
+    local_db.get_all_contacts()
+    assert _last_select(local_db, "contacts") == "id,name,phone,description"
+
+
+def test_reads_default_to_all_columns(local_db):
+    local_db.get_all_stock_items()
+    assert _last_select(local_db, "stock_table") == "*"
+
+
+def test_daily_orders_summary_does_not_download_rows(local_db):
+    local_db.supabase.seed("daily_orders", [
+        {"order_date": "2024-05-02", "quantity": 2, "unit_price": 10.0, "total_amount": 20.0},
+        {"order_date": "2024-05-02", "quantity": 1, "unit_price": 5.0, "total_amount": 5.0},
+        {"order_date": "2024-05-03", "quantity": 1, "unit_price": 7.0, "total_amount": 7.0},
+    ])
+
+    summary = local_db.get_daily_orders_summary("2024-05-02")
+
+    assert summary == {"total_orders": 2, "total_amount": 25.0, "min_amount": 5.0, "max_amount": 20.0}
+    assert [(r["method"], r["table"]) for r in local_db.supabase.requests] == [("RPC", "daily_orders_summary")]
+    assert local_db.get_daily_orders_summary("2024-06-01")["total_orders"] == 0
+
+
+def test_transaction_summary_groups_and_follows_writes(local_db):
+    for tarih, currency, amount, tl in (("2024-05-01", "TL", 100, 100), ("2024-05-02", "USD", 10, 320),
+                                        ("2024-05-02", "USD", 5, 160)):
+        local_db.add_income(tarih=tarih, aciklama="Satış", para_birimi=currency, miktar=amount,
+                            tl_karsiligi=tl, odeme_turu="CASH")
+    local_db.add_expense(tarih="2024-05-02", aciklama="Kira", para_birimi="TL", miktar=50, odeme_turu="CASH")
+
+    by_currency = local_db.get_transaction_summary(type="income", group_by=["para_birimi"])
+    assert [(r["para_birimi"], r["adet"], r["toplam"], r["tl_toplam"], r["en_az"], r["en_cok"])
+            for r in by_currency] == [("TL", 1, 100.0, 100.0, 100.0, 100.0), ("USD", 2, 15.0, 480.0, 5.0, 10.0)]
+    assert local_db.get_account_summary("CASH", "2024-05-01", "2024-05-31") == {
+        "income": 580.0, "expense": 50.0, "net": 530.0, "count": 4}
+
+    # Özet önbellekten gelir; sadece ilgili satırlara yapılan yazma kaydı düşürür
+    requests = len(local_db.supabase.requests)
+    local_db.get_transaction_summary(type="income", group_by=["para_birimi"])
+    local_db.add_expense(tarih="2024-05-03", aciklama="Fatura", para_birimi="TL", miktar=5, odeme_turu="CASH")
+    local_db.get_transaction_summary(type="income", group_by=["para_birimi"])
+    assert [r["table"] for r in local_db.supabase.requests[requests:] if r["method"] == "RPC"] == []
+    assert local_db.get_account_summary("CASH", "2024-05-01", "2024-05-31")["expense"] == 55.0
+
+
+def test_count_uses_head_request(local_db):
+    local_db.supabase.seed("daily_orders", [{"product_code": "A1", "order_date": "2024-05-02"}])
+
+    assert local_db.check_product_code_exists("A1")
+    assert not local_db.check_product_code_exists("B2")
+    request = local_db.supabase.requests[-1]
+    assert (request["method"], request["head"], request["params"]["select"]) == ("GET", True, "id")
+
+
+def _get_count(db, table):
+    return sum(1 for request in db.supabase.requests if request["table"] == table and request["method"] == "GET")
+
+
+def test_repeated_reads_are_served_from_cache(local_db):
+    for _ in range(3):
+        local_db.get_expenses_by_date_range("2024-05-01", "2024-05-31", columns=PAGE_COLUMNS["expense"])
+
+    assert _get_count(local_db, "transactions") == 1
+    assert local_db.cache.stats()["hits"] == 2
+    assert local_db.cache.stats()["misses"] == 1
+
+
+def test_concurrent_identical_reads_share_one_request(local_db, monkeypatch):
+    release = threading.Event()
+    execute = local_db._execute
+
+    def slow_execute(query, **kwargs):
+        release.wait(5)
+        return execute(query, **kwargs)
+
+    monkeypatch.setattr(local_db, "_execute", slow_execute)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futures = [pool.submit(read, "2024-05-01", "2024-05-31")
+                   for _ in range(3)
+                   for read in (local_db.get_expenses_by_date_range, local_db.get_incomes_by_date_range)]
+        while local_db.coalesced < 4:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert _get_count(local_db, "transactions") == 2
+    assert results == [[]] * 6
+    # Bekleyenler bittikten sonra sonuç önbellekte; yazma sonrası yeni istek gider
+    local_db.get_expenses_by_date_range("2024-05-01", "2024-05-31")
+    local_db.add_expense(tarih="2024-05-10", aciklama="Kira", para_birimi="TL", miktar=40.0, odeme_turu="CASH")
+    assert len(local_db.get_expenses_by_date_range("2024-05-01", "2024-05-31")) == 1
+    assert _get_count(local_db, "transactions") == 3
+
+
+def test_writes_invalidate_only_affected_entries(local_db):
+    local_db.get_account_transactions("CASH", "2024-05-01", "2024-05-31")
+    local_db.get_account_transactions("Tonboo Ziraat", "2024-05-01", "2024-05-31")
+    local_db.get_all_stock_items()
+
+    row = local_db.add_expense(tarih="2024-05-10", aciklama="Kira", para_birimi="TL",
+                               miktar=40.0, odeme_turu="CASH")
+
+    # CASH sorgusu tekrar sunucuya gider; diğer hesap ve stok önbellekten gelir
+    cash = local_db.get_account_transactions("CASH", "2024-05-01", "2024-05-31")
+    local_db.get_account_transactions("Tonboo Ziraat", "2024-05-01", "2024-05-31")
+    local_db.get_all_stock_items()
+    assert [r["id"] for r in cash] == [row["id"]]
+    assert _get_count(local_db, "transactions") == 3
+    assert _get_count(local_db, "stock_table") == 1
+
+    # Hesabı değişen kayıt hem eski hem yeni hesabın sorgusunu düşürür
+    local_db.update_expense(row["id"], odeme_turu="Tonboo Ziraat")
+    assert local_db.get_account_transactions("CASH", "2024-05-01", "2024-05-31") == []
+    assert len(local_db.get_account_transactions("Tonboo Ziraat", "2024-05-01", "2024-05-31")) == 1
+
+
+def test_dashboard_bootstrap_serves_first_screen_reads(local_db):
+    from datetime import date
+    today = date.today().isoformat()
+    local_db.supabase.seed("transactions", [
+        {"type": "income" if i % 2 else "expense", "tarih": f"2024-05-{i:02d}", "aciklama": f"K{i}",
+         "para_birimi": "TL", "miktar": float(i), "tl_karsiligi": float(i), "odeme_turu": ["CASH", "Iwant Ziraat"][i % 2]}
+        for i in range(1, 9)
+    ])
+    local_db.supabase.seed("stock_table", [{"urun_kodu": "B", "urun_adi": "Silgi", "miktar": 1},
+                                           {"urun_kodu": "A", "urun_adi": "Kalem", "miktar": 2}])
+    local_db.supabase.seed("daily_orders", [{"product_code": "A", "quantity": 1, "unit_price": 2.0, "order_date": today}])
+    local_db.supabase.seed("contacts", [{"name": "Ali", "phone": "1", "created_at": "2024-01-01"}])
+    local_db.supabase.seed("imports", [{"urun_adi": "Kalem", "miktar": 5, "tarih": "2024-05-01", "durum": "Yolda"}])
+
+    def first_screen(db):
+        return [db.get_account_balances("2024-05-01", "2024-05-31"),
+                db.get_account_transactions("CASH", "2024-05-01", "2024-05-31", columns=PAGE_COLUMNS["account"]),
+                db.get_all_incomes(page_size=3, columns=PAGE_COLUMNS["income"]),
+                db.get_all_expenses(page_size=3, columns=PAGE_COLUMNS["expense"]),
+                db.get_all_stock_items(columns=PAGE_COLUMNS["stock"]),
+                db.get_today_orders(columns=PAGE_COLUMNS["daily_orders"]),
+                db.get_all_contacts(),
+                db.get_all_passwords(columns=PAGE_COLUMNS["passwords"]),
+                db.get_all_imports(columns=PAGE_COLUMNS["imports"]),
+                db.get_change_cursor(),
+                db.get_account_summary("CASH", "2024-05-01", "2024-05-31"),
+                db.get_stock_summary(),
+                db.get_daily_orders_summary(today),
+                db.get_transaction_summary(type="income", group_by=["para_birimi"]),
+                db.get_transaction_summary(type="expense", group_by=["para_birimi"])]
+
+    expected = first_screen(local_db)
+    local_db.cache.clear()
+    local_db.supabase.requests.clear()
+
+    # Önceden doldurulan kayıtların TTL'i ilk okunduklarında başlar (hesap sayfaları sonradan açılır)
+    local_db.cache.ttl = 0
+    local_db.load_dashboard_bootstrap("CASH", "2024-05-01", "2024-05-31", page_size=3)
+    assert first_screen(local_db) == expected
+    assert [r["table"] for r in local_db.supabase.requests] == ["dashboard_bootstrap"]
+
+
+def test_reads_started_during_dashboard_bootstrap_wait_for_it(local_db):
+    from datetime import date
+    today = date.today().isoformat()
+    local_db.supabase.seed("stock_table", [{"urun_kodu": "A", "urun_adi": "Kalem", "miktar": 2}])
+
+    def start():
+        # begin_dashboard_bootstrap gibi: okumalar sayfalardan önce süren okuma olarak kaydedilir
+        entries = local_db._dashboard_bootstrap_entries("CASH", "2024-05-01", "2024-05-31", today, 3)
+        flights = local_db._lead(entries)
+        with ThreadPoolExecutor(2) as pool:
+            pages = [pool.submit(local_db.get_all_stock_items, columns=PAGE_COLUMNS["stock"]),
+                     pool.submit(lambda: [row for batch in local_db.iter_all_stock_items(columns=PAGE_COLUMNS["stock"])
+                                          for row in batch])]
+            time.sleep(0.05)
+            error = None
+            try:
+                local_db.load_dashboard_bootstrap("CASH", "2024-05-01", "2024-05-31", page_size=3,
+                                                  today=today, flights=flights)
+            except Exception as e:
+                error = e
+            return [page.result(5) for page in pages] + [error]
+
+    stock, streamed, error = start()
+    assert error is None
+    assert [row["urun_kodu"] for row in stock] == [row["urun_kodu"] for row in streamed] == ["A"]
+    assert [r["table"] for r in local_db.supabase.requests] == ["dashboard_bootstrap"]
+
+    # Bootstrap başarısız olursa bekleyen okumalar kendi isteklerini yapar
+    local_db.cache.clear()
+    local_db.supabase.requests.clear()
+    del local_db.supabase.functions["dashboard_bootstrap"]
+    stock, streamed, error = start()
+    assert "Açılış verilerini getirme" in str(error)
+    assert [row["urun_kodu"] for row in stock] == [row["urun_kodu"] for row in streamed] == ["A"]
+    assert sorted(r["table"] for r in local_db.supabase.requests) == ["dashboard_bootstrap", "stock_table", "stock_table"]
+
+
+def test_bulk_insert_converts_rows_and_sends_chunks(local_db):
+    rows = [{"tarih": "01.05.2024", "aciklama": f"Satır {i}", "para_birimi": "USD",
+             "miktar": "1.000,50", "usd_kuru": 30} for i in range(5)]
+
+    inserted = local_db.add_transactions_bulk(rows, type="expense", chunk_size=2)
+
+    posts = [r for r in local_db.supabase.requests if r["method"] == "POST"]
+    assert inserted == 5
+    assert [len(r["payload"]) for r in posts] == [2, 2, 1]
+    keys = [row.pop("idempotency_key") for r in posts for row in r["payload"]]
+    assert len(set(keys)) == 5
+    assert posts[0]["payload"][0] == {
+        "type": "expense", "tarih": "2024-05-01", "aciklama": "Satır 0", "para_birimi": "USD",
+        "miktar": 1000.5, "odeme_turu": "Nakit", "usd_kuru": 30.0, "tl_karsiligi": 30015.0
+    }
+
+
+def _timeout_after_commit(db, monkeypatch, times=1):
+    """İlk times çağrı sunucuda işlenir ama yanıt gelmeden zaman aşımı olur"""
+    execute = db._execute
+    calls = []
+
+    def flaky_execute(query, **kwargs):
+        calls.append(query)
+        result = execute(query, **kwargs)
+        if len(calls) <= times:
+            raise httpx.ReadTimeout("yanıt gelmedi")
+        return result
+
+    db.write_retry = RetryPolicy(sleep=lambda seconds: None)
+    monkeypatch.setattr(db, "_execute", flaky_execute)
+    return calls
+
+
+def test_retried_insert_does_not_duplicate(local_db, monkeypatch):
+    calls = _timeout_after_commit(local_db, monkeypatch)
+
+    row = local_db.add_income(tarih="2024-05-01", aciklama="Satış", para_birimi="TL", miktar=10, odeme_turu="CASH")
+
+    assert len(local_db.supabase.tables["transactions"]) == 1
+    assert row["idempotency_key"] == local_db.supabase.tables["transactions"][0]["idempotency_key"]
+    posts = [r for r in local_db.supabase.requests if r["method"] == "POST"]
+    assert len(posts) == 2 and posts[0]["payload"] == posts[1]["payload"]
+    assert posts[0]["params"]["on_conflict"] == "idempotency_key"
+    # İkinci deneme satırı eklemedi (ignore-duplicates); satır anahtarıyla okundu
+    assert len(calls) == 3
+
+
+def test_retried_order_reserves_stock_once(local_db, monkeypatch):
+    local_db.supabase.seed("stock_table", [{"urun_kodu": "A1", "urun_adi": "Kalem", "miktar": 10, "gercek_stok": 10}])
+    _timeout_after_commit(local_db, monkeypatch)
+
+    result = local_db.add_daily_order("A1", "Ali", "Kalem", 3, 5.0)
+
+    assert len(local_db.supabase.tables["daily_orders"]) == 1
+    assert result["stock"]["miktar"] == 7
+    assert local_db.supabase.tables["stock_table"][0]["miktar"] == 7
+
+
+def _seed_stock(db):
+    db.supabase.seed("stock_table", [{"urun_kodu": "A1", "urun_adi": "Kalem", "miktar": 10, "gercek_stok": 10,
+                                      "birim_fiyat": 5.0, "version": 1}])
+    return db.get_stock_item_by_code("A1")
+
+
+def _other_client_update(db, **changes):
+    db.supabase.table("stock_table").update(changes).eq("urun_kodu", "A1").execute()
+
+
+def test_stock_update_keeps_other_clients_changes(local_db):
+    base = _seed_stock(local_db)
+    _other_client_update(local_db, birim_fiyat=6.0)
+
+    row = local_db.update_stock_item(base["id"], base=base, miktar=4)
+
+    assert (row["miktar"], row["birim_fiyat"], row["version"]) == (4, 6.0, 3)
+    patch = [r for r in local_db.supabase.requests if r["method"] == "PATCH"][-1]
+    assert patch["params"]["version"] == ["eq.2"]
+
+
+def test_stock_update_of_a_field_changed_by_another_client_conflicts(local_db):
+    base = _seed_stock(local_db)
+    _other_client_update(local_db, miktar=7)
+
+    with pytest.raises(ConflictError):
+        local_db.update_stock_item(base["id"], base=base, miktar=4)
+    with pytest.raises(ConflictError):
+        local_db.update_stock_quantity("A1", 4, base=base)
+    assert local_db.supabase.tables["stock_table"][0]["miktar"] == 7
+
+
+def test_stock_update_retries_when_the_row_changes_before_the_write(local_db, monkeypatch):
+    _seed_stock(local_db)
+    read = local_db._read
+    reads = []
+
+    def racing_read(*args, **kwargs):
+        rows = read(*args, **kwargs)
+        reads.append(rows)
+        if len(reads) == 1:
+            # Okuma ile koşullu PATCH arasında başka bir istemci siparişle stoğu düşürür
+            _other_client_update(local_db, gercek_stok=9)
+        return rows
+
+    monkeypatch.setattr(local_db, "_read", racing_read)
+    assert local_db.update_stock_quantity("A1", 20)
+
+    # İlk koşullu PATCH eski sürümle boş döner; satır yeniden okunup yeni sürümle tekrar denenir
+    patches = [r["params"]["version"] for r in local_db.supabase.requests
+               if r["method"] == "PATCH" and "version" in r["params"]]
+    assert patches == [["eq.1"], ["eq.2"]] and len(reads) == 2
+    row = local_db.supabase.tables["stock_table"][0]
+    assert (row["miktar"], row["gercek_stok"], row["version"]) == (20, 9, 3)
+
+
+def test_unit_of_work_commits_across_tables_in_one_request(local_db):
+    base = _seed_stock(local_db)
+    local_db.get_all_stock_items()
+    before = len(local_db.supabase.requests)
+
+    with local_db.unit_of_work() as uow:
+        uow.insert("daily_orders", {"product_code": "A1", "customer_name": "Ali", "product_name": "Kalem",
+                                    "quantity": 2, "unit_price": 5.0, "order_date": "2024-05-01"})
+        uow.update("stock_table", {"miktar": 8}, id=base["id"], version=base["version"])
+
+    assert [r["table"] for r in local_db.supabase.requests[before:]] == ["commit_unit_of_work"]
+    order, stock = uow.results
+    assert order[0]["total_amount"] == 10.0 and stock[0]["version"] == 2
+    # Yazılan tablolar önbellekten düşer
+    assert local_db.get_all_stock_items()[0]["miktar"] == 8
+
+
+def test_unit_of_work_rolls_back_when_a_step_fails(local_db):
+    base = _seed_stock(local_db)
+    _other_client_update(local_db, miktar=7)
+
+    uow = local_db.unit_of_work()
+    uow.insert("daily_orders", {"product_code": "A1", "customer_name": "Ali", "product_name": "Kalem",
+                                "quantity": 3, "unit_price": 5.0, "order_date": "2024-05-01"})
+    uow.update("stock_table", {"miktar": 7}, id=base["id"], version=base["version"])
+    with pytest.raises(ConflictError):
+        uow.commit()
+
+    # Sipariş eklenmiş olarak kalmaz
+    assert local_db.supabase.tables.get("daily_orders", []) == []
+    assert local_db.supabase.tables["stock_table"][0]["version"] == 2
+
+
+def test_replace_transaction_is_atomic(local_db):
+    old = local_db.add_income(tarih="01.05.2024", aciklama="Satış", para_birimi="TL", miktar=100)
+    fields = dict(tarih="02.05.2024", aciklama="Satış (düzeltme)", para_birimi="TL", miktar=120)
+
+    new = local_db.replace_income(old["id"], **fields)
+
+    rows = {row["id"]: row for row in local_db.supabase.tables["transactions"]}
+    assert rows[old["id"]]["aktif"] is False and rows[new["id"]]["miktar"] == 120.0
+    assert [row["aciklama"] for row in local_db.get_all_incomes()] == ["Satış (düzeltme)"]
+
+    # Eski kayıt artık aktif değil; ikinci düzenleme hiçbir şey eklemez
+    with pytest.raises(Exception):
+        local_db.replace_income(old["id"], **fields)
+    assert len(local_db.supabase.tables["transactions"]) == 2
+
+
+def test_offline_reads_fail_fast_and_serve_last_known_data(local_db, monkeypatch):
+    _seed_stock(local_db)
+    local_db.cache.ttl = 0
+    local_db.read_retry = RetryPolicy(attempts=2, sleep=lambda seconds: None)
+    assert local_db.get_all_stock_items()[0]["urun_kodu"] == "A1"
+
+    def unreachable(query):
+        raise httpx.ConnectError("ağ yok")
+
+    monkeypatch.setattr("local_supabase.LocalQuery.execute", unreachable)
+
+    # Süresi dolmuş olsa da önbellekteki son veri döner; art arda hatalar devreyi açar
+    for _ in range(3):
+        assert local_db.get_all_stock_items()[0]["urun_kodu"] == "A1"
+    assert local_db.breaker.state == "open"
+    assert local_db.cache.stats()["stale_hits"] == 3
+
+    # Devre açıkken önbellekte olmayan okuma beklemeden hata verir
+    with pytest.raises(Exception, match="ulaşılamıyor"):
+        local_db.get_all_contacts()
+
+
+def test_bulk_insert_rejects_invalid_rows_before_sending(local_db):
+    rows = [{"tarih": "01.05.2024", "aciklama": "Kira", "para_birimi": "TL", "miktar": 10},
+            {"tarih": "31.02.2024", "aciklama": "Hatalı", "para_birimi": "TL", "miktar": "abc"}]
+
+    with pytest.raises(Exception, match="satır: 2"):
+        local_db.add_transactions_bulk(rows, type="income")
+    assert not [r for r in local_db.supabase.requests if r["method"] == "POST"]
+
+
+def test_add_daily_order_reserves_stock_in_one_call(local_db):
+    local_db.supabase.seed("stock_table", [{"urun_kodu": "A1", "urun_adi": "Kalem", "miktar": 5,
+                                            "gercek_stok": 5, "birim_fiyat": 2.5}])
+
+    result = local_db.add_daily_order("A1", "Ali", "Kalem", 3, 2.5, is_real_order=True)
+
+    assert [r["method"] for r in local_db.supabase.requests] == ["RPC"]
+    assert result["order"]["total_amount"] == 7.5
+    assert result["stock"] == {"id": 1, "miktar": 2, "gercek_stok": 2}
+
+    # Kalan stoktan fazlası istenirse ne stok ne sipariş değişir
+    with pytest.raises(Exception, match="Mevcut stok: 2"):
+        local_db.add_daily_order("A1", "Veli", "Kalem", 3, 2.5)
+    assert local_db.supabase.tables["stock_table"][0]["miktar"] == 2
+    assert len(local_db.supabase.tables["daily_orders"]) == 1
+
+
+def test_update_daily_order_is_a_single_patch(local_db):
+    local_db.supabase.seed("daily_orders", [{"id": 7, "order_date": "2024-05-02", "quantity": 2, "unit_price": 10.0}])
+
+    updated = local_db.update_daily_order(7, quantity=3)
+
+    assert [r["method"] for r in local_db.supabase.requests] == ["PATCH"]
+    assert "total_amount" not in local_db.supabase.requests[0]["payload"]
+    assert updated["quantity"] == 3 and updated["total_amount"] == 30.0
+
+
+def test_calls_are_timed_per_operation_and_slow_ones_logged(local_db, caplog):
+    local_db.supabase.seed("stock_table", [{"urun_kodu": "A1", "urun_adi": "Kalem", "miktar": 10,
+                                            "gercek_stok": 10, "birim_fiyat": 2.5}])
+    local_db.metrics.slow_threshold_ms = 0
+
+    with caplog.at_level("WARNING", logger="db.slow"):
+        local_db.get_all_stock_items(columns=["urun_kodu"])
+        local_db.update_stock_quantity("A1", 8)
+
+    operations = local_db.metrics.summary()["operations"]
+    assert operations["get_all_stock_items"]["count"] == 1
+    assert operations["get_all_stock_items"]["rows"] == 1
+    assert operations["update_stock_quantity"]["bytes"] > 0
+    slow = local_db.metrics.summary()["slow_queries"][-1]
+    assert (slow["operation"], slow["method"], slow["table"]) == ("update_stock_quantity", "PATCH", "stock_table")
+    assert "urun_kodu=eq.A1" in slow["filters"]
+    assert "Yavaş sorgu: get_all_stock_items GET stock_table" in caplog.text
@@ -0,0 +1,121 @@
+# test_db_retry.py
+"""db_retry testleri: RetryPolicy, CircuitBreaker, RetryBudget ve deadline"""
+import threading
+
+import httpx
+import pytest
+
+from db_retry import RetryPolicy, CircuitBreaker, CircuitOpenError, RetryBudget, deadline, apply_deadline
+
+
+def _failing(error):
+    def call():
+        raise error
+    return call
+
+
+def test_transient_errors_are_retried_with_growing_delays():
+    delays = []
+    policy = RetryPolicy(attempts=4, base_delay=0.1, max_delay=1.0, sleep=delays.append)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 4:
+            raise httpx.ConnectError("bağlantı yok")
+        return "tamam"
+
+    assert policy.run(flaky) == "tamam"
+    assert len(delays) == 3 and policy.retries == 3
+    # Full jitter: her bekleme 0 ile min(max_delay, base_delay * 2^deneme) arasında
+    assert all(0 <= delay <= limit for delay, limit in zip(delays, (0.1, 0.2, 0.4)))
+
+
+def test_other_errors_and_last_attempt_are_raised():
+    policy = RetryPolicy(attempts=2, sleep=lambda seconds: None)
+
+    with pytest.raises(ValueError):
+        policy.run(_failing(ValueError("geçersiz")))
+    assert policy.retries == 0
+
+    with pytest.raises(httpx.ReadTimeout):
+        policy.run(_failing(httpx.ReadTimeout("zaman aşımı")))
+    assert policy.retries == 1
+
+
+def test_slow_attempt_is_hedged():
+    policy = RetryPolicy(hedge_after=0.05)
+    release = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) == 1:
+            # İlk istek takıldı; ikinci kopya önce döner
+            release.wait(5)
+            return "yavaş"
+        return "hızlı"
+
+    try:
+        assert policy.run(call) == "hızlı"
+    finally:
+        release.set()
+    assert policy.hedged == 1 and len(calls) == 2
+
+
+def test_breaker_opens_fails_fast_and_closes_after_a_probe():
+    now = [0.0]
+    states = []
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10.0, clock=lambda: now[0])
+    breaker.add_listener(states.append)
+    calls = []
+
+    def offline():
+        calls.append(1)
+        raise httpx.ConnectError("bağlantı yok")
+
+    for _ in range(2):
+        with pytest.raises(httpx.ConnectError):
+            breaker.call(offline)
+    # Devre açık: çağrı gönderilmeden reddedilir
+    with pytest.raises(CircuitOpenError):
+        breaker.call(offline)
+    assert len(calls) == 2 and breaker.state == "open"
+
+    # Süre dolunca tek bir deneme geçer; başarılıysa devre kapanır
+    now[0] = 11.0
+    assert breaker.state == "half_open"
+    assert breaker.call(lambda: "tamam") == "tamam"
+    assert states == ["open", "half_open", "closed"]
+
+
+def test_server_errors_do_not_open_the_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+
+    with pytest.raises(ValueError):
+        breaker.call(_failing(ValueError("sunucu reddetti")))
+    assert breaker.state == "closed"
+
+
+def test_retry_budget_limits_retries_across_calls():
+    budget = RetryBudget(ratio=0.0, min_retries=2, clock=lambda: 0.0)
+    policy = RetryPolicy(attempts=3, sleep=lambda seconds: None, budget=budget)
+
+    for _ in range(3):
+        with pytest.raises(httpx.ConnectError):
+            policy.run(_failing(httpx.ConnectError("bağlantı yok")))
+    # Üç çağrı x iki yeniden deneme yerine bütçe kadar (2); sonraki iki çağrı tekrar denenmedi
+    assert policy.retries == 2 and budget.exhausted == 2
+
+
+def test_deadline_caps_request_timeouts():
+    request = httpx.Request("GET", "https://example.com", extensions={"timeout": httpx.Timeout(30.0).as_dict()})
+
+    with deadline(2.0):
+        with deadline(5.0):
+            apply_deadline(request)
+    assert all(0 < value <= 2.0 for value in request.extensions["timeout"].values())
+
+    with deadline(0):
+        with pytest.raises(httpx.ConnectTimeout):
+            apply_deadline(request)
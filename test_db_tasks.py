@@ -0,0 +1,63 @@
+# test_db_tasks.py
+"""DatabaseManager.submit / db_tasks testleri"""
+import threading
+
+from PyQt5.QtCore import QCoreApplication, QThreadPool
+
+from db_tasks import DbTaskRunner
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+
+def test_submit_delivers_result_through_future_and_signal(local_db):
+    local_db.supabase.seed("stock_table", [{"urun_kodu": "A1", "urun_adi": "Kalem", "miktar": 10,
+                                            "gercek_stok": 10, "birim_fiyat": 2.5}])
+    results = []
+
+    task = local_db.submit("get_all_stock_items", columns=["urun_kodu"], on_result=results.append)
+    rows = task.future.result(timeout=5)
+    QThreadPool.globalInstance().waitForDone()
+    app.processEvents()
+
+    assert rows == [{"urun_kodu": "A1"}]
+    assert results == [rows]
+
+
+def test_newer_task_with_same_key_cancels_pending_one():
+    pool = QThreadPool()
+    pool.setMaxThreadCount(1)
+    runner = DbTaskRunner(pool)
+    gate = threading.Event()
+    results = []
+
+    runner.submit(gate.wait, 5)  # havuzu meşgul eder
+    first = runner.submit(lambda: "eski", on_result=results.append, key="load")
+    second = runner.submit(lambda: "yeni", on_result=results.append, key="load")
+    gate.set()
+    runner.wait()
+    app.processEvents()
+
+    assert first.cancelled and first.future.cancelled()
+    assert second.future.result() == "yeni"
+    assert results == ["yeni"]
+
+
+def test_streaming_read_delivers_rows_in_batches(local_db, monkeypatch):
+    from local_supabase import LocalQuery
+    local_db.supabase.seed("stock_table", [{"urun_kodu": f"U{i}", "urun_adi": f"Ürün {i:03d}", "miktar": i}
+                                           for i in range(450)])
+    # Yanıt gövdesi küçük parçalar halinde gelir; satırlar parçaların ortasında bölünür
+    iter_bytes = LocalQuery.iter_bytes
+    monkeypatch.setattr(LocalQuery, "iter_bytes", lambda self: iter_bytes(self, chunk_size=7))
+    batches, results = [], []
+
+    task = local_db.submit("iter_all_stock_items", columns=["urun_adi"], batch_size=200,
+                           on_batch=batches.append, on_result=results.append)
+    assert task.future.result(timeout=5) == 450
+    QThreadPool.globalInstance().waitForDone()
+    app.processEvents()
+
+    assert [len(batch) for batch in batches] == [200, 200, 50]
+    assert [row["urun_adi"] for batch in batches for row in batch] == [f"Ürün {i:03d}" for i in range(450)]
+    assert results == [450]
+    assert local_db.metrics.summary()["operations"]["iter_all_stock_items"]["rows"] == 450
@@ -0,0 +1,69 @@
+# test_local_replica.py
+"""local_replica.LocalReplica testleri (LocalSupabase üzerinde)"""
+from decimal import Decimal
+
+import pytest
+
+from local_replica import LocalReplica
+
+
+@pytest.fixture
+def replica_db(local_db):
+    local_db.supabase.seed("transactions", [
+        {"id": i, "type": "income", "tarih": f"2024-05-{i:02d}", "aciklama": f"Satış {i}", "para_birimi": "TL",
+         "miktar": 10.0 * i, "odeme_turu": "CASH", "tl_karsiligi": 10.0 * i}
+        for i in range(1, 8)
+    ])
+    local_db.replica = LocalReplica(":memory:", local_db.supabase)
+    local_db.replica.sync_all()
+    local_db.supabase.requests.clear()
+    return local_db
+
+
+def test_reads_are_answered_from_replica_with_same_results(replica_db):
+    first_page = replica_db.get_all_incomes(page_size=3, columns=["id", "tarih"])
+    last = first_page[-1]
+    second_page = replica_db.get_all_incomes(page_size=3, cursor=(last["tarih"], last["id"]), columns=["id", "tarih"])
+    found = replica_db.search_incomes("satış 7")
+
+    assert replica_db.supabase.requests == []
+    assert [row["id"] for row in first_page + second_page] == [7, 6, 5, 4, 3, 2]
+    assert [row["aciklama"] for row in found] == ["Satış 7"]
+
+
+def test_writes_go_through_and_remote_changes_sync_incrementally(replica_db):
+    added = replica_db.add_income(tarih="2024-05-20", aciklama="Yeni", para_birimi="TL", miktar=5, odeme_turu="CASH")
+    replica_db.delete_transaction(1, soft=False)
+    assert [r["method"] for r in replica_db.supabase.requests] == ["POST", "DELETE"]
+    ids = [row["id"] for row in replica_db.get_all_incomes(columns=["id"])]
+    assert ids[0] == added["id"] and 1 not in ids
+
+    # Başka bir istemcinin yaptığı değişiklik: sonraki turda sadece o satır indirilir
+    replica_db.replica.sync_table("transactions")
+    replica_db.supabase.table("transactions").update({"aciklama": "Düzeltildi"}).eq("id", 2).execute()
+    replica_db.supabase.requests.clear()
+    assert replica_db.replica.sync_table("transactions") == 1
+    assert replica_db.search_incomes("düzeltildi")[0]["id"] == 2
+
+
+def test_reconcile_removes_rows_deleted_on_server(replica_db):
+    replica_db.supabase.tables["transactions"] = [
+        row for row in replica_db.supabase.tables["transactions"] if row["id"] != 3
+    ]
+
+    assert replica_db.replica.reconcile_table("transactions") == (1, 0)
+    assert 3 not in [row["id"] for row in replica_db.get_all_incomes(columns=["id"])]
+
+
+def test_numeric_filters_compare_as_numbers(replica_db):
+    # numeric sütunlar (Decimal) kopyaya metin olarak yazılır; filtre yine sayısal çalışmalı
+    replica_db.replica.apply("transactions", [{"id": 8, "type": "income", "tarih": "2024-05-08", "aciklama": "Büyük",
+                                                "para_birimi": "TL", "miktar": Decimal("100.50"),
+                                                "odeme_turu": "CASH", "tl_karsiligi": Decimal("100.50")}])
+    query = replica_db.replica.query
+
+    assert [row["id"] for row in query("transactions", ["id"], [("gt", "miktar", 65)])] == [7, 8]
+    assert [row["id"] for row in query("transactions", ["id"], [("lte", "tl_karsiligi", Decimal("20"))])] == [1, 2]
+    assert [row["id"] for row in query("transactions", ["id"], [("eq", "miktar", 100.5)])] == [8]
+    assert [row["id"] for row in query("transactions", ["id"], [("in_", "miktar", [30, 100.5])])] == [3, 8]
+    assert replica_db.supabase.requests == []
@@ -0,0 +1,174 @@
+# test_migrations.py
+"""migrations paketi ve sık çalışan sorguların sorgu planı testleri.
+
+Plan testi DatabaseManager okumalarını LocalSupabase'e yaptırıp kaydedilen PostgREST
+isteklerini eşdeğer SQL'e çevirir; sonra bunları TEST_DATABASE_URL'deki Postgres'te,
+migration'lar uygulanmış ve büyük sentetik verilerle doldurulmuş tablolarda EXPLAIN
+ile çalıştırır. Büyük tablolardan birinde Seq Scan varsa test başarısız olur.
+"""
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from local_supabase import _split_top_level
+from migrations import list_migrations, apply_migrations
+
+# Plan testinde sıralı tarama kabul edilmeyen tablolar
+LARGE_TABLES = {"transactions", "stock_table", "daily_orders", "users", "change_log"}
+
+SEED_SQL = """
+insert into public.transactions (type, tarih, aciklama, para_birimi, miktar, tl_karsiligi, odeme_turu)
+select case when i % 2 = 0 then 'income' else 'expense' end, current_date - (i % 1500),
+       'Fatura ' || i, 'TL', i % 1000, i % 1000,
+       (array['CASH', 'Tonboo Ziraat', 'Tonboo Garanti', 'Iwant Ziraat', 'Iwant Garanti', 'Volkan Amount'])[1 + i % 6]
+  from generate_series(1, 200000) i;
+insert into public.stock_table (urun_kodu, urun_adi, miktar, gercek_stok, birim_fiyat)
+select 'U' || i, 'Ürün ' || i, i % 100, i % 100, 10 from generate_series(1, 50000) i;
+insert into public.daily_orders (product_code, customer_name, product_name, quantity, unit_price, order_date)
+select 'U' || (i % 50000), 'Müşteri ' || (i % 3000), 'Ürün ' || i, 1 + i % 5, 10, current_date - (i % 1000)
+  from generate_series(1, 200000) i;
+insert into public.users (username, password_hash, role)
+select 'kullanici' || i, 'x', 'user' from generate_series(1, 50000) i;
+analyze;
+"""
+
+OPERATORS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "like": "like", "ilike": "ilike"}
+
+
+def _literal(value):
+    if isinstance(value, list):
+        return "array[" + ", ".join(_literal(item) for item in value) + "]::text[]"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _condition(column, expression):
+    op, _, value = expression.partition(".")
+    if op == "in":
+        return f"{column} in ({', '.join(_literal(v) for v in value.strip('()').split(','))})"
+    if op == "is":
+        return f"{column} is {value}"
+    return f"{column} {OPERATORS[op]} {_literal(value)}"
+
+
+def _logic(expression, joiner):
+    parts = []
+    for item in _split_top_level(expression):
+        item = item.strip()
+        if item.startswith(("and(", "or(")):
+            name, inner = item.split("(", 1)
+            parts.append(_logic(inner[:-1], name))
+        else:
+            column, _, rest = item.partition(".")
+            parts.append(_condition(column, rest))
+    return "(" + f" {joiner} ".join(parts) + ")"
+
+
+def to_sql(request):
+    """LocalSupabase'in kaydettiği isteğin eşdeğer SELECT'i (yazmalar için sadece filtreleri)"""
+    if request["method"] == "RPC":
+        args = ", ".join(f"{name} => {_literal(value)}" for name, value in request["params"].items()
+                         if value is not None)
+        return f"select {request.get('select') or '*'} from public.{request['table']}({args})"
+
+    params = dict(request["params"])
+    columns = params.pop("select", "*") if request["method"] == "GET" else "1"
+    order = params.pop("order", None)
+    limit = params.pop("limit", None)
+    offset = params.pop("offset", None)
+    conditions = [_logic(params.pop("or")[1:-1], "or")] if "or" in params else []
+    for column, expressions in params.items():
+        conditions += [_condition(column, expression) for expression in expressions]
+
+    sql = f"select {columns} from public.{request['table']}"
+    if conditions:
+        sql += " where " + " and ".join(conditions)
+    if order:
+        sql += " order by " + ", ".join(f"{c} {d}" for c, d in (part.rsplit(".", 1) for part in order.split(",")))
+    if limit:
+        sql += f" limit {int(limit)}"
+    if offset:
+        sql += f" offset {int(offset)}"
+    return sql
+
+
+def _seq_scans(plan):
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found += _seq_scans(child)
+    return found
+
+
+def _hot_queries(db):
+    """Sayfaların sık çalıştırdığı, tablonun küçük bir kısmını okuyan çağrılar"""
+    today = date.today()
+    start, end = (today - timedelta(days=30)).isoformat(), today.isoformat()
+    db.get_all_incomes(page_size=50, columns=["id", "tarih"])
+    db.get_all_expenses(page_size=50, cursor=(start, 1000), columns=["id", "tarih"])
+    db.get_expenses_by_date_range(start, end)
+    db.get_account_transactions("CASH", start, end, columns=["id", "tarih", "miktar"])
+    db.get_account_transactions("Iwant Ziraat", start, end, type="income")
+    db.get_account_balances(start, end)
+    db.get_account_summary("Iwant Garanti", start, end)
+    db.search_incomes("Fatura 12345")
+    db.get_stock_item_by_code("U123")
+    db.update_stock_quantity("U123", 5)
+    db.get_today_orders()
+    db.get_all_daily_orders(order_date=start)
+    db.search_daily_orders("Müşteri 17", order_date=start)
+    db.get_daily_orders_summary(start)
+    db.check_product_code_exists("U123")
+    db.get_user_by_username("kullanici42")
+    db.get_changes((199900, 0), table="transactions")
+    db.delete_transaction(42)
+    return db.supabase.requests
+
+
+def test_migrations_are_numbered_in_order():
+    migrations = list_migrations()
+    assert [version for version, _, _ in migrations] == list(range(1, len(migrations) + 1))
+    assert migrations[0][1] == "tables"
+
+
+def test_request_translation(local_db):
+    local_db.get_all_expenses(page_size=50, cursor=("2024-05-01", 7), columns=["id", "tarih"])
+    assert to_sql(local_db.supabase.requests[-1]) == (
+        "select id,tarih from public.transactions"
+        " where (tarih < '2024-05-01' or (tarih = '2024-05-01' and id < '7'))"
+        " and type = 'expense' and aktif = 'True' order by tarih desc, id desc limit 50")
+
+
+def test_hot_queries_do_not_scan_large_tables(pg_conn, local_db):
+    applied = apply_migrations(pg_conn)
+    assert [version for version, _ in applied] == [version for version, _, _ in list_migrations()]
+
+    with pg_conn.cursor() as cur:
+        cur.execute(SEED_SQL)
+        failures = []
+        for request in _hot_queries(local_db):
+            sql = to_sql(request)
+            cur.execute("explain (format json) " + sql)
+            plan = cur.fetchone()[0]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            scans = _seq_scans(plan[0]["Plan"])
+            if scans:
+                failures.append(f"{sql}\n  -> Seq Scan: {', '.join(scans)}")
+        assert not failures, "\n".join(failures)
+
+
+def test_unique_codes_migration_reports_duplicates(pg_conn):
+    apply_migrations(pg_conn, target=14)
+    with pg_conn.cursor() as cur:
+        cur.execute("insert into public.stock_table (urun_kodu, urun_adi, miktar, gercek_stok, birim_fiyat)"
+                    " values ('A1', 'Kalem', 1, 1, 10), ('A1', 'Kalem', 2, 2, 10)")
+
+    # Tekrar varsa benzersiz indeks oluşturulmaz; hangi kodların tekrarlandığı hatada yazar
+    with pytest.raises(Exception, match="urun_kodu tekrar ediyor") as error:
+        apply_migrations(pg_conn)
+    assert "A1 (2 satır)" in error.value.diag.message_detail
+
+    with pg_conn.cursor() as cur:
+        cur.execute("delete from public.stock_table where miktar = 2")
+    assert [version for version, _ in apply_migrations(pg_conn)] == [15]
@@ -0,0 +1,73 @@
+# test_search.py
+"""DatabaseManager.search_* testleri.
+
+İlk testler LocalSupabase üzerinde çalışır. Sonuncusu migrations/0008_search.sql'i gerçek bir
+Postgres'te (TEST_DATABASE_URL) bir milyon satırlık transactions tablosuyla dener; bağlantı yoksa atlanır.
+"""
+import re
+
+from migrations import apply_migrations
+
+
+def _seed_incomes(db, descriptions):
+    db.supabase.seed("transactions", [
+        {"type": "income", "tarih": f"2024-05-{i + 1:02d}", "aciklama": text, "para_birimi": "TL",
+         "miktar": 1.0, "odeme_turu": "CASH", "tl_karsiligi": 1.0}
+        for i, text in enumerate(descriptions)
+    ])
+
+
+def test_search_uses_one_ranked_rpc_with_projection(local_db):
+    _seed_incomes(local_db, ["Kiralık depo", "Kira", "Mayıs kira ödemesi", "Elektrik"])
+
+    rows = local_db.search_incomes("kira", columns=["id", "aciklama"])
+
+    # Kelime olarak eşleşenler önce (benzerliğe göre), sadece alt metin olarak eşleşen en sonda
+    assert [row["aciklama"] for row in rows] == ["Kira", "Mayıs kira ödemesi", "Kiralık depo"]
+    request = local_db.supabase.requests[-1]
+    assert (request["method"], request["table"], request["select"]) == ("RPC", "search_transactions", "id,aciklama")
+    assert request["params"] == {"p_type": "income", "p_term": "kira"}
+
+
+def test_search_results_are_cached_until_the_table_changes(local_db):
+    _seed_incomes(local_db, ["Kira"])
+    local_db.search_incomes("kira")
+    local_db.search_incomes("kira")
+    assert len(local_db.supabase.requests) == 1
+
+    local_db.add_income(tarih="2024-06-01", aciklama="Kira haziran", para_birimi="TL", miktar=5, odeme_turu="CASH")
+    assert len(local_db.search_incomes("kira")) == 2
+
+
+def test_other_searches_match_any_column(local_db):
+    local_db.supabase.seed("contacts", [{"name": "Ali Veli", "phone": "555", "description": "Tedarikçi"},
+                                        {"name": "Ayşe", "phone": "444", "description": "ali'nin kardeşi"}])
+    local_db.supabase.seed("passwords", [{"platform": "Trendyol", "username": "magaza", "password": "x"}])
+
+    assert [contact[1] for contact in local_db.search_contacts("ali")] == ["Ali Veli", "Ayşe"]
+    assert local_db.search_passwords("trend")[0]["platform"] == "Trendyol"
+    assert local_db.search_daily_orders("yok", order_date="2024-05-01") == []
+
+
+def test_search_functions_use_indexes_on_a_million_rows(pg_conn):
+    apply_migrations(pg_conn)
+    with pg_conn.cursor() as cur:
+        cur.execute("""
+            insert into public.transactions (type, tarih, aciklama, para_birimi, miktar, tl_karsiligi, aktif)
+            select case when i % 2 = 0 then 'income' else 'expense' end,
+                   date '2020-01-01' + (i % 1500),
+                   'Fatura ' || i || ' ' || md5(i::text), 'TL', i % 1000, i % 1000, true
+              from generate_series(1, 1000000) i
+        """)
+        cur.execute("analyze public.transactions")
+
+        for term in ("fatura 777778", "md5", "4f5a1b2c"):
+            cur.execute("explain analyze select id, aciklama from public.search_transactions('income', %s, 200)",
+                        (term,))
+            plan = "\n".join(row[0] for row in cur.fetchall())
+            assert "Seq Scan on transactions" not in plan, plan
+            execution_ms = float(re.search(r"Execution Time: ([\d.]+) ms", plan).group(1))
+            assert execution_ms < 50, plan
+
+        cur.execute("select aciklama from public.search_transactions('income', 'fatura 777778', 5)")
+        assert cur.fetchone()[0].startswith("Fatura 777778 ")
@@ -0,0 +1,136 @@
+# test_write_journal.py
+import json
+import threading
+
+import httpx
+import pytest
+
+from db_retry import CircuitBreaker
+from write_journal import WriteJournal, QueuedWrite
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def offline_db(local_db):
+    """Devresi açık (sunucuya ulaşılamayan) DatabaseManager ve bellek içi yazma günlüğü"""
+    clock = FakeClock()
+    local_db.breaker = CircuitBreaker("Supabase", failure_threshold=1, reset_timeout=30, clock=clock)
+    local_db.breaker.record_failure(httpx.ConnectError("ağ yok"))
+    local_db.journal = WriteJournal(":memory:", local_db)
+    local_db.clock = clock
+    yield local_db
+    local_db.journal.close()
+
+
+def _income(db, aciklama, miktar=10):
+    return db.add_income(tarih="01.05.2024", aciklama=aciklama, para_birimi="TL", miktar=miktar)
+
+
+def test_offline_writes_are_queued_and_replayed_in_order(offline_db):
+    first = _income(offline_db, "Kira")
+    second = offline_db.add_contact("Ali", "05551234567")
+
+    assert isinstance(first, QueuedWrite) and first["aciklama"] == "Kira" and first["id"] is None
+    assert isinstance(second, QueuedWrite)
+    assert not offline_db.supabase.requests
+    assert offline_db.journal.stats() == {"pending": 2, "failed": 0}
+
+    # Bağlantı gelince kayıtlar eklendikleri sırayla gönderilir; tekrar gönderim kopya üretmez
+    offline_db.clock.now += 31
+    assert offline_db.journal.replay() == 2
+    assert [r["table"] for r in offline_db.supabase.requests if r["method"] == "POST"] == ["transactions", "contacts"]
+    assert offline_db.journal.stats() == {"pending": 0, "failed": 0}
+    # Arka planda gönderilen kayıtlar da metriklerde kendi işlem adlarıyla görünür
+    assert {"add_income", "add_contact"} <= set(offline_db.metrics.summary()["operations"])
+
+    # Yanıtı kaybolmuş bir gönderimin tekrarı aynı anahtarla gider ve yeni satır oluşturmaz
+    args = offline_db.journal.conn.execute("select args from journal where seq = 1").fetchone()[0]
+    offline_db._insert_idempotent(**json.loads(args))
+    assert len(offline_db.supabase.tables["transactions"]) == 1
+
+    # Bağlantı varken de yazma çağıranın thread'inde gönderilmez; sırayla arka planda gider
+    third = _income(offline_db, "Maaş")
+    assert isinstance(third, QueuedWrite) and offline_db.journal.stats() == {"pending": 1, "failed": 0}
+    assert offline_db.journal.replay() == 1
+    assert offline_db.supabase.tables["transactions"][-1]["id"] == 2
+
+
+def test_rejected_replay_is_set_aside_and_later_writes_continue(offline_db):
+    offline_db.supabase.seed("stock_table", [{"urun_kodu": "A1", "urun_adi": "Kalem", "miktar": 1,
+                                              "gercek_stok": 1, "birim_fiyat": 2.5}])
+    order = offline_db.add_daily_order("A1", "Ali", "Kalem", 3, 2.5, is_real_order=True)
+    income = _income(offline_db, "Kira")
+    assert order["stock"] is None and order["order"]["customer_name"] == "Ali"
+
+    sent = []
+    offline_db.journal.add_sent_listener(lambda seq, result, error: sent.append((seq, result, error)))
+    offline_db.clock.now += 31
+    assert offline_db.journal.replay() == 1
+
+    # Sayfalar sıradaki satırlarını seq ile bulur: reddedilen kaldırılır, gönderilen id'sini alır
+    assert [(seq, result is None, error is None) for seq, result, error in sent] == [
+        (order.seq, True, False), (income.seq, False, True)]
+    assert sent[1][1]["id"] == 1
+
+    failed = offline_db.journal.failed()
+    assert [(seq, method) for seq, method, args, error in failed] == [(1, "_reserve_stock_and_add_order")]
+    assert "stok" in failed[0][3].lower()
+    assert len(offline_db.supabase.tables["transactions"]) == 1
+
+
+def test_submit_does_not_wait_for_running_replay():
+    class SlowDb:
+        def __init__(self):
+            self.calls = []
+            self.sending = threading.Event()
+            self.release = threading.Event()
+
+        def send(self, n):
+            self.calls.append(n)
+            if n == 1:
+                self.sending.set()
+                self.release.wait(5)
+            return {"id": n}
+
+    db = SlowDb()
+    journal = WriteJournal(":memory:", db)
+    journal._append("send", {"n": 1})
+    replay = threading.Thread(target=journal.replay)
+    replay.start()
+    assert db.sending.wait(5)
+
+    # Arka planda gönderim sürerken yeni kayıt ağı beklemeden sıraya alınır ve aynı replay'de gider
+    queued = journal.submit("send", {"n": 2}, preview={"n": 2})
+    assert isinstance(queued, QueuedWrite) and queued["n"] == 2
+
+    db.release.set()
+    replay.join(5)
+    assert db.calls == [1, 2]
+    assert journal.stats() == {"pending": 0, "failed": 0}
+    journal.close()
+
+
+def test_background_thread_sends_and_reports_submitted_writes(local_db):
+    journal = WriteJournal(":memory:", local_db, interval=60)
+    local_db.journal = journal
+    sent = threading.Event()
+    results = []
+    journal.add_sent_listener(lambda seq, result, error: (results.append((seq, result, error)), sent.set()))
+    journal.start()
+    try:
+        queued = _income(local_db, "Kira")
+        # submit beklemeden döner; arka plandaki thread uyandırılır ve gönderir
+        assert isinstance(queued, QueuedWrite)
+        assert sent.wait(5)
+        (seq, result, error), = results
+        assert seq == queued.seq and error is None and result["aciklama"] == "Kira" and result["id"] == 1
+        assert journal.stats() == {"pending": 0, "failed": 0}
+    finally:
+        journal.close()
@@ -0,0 +1,196 @@
+# transaction_import_dialog.py
+"""
+Gelir/gider sayfaları için CSV/XLSX içe aktarma sihirbazı.
+
+Dosya pandas ile okunur, sütunlar alanlarla eşleştirilir, ilk satırlar önizlenir ve
+kayıtlar DatabaseManager.add_transactions_bulk ile (arka planda, parça parça) eklenir.
+"""
+import os
+
+import pandas as pd
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel,
+                             QPushButton, QComboBox, QTableWidget, QTableWidgetItem,
+                             QFileDialog, QMessageBox, QHeaderView)
+
+from db_tasks import PRIORITY_HIGH
+
+# Alan -> dosya başlıklarında aranan adlar (küçük harfle)
+FIELD_ALIASES = {
+    "tarih": ["tarih", "date", "işlem tarihi", "islem tarihi"],
+    "aciklama": ["aciklama", "açıklama", "description", "detay"],
+    "para_birimi": ["para_birimi", "para birimi", "currency", "döviz", "doviz"],
+    "miktar": ["miktar", "tutar", "amount"],
+    "odeme_turu": ["odeme_turu", "ödeme türü", "odeme turu", "hesap", "account"],
+    "usd_kuru": ["usd_kuru", "usd kuru", "kur", "rate"],
+    "tl_karsiligi": ["tl_karsiligi", "tl karşılığı", "tl karsiligi", "tl"],
+}
+REQUIRED_FIELDS = ["tarih", "aciklama", "para_birimi", "miktar"]
+ACCOUNTS = ["CASH", "Tonboo Ziraat", "Tonboo Garanti", "Iwant Garanti", "Iwant Ziraat", "Volkan Amount"]
+PREVIEW_ROWS = 20
+NOT_MAPPED = "— (yok) —"
+
+
+def read_transaction_file(path):
+    """CSV (virgül ya da noktalı virgül ayraçlı) veya XLSX dosyasını DataFrame olarak okur"""
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xls"):
+        return pd.read_excel(path)
+    # Tarih ve tutarlar metin olarak okunur; dönüştürme add_transactions_bulk'ta yapılır
+    return pd.read_csv(path, sep=None, engine="python", dtype=str, encoding="utf-8-sig")
+
+
+def guess_column(field, columns):
+    """Dosya başlıkları arasından alana uyan ilk sütunu bulur"""
+    normalized = {str(column).strip().lower(): column for column in columns}
+    for alias in FIELD_ALIASES[field]:
+        if alias in normalized:
+            return normalized[alias]
+    return None
+
+
+class TransactionImportDialog(QDialog):
+    def __init__(self, db, transaction_type, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.transaction_type = transaction_type
+        self.frame = None
+        self.mapping_combos = {}
+        self.imported_count = 0
+        self.initUI()
+
+    def initUI(self):
+        title = "Gelir" if self.transaction_type == "income" else "Gider"
+        self.setWindowTitle(f"{title} İçe Aktar (CSV / XLSX)")
+        self.resize(800, 600)
+
+        layout = QVBoxLayout(self)
+
+        # 1. Dosya seçimi
+        file_layout = QHBoxLayout()
+        self.file_label = QLabel("Dosya seçilmedi")
+        choose_btn = QPushButton("📂 Dosya Seç")
+        choose_btn.clicked.connect(self.choose_file)
+        file_layout.addWidget(self.file_label, 1)
+        file_layout.addWidget(choose_btn)
+        layout.addLayout(file_layout)
+
+        # 2. Sütun eşleştirme
+        mapping_layout = QFormLayout()
+        for field in FIELD_ALIASES:
+            combo = QComboBox()
+            combo.currentIndexChanged.connect(self.update_preview)
+            self.mapping_combos[field] = combo
+            label = f"{field}{' *' if field in REQUIRED_FIELDS else ''}:"
+            mapping_layout.addRow(label, combo)
+
+        self.default_account_combo = QComboBox()
+        self.default_account_combo.addItems(ACCOUNTS)
+        mapping_layout.addRow("Varsayılan ödeme türü:", self.default_account_combo)
+        layout.addLayout(mapping_layout)
+
+        # 3. Önizleme
+        self.preview_table = QTableWidget()
+        self.preview_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.preview_table, 1)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.import_btn = QPushButton("📥 İçe Aktar")
+        self.import_btn.setEnabled(False)
+        self.import_btn.clicked.connect(self.start_import)
+        cancel_btn = QPushButton("İptal")
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(self.import_btn)
+        button_layout.addWidget(cancel_btn)
+        layout.addLayout(button_layout)
+
+        self.setStyleSheet("""
+            QDialog { background-color: #1f2937; color: white; }
+            QLabel { color: white; font-size: 12px; }
+            QComboBox {
+                background-color: #374151; color: white; padding: 6px;
+                border: 1px solid #4b5563; border-radius: 4px;
+            }
+            QTableWidget { background-color: #2a2a2a; color: white; }
+            QPushButton {
+                padding: 8px 16px; background-color: #374151; color: white;
+                border: 1px solid #4b5563; border-radius: 4px;
+            }
+            QPushButton:hover { background-color: #4b5563; }
+        """)
+
+    def choose_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Dosya Seç", "", "Tablo dosyaları (*.csv *.xlsx *.xls)")
+        if path:
+            self.load_file(path)
+
+    def load_file(self, path):
+        try:
+            self.frame = read_transaction_file(path)
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Dosya okunamadı:\n{str(e)}")
+            return
+
+        self.file_label.setText(f"{os.path.basename(path)} — {len(self.frame)} satır")
+        columns = [str(column) for column in self.frame.columns]
+        for field, combo in self.mapping_combos.items():
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem(NOT_MAPPED)
+            combo.addItems(columns)
+            guessed = guess_column(field, self.frame.columns)
+            if guessed is not None:
+                combo.setCurrentText(str(guessed))
+            combo.blockSignals(False)
+        self.update_preview()
+
+    def mapped_frame(self):
+        """Eşleştirilmiş sütunlarla add_transactions_bulk'a verilecek DataFrame"""
+        columns = {str(column): column for column in self.frame.columns}
+        data = {}
+        for field, combo in self.mapping_combos.items():
+            if combo.currentText() in columns:
+                data[field] = self.frame[columns[combo.currentText()]]
+        mapped = pd.DataFrame(data, index=self.frame.index)
+        if "odeme_turu" not in mapped:
+            mapped["odeme_turu"] = self.default_account_combo.currentText()
+        return mapped
+
+    def update_preview(self):
+        if self.frame is None:
+            return
+        mapped = self.mapped_frame()
+        preview = mapped.head(PREVIEW_ROWS)
+        self.preview_table.clear()
+        self.preview_table.setColumnCount(len(preview.columns))
+        self.preview_table.setHorizontalHeaderLabels(list(preview.columns))
+        self.preview_table.setRowCount(len(preview))
+        for row, values in enumerate(preview.itertuples(index=False)):
+            for col, value in enumerate(values):
+                self.preview_table.setItem(row, col, QTableWidgetItem("" if pd.isna(value) else str(value)))
+
+        missing = [field for field in REQUIRED_FIELDS if field not in mapped]
+        if missing:
+            self.status_label.setText(f"Eşleştirilmesi gereken alanlar: {', '.join(missing)}")
+        else:
+            self.status_label.setText(f"{len(mapped)} satır aktarılmaya hazır")
+        self.import_btn.setEnabled(not missing and len(mapped) > 0)
+
+    def start_import(self):
+        self.import_btn.setEnabled(False)
+        self.status_label.setText("Aktarılıyor...")
+        self.db.submit("add_transactions_bulk", self.mapped_frame(), type=self.transaction_type,
+                       priority=PRIORITY_HIGH,
+                       on_result=self.on_import_finished, on_error=self.on_import_failed)
+
+    def on_import_finished(self, count):
+        self.imported_count = count
+        QMessageBox.information(self, "Başarılı", f"{count} kayıt içe aktarıldı.")
+        self.accept()
+
+    def on_import_failed(self, error):
+        self.status_label.setText("Aktarım başarısız")
+        self.import_btn.setEnabled(True)
+        QMessageBox.critical(self, "Hata", f"İçe aktarma sırasında hata oluştu:\n{error}")
@@ -15,6 +15,8 @@ from Tonboo_Garanti_transactions_page import TonbooGarantiTransactionsPageWidget
 from Iwant_Ziraat_transaction_page import IwantZiraatTransactionsPageWidget
 from Iwant_Garanti_transactions_page import IwantGarantiTransactionsPageWidget
 from Volkan_Amount_page import VolkanAmountPageWidget
+from database_manager import DatabaseManager
+from diagnostics_dialog import DiagnosticsDialog
 
 
 def resource_path(relative_path):
@@ -29,6 +31,7 @@ class Ui_MainWindow(object):
         self.centralwidget = QtWidgets.QWidget(MainWindow)
         self.centralwidget.setObjectName("centralwidget")
         self.current_user_role = None
+        self.db = DatabaseManager.instance()
         MainWindow.setAttribute(QtCore.Qt.WA_DeleteOnClose)
         
         # Ana frame (sağ üst - hesap bilgileri)
@@ -197,6 +200,10 @@ class Ui_MainWindow(object):
             'observer': [0,1,2,3,4,5,6,7,11,12]    # Aynı sayfalar salt okunur
         }
         
+        # Veritabanı tanılama penceresi (işlem süreleri, yavaş sorgular)
+        self.diagnostics_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence("Ctrl+Shift+D"), MainWindow)
+        self.diagnostics_shortcut.activated.connect(lambda: self.open_diagnostics(MainWindow))
+        
         # Bağlantıları kur
         self.setup_connections()
         
@@ -469,6 +476,10 @@ class Ui_MainWindow(object):
 
     def create_pages(self):
         """StackedWidget sayfalarını oluşturur"""
+        # Açılış verileri arka planda tek istekte alınır; sayfaların ilk okumaları sunucuya ayrıca
+        # gitmez, bu isteğin sonucunu bekler. Sayfalardan önce başlatılmalıdır
+        self.load_dashboard_bootstrap()
+
         page_names = [
             "CASH",
             "Tonboo Ziraat",
@@ -488,56 +499,56 @@ class Ui_MainWindow(object):
         
         for name in page_names:
             if name == "CASH":
-                self.cash_transactions_page = CashTransactionsPageWidget()
+                self.cash_transactions_page = CashTransactionsPageWidget(db=self.db)
                 self.cash_transactions_page.back_to_main.connect(lambda: self.stackedWidget.setCurrentIndex(0))
                 self.cash_transactions_page.balance_updated.connect(self.update_cash_balance)
                 self.stackedWidget.addWidget(self.cash_transactions_page) 
                 
             elif name == "Iwant Ziraat": 
-                self.iwant_ziraat_page = IwantZiraatTransactionsPageWidget()
+                self.iwant_ziraat_page = IwantZiraatTransactionsPageWidget(db=self.db)
                 self.iwant_ziraat_page.balance_updated.connect(self.update_iwant_ziraat_balance)
                 self.stackedWidget.addWidget(self.iwant_ziraat_page)    
             elif name == "Tonboo Ziraat":
-                self.tonboo_ziraat_page = TonbooZiraatTransactionsPageWidget()
+                self.tonboo_ziraat_page = TonbooZiraatTransactionsPageWidget(db=self.db)
                 self.tonboo_ziraat_page.balance_updated.connect(self.update_tonboo_ziraat_balance)
                 self.stackedWidget.addWidget(self.tonboo_ziraat_page)
             elif name == "Tonboo Garanti": 
-                self.tonboo_garanti_page = TonbooGarantiTransactionsPageWidget()
+                self.tonboo_garanti_page = TonbooGarantiTransactionsPageWidget(db=self.db)
                 self.tonboo_garanti_page.balance_updated.connect(self.update_tonboo_garanti_balance)
                 self.stackedWidget.addWidget(self.tonboo_garanti_page)
             elif name == "Iwant Garanti":
-                self.iwant_garanti_page = IwantGarantiTransactionsPageWidget()
+                self.iwant_garanti_page = IwantGarantiTransactionsPageWidget(db=self.db)
                 self.iwant_garanti_page.balance_updated.connect(self.update_iwant_garanti_balance)
                 self.stackedWidget.addWidget(self.iwant_garanti_page)
             elif name == "Volkan Amount":
-                self.volkan_amount_page = VolkanAmountPageWidget()
+                self.volkan_amount_page = VolkanAmountPageWidget(db=self.db)
                 self.volkan_amount_page.balance_updated.connect(self.update_volkan_amount_balance)
                 self.stackedWidget.addWidget(self.volkan_amount_page)
             elif name == "收入 (Gelir)":
-                self.income_page = IncomePageWidget()
+                self.income_page = IncomePageWidget(db=self.db)
                 if hasattr(self.income_page, 'transaction_added'):
                     self.income_page.transaction_added.connect(self.on_any_account_transaction_added)
                 self.stackedWidget.addWidget(self.income_page)
             elif name == "花费 (Gider)":
-                self.expense_page = ExpensePageWidget()
+                self.expense_page = ExpensePageWidget(db=self.db)
                 if hasattr(self.expense_page, 'transaction_added'):
                     self.expense_page.transaction_added.connect(self.on_any_account_transaction_added)
                 self.stackedWidget.addWidget(self.expense_page)
             elif name == "库存追踪 (Stok)":
                 # Kullanıcı rolünü geçerek StockPage oluştur
-                stock_page = StockPage(user_role=self.current_user_role)
+                stock_page = StockPage(user_role=self.current_user_role, db=self.db)
                 self.stackedWidget.addWidget(stock_page)
             elif name == "参考资料 (Referans)":
-                reference_page = ReferencePage()
+                reference_page = ReferencePage(db=self.db)
                 self.stackedWidget.addWidget(reference_page)
             elif name == "订单 (Siparişler)":
-                daily_orders_page = DailyOrdersWidget()
+                daily_orders_page = DailyOrdersWidget(db=self.db)
                 self.stackedWidget.addWidget(daily_orders_page)
             elif name == "密码 (Şifreler)":
-                paswords_page = PasswordManager()
+                paswords_page = PasswordManager(db=self.db)
                 self.stackedWidget.addWidget(paswords_page)   
             elif name == "进口 (İthalat)":
-                imports_page = ImportsPage()
+                imports_page = ImportsPage(db=self.db)
                 self.stackedWidget.addWidget(imports_page)     
             else:
                 page = QWidget()
@@ -565,6 +576,15 @@ class Ui_MainWindow(object):
                 
                 self.stackedWidget.addWidget(page)
     
+    def load_dashboard_bootstrap(self):
+        """Açılış ekranının tüm verilerini (bakiyeler, CASH detayı, stok, siparişler vb.) arka planda tek istekte alır"""
+        # Hesap sayfalarındaki varsayılan filtreyle aynı aralık (son 30 gün)
+        start_date = QtCore.QDate.currentDate().addDays(-30).toString("yyyy-MM-dd")
+        end_date = QtCore.QDate.currentDate().toString("yyyy-MM-dd")
+        # Başarısız olursa (ör. sunucuda fonksiyon yok) sonucunu bekleyen sayfalar verilerini ayrı ayrı yükler
+        self.db.begin_dashboard_bootstrap("CASH", start_date, end_date, page_size=IncomePageWidget.PAGE_SIZE,
+                                          on_error=lambda error: print(f"Açılış verileri toplu alınamadı: {error}"))
+
     def update_cash_balance(self, balance):
         """Updates the CASH account balance display"""
         if hasattr(self, 'cash_amount_label'):
@@ -602,40 +622,36 @@ class Ui_MainWindow(object):
         self.update_total_balance()
 
     def setup_connections(self):
-        # Cash sayfasını al ve bağlantıları kur
-        if hasattr(self, 'cash_transactions_page') and isinstance(self.cash_transactions_page, CashTransactionsPageWidget):
-            self.cash_transactions_page.load_cash_transactions()
-            self.cash_transactions_page.balance_updated.connect(self.update_cash_balance)
-            self.cash_transactions_page.back_to_main.connect(lambda: self.stackedWidget.setCurrentIndex(0))
-        
-        # Tonboo Ziraat sayfasını al ve bağlantıları kur
-        if hasattr(self, 'tonboo_ziraat_page') and isinstance(self.tonboo_ziraat_page, TonbooZiraatTransactionsPageWidget):
-            self.tonboo_ziraat_page.balance_updated.connect(self.update_tonboo_ziraat_balance)
-            # Sayfa yüklendiğinde işlemleri yükle
-            self.tonboo_ziraat_page.load_tonboo_ziraat_transactions() 
-
-        # Tonboo Garanti sayfasını al ve bağlantıları kur (EKLENDİ)
-        if hasattr(self, 'tonboo_garanti_page') and isinstance(self.tonboo_garanti_page, TonbooGarantiTransactionsPageWidget):
-            self.tonboo_garanti_page.balance_updated.connect(self.update_tonboo_garanti_balance)
-            # Sayfa yüklendiğinde işlemleri yükle
-            self.tonboo_garanti_page.load_tonboo_garanti_transactions() 
-
-        if hasattr(self, 'iwant_ziraat_page') and isinstance(self.iwant_ziraat_page, IwantZiraatTransactionsPageWidget):
-            self.iwant_ziraat_page.balance_updated.connect(self.update_iwant_ziraat_balance)
-            # Sayfa yüklendiğinde işlemleri yükle
-            self.iwant_ziraat_page.load_iwant_ziraat_transactions() 
-
-        if hasattr(self, 'iwant_garanti_page') and isinstance(self.iwant_garanti_page, IwantGarantiTransactionsPageWidget):
-            self.iwant_garanti_page.balance_updated.connect(self.update_iwant_garanti_balance)
-            # Sayfa yüklendiğinde işlemleri yükle
-            self.iwant_garanti_page.load_iwant_garanti_transactions()
-
-        if hasattr(self, 'volkan_amount_page') and isinstance(self.volkan_amount_page, VolkanAmountPageWidget):
-            self.volkan_amount_page.balance_updated.connect(self.update_volkan_amount_balance)
-            # Sayfa yüklendiğinde işlemleri yükle
-            self.volkan_amount_page.load_volkan_amount_transactions()
-
-        # Initialize total balance
+        # Hesap kartları tek bir özet sorgusuyla doldurulur; hesap sayfalarının
+        # detay tabloları kullanıcı hesabı açtığında yüklenir
+        self.refresh_account_balances()
+
+    def refresh_account_balances(self):
+        """Altı hesap kartının bakiyesini tek bir get_account_balances çağrısıyla günceller"""
+        # Hesap sayfalarındaki varsayılan filtreyle aynı aralık (son 30 gün)
+        start_date = QtCore.QDate.currentDate().addDays(-30).toString("yyyy-MM-dd")
+        end_date = QtCore.QDate.currentDate().toString("yyyy-MM-dd")
+
+        self.db.submit("get_account_balances", start_date, end_date,
+                       on_result=self.show_account_balances,
+                       on_error=lambda error: print(f"Bakiye özeti alınamadı: {error}"),
+                       key=(id(self), "balances"))
+
+    def show_account_balances(self, balances):
+        """get_account_balances sonucunu hesap kartlarına yazar"""
+        account_labels = {
+            "CASH": 'cash_amount_label',
+            "Tonboo Ziraat": 'tonboo_ziraat_amount_label',
+            "Tonboo Garanti": 'tonboo_garanti_amount_label',
+            "Iwant Ziraat": 'iwant_ziraat_amount_label',
+            "Iwant Garanti": 'iwant_garanti_amount_label',
+            "Volkan Amount": 'volkan_amount_amount_label'
+        }
+        for account_name, label_attr in account_labels.items():
+            if hasattr(self, label_attr):
+                net = balances.get(account_name, {}).get("net", 0.0)
+                getattr(self, label_attr).setText(f"{net:.2f} TL")
+
         self.update_total_balance()
 
     def on_cash_transaction_added(self):
@@ -646,18 +662,21 @@ class Ui_MainWindow(object):
     def on_any_account_transaction_added(self, account_name): 
         """Herhangi bir hesaba işlem eklendiğinde çağrılır ve ilgili hesabı günceller."""
         print(f"İşlem eklendi: {account_name} hesabı güncelleniyor.")
-        if account_name == "CASH" and hasattr(self, 'cash_transactions_page'):
-            self.cash_transactions_page.load_cash_transactions()
-        elif account_name == "Tonboo Ziraat" and hasattr(self, 'tonboo_ziraat_page'):
-            self.tonboo_ziraat_page.load_tonboo_ziraat_transactions()
-        elif account_name == "Tonboo Garanti" and hasattr(self, 'tonboo_garanti_page'):
-            self.tonboo_garanti_page.load_tonboo_garanti_transactions()
-        elif account_name == "Iwant Ziraat" and hasattr(self, 'iwant_ziraat_page'): 
-            self.iwant_ziraat_page.load_iwant_ziraat_transactions()    
-        elif account_name == "Iwant Garanti" and hasattr(self, 'iwant_garanti_page'):
-            self.iwant_garanti_page.load_iwant_garanti_transactions()
-        elif account_name == "Volkan Amount" and hasattr(self, 'volkan_amount_page'):
-            self.volkan_amount_page.load_volkan_amount_transactions()
+        account_pages = {
+            "CASH": (getattr(self, 'cash_transactions_page', None), 'load_cash_transactions'),
+            "Tonboo Ziraat": (getattr(self, 'tonboo_ziraat_page', None), 'load_tonboo_ziraat_transactions'),
+            "Tonboo Garanti": (getattr(self, 'tonboo_garanti_page', None), 'load_tonboo_garanti_transactions'),
+            "Iwant Ziraat": (getattr(self, 'iwant_ziraat_page', None), 'load_iwant_ziraat_transactions'),
+            "Iwant Garanti": (getattr(self, 'iwant_garanti_page', None), 'load_iwant_garanti_transactions'),
+            "Volkan Amount": (getattr(self, 'volkan_amount_page', None), 'load_volkan_amount_transactions')
+        }
+        page, load_method = account_pages.get(account_name, (None, None))
+
+        # Detay tablosu henüz açılmamışsa sadece bakiye özeti yenilenir
+        if page is not None and page.transactions_loaded:
+            getattr(page, load_method)()
+        else:
+            self.refresh_account_balances()
 
     def on_account_frame_click(self, account_name):
         """Hesap frame'ine tıklandığında çalışır"""
@@ -678,6 +697,9 @@ class Ui_MainWindow(object):
         """Gelecek ödeme kartına tıklandığında çalışır"""
         print(f"{payment_name} gelecek ödemesi seçildi")
 
+    def open_diagnostics(self, parent):
+        DiagnosticsDialog(parent).exec_()
+
     def on_bottom_menu_click(self, menu_name):
         """Alt menü butonuna tıklandığında çalışır"""
         menu_mapping = {
@@ -12,7 +12,7 @@ from database_manager import DatabaseManager  # Sizin veritabanı yöneticiniz
 class FinanceUpdater:
     def __init__(self):
         self.temp_dir = "temp_finance_update"
-        self.db = DatabaseManager()  # Veritabanı bağlantısı
+        self.db = DatabaseManager.instance()  # Veritabanı bağlantısı
         self.exclude_files = self._get_protected_files()  # DB'den korunacak dosyaları al
 
     def _get_protected_files(self):
@@ -62,8 +62,13 @@ class FinanceUpdater:
             print(f"🔴 Kritik Hata Detayı: {type(e).__name__}: {str(e)}")
             return None
 
-    def apply_update(self, zip_path):
-        """Güncellemeyi uygula"""
+    def apply_update(self, zip_path, version_info=None):
+        """Güncellemeyi uygula.
+
+        Bakım modu dosyalar taşınmadan önce açılır. Bitişte sürüm kaydı, güncelleme logu ve
+        bakım modunun kapatılması (ya da hata kaydı ve bakım modunun kapatılması) tek istekte,
+        tek transaction'da yazılır; biri yazılıp diğeri yarım kalmaz.
+        """
         try:
             print("🔄 Uygulanıyor...")
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
@@ -81,29 +86,36 @@ class FinanceUpdater:
                 if dest.exists():
                     shutil.rmtree(dest) if dest.is_dir() else dest.unlink()
                 shutil.move(str(item), str(dest))
-            
-            # Sürüm güncellemesini kaydet
-            version_info = self.check_version()
-            if version_info:
-                self.db.supabase.table("system_info")\
-                     .upsert({"current_version": version_info["version"]}).execute()
-            
+        except Exception as e:
+            self._log_error("apply", str(e), end_maintenance=True)
+            return False
+
+        # Sürüm güncellemesini kaydet ve bakım modunu kapat
+        version_info = version_info or self.check_version()
+        try:
+            with self.db.unit_of_work() as uow:
+                if version_info:
+                    uow.insert("system_info", {"current_version": version_info["version"]})
+                    uow.insert("update_logs", {"version": version_info["version"], "status": "success"})
+                uow.insert("app_status", {"key": "maintenance", "value": False}, on_conflict="key")
             return True
         except Exception as e:
-            self._log_error("apply", str(e))
+            self._log_error("apply", str(e), end_maintenance=True)
             return False
-        finally:
-            # Bakım modunu kapat
-            self.db.supabase.table("app_status")\
-                 .upsert({"key": "maintenance", "value": False}).execute()
 
-    def _log_error(self, stage, error):
-        """Hataları veritabanına kaydet"""
-        self.db.supabase.table("update_errors").insert({
-            "stage": stage,
-            "error": error,
-            "timestamp": "now()"
-        }).execute()
+    def _log_error(self, stage, error, end_maintenance=False):
+        """Hataları veritabanına kaydet; end_maintenance ise bakım modu da aynı işlemde kapatılır"""
+        try:
+            with self.db.unit_of_work() as uow:
+                uow.insert("update_errors", {
+                    "stage": stage,
+                    "error": error,
+                    "timestamp": "now()"
+                })
+                if end_maintenance:
+                    uow.insert("app_status", {"key": "maintenance", "value": False}, on_conflict="key")
+        except Exception as e:
+            print(f"❌ Hata kaydedilemedi: {e}")
 
 def perform_update():
     """Tam güncelleme akışı"""
@@ -112,11 +124,8 @@ def perform_update():
     if latest := updater.check_version():
         if zip_path := updater.download_update(latest["download_url"]):
             if updater.verify_checksum(zip_path, latest.get("checksum")):
-                if updater.apply_update(zip_path):
-                    updater.db.supabase.table("update_logs").insert({
-                        "version": latest["version"],
-                        "status": "success"
-                    }).execute()
+                # update_logs kaydı apply_update'in son işleminde yazılır
+                if updater.apply_update(zip_path, latest):
                     updater.restart_app()
 
 if __name__ == "__main__":
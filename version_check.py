@@ -7,7 +7,7 @@ CURRENT_VERSION = "1.0.0"
 def is_new_version_available():
     """Yeni sürüm olup olmadığını kontrol eder"""
     try:
-        db = DatabaseManager()
+        db = DatabaseManager.instance()
         latest_data = db.get_latest_version_info()
         
         if not latest_data:
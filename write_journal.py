@@ -0,0 +1,260 @@
+# write_journal.py
+"""
+Kayıt ekleme çağrılarının yerel SQLite (WAL) günlüğü ve sıralı tekrar gönderimi.
+
+add_income, add_expense, add_daily_order ve add_contact gönderilmeden önce günlüğe yazılır
+(DatabaseManager._write) ve çağıran beklemeden QueuedWrite alır; GUI thread'i ağı hiç
+beklemez, kesinti sırasında da veri girişi disk hızında devam eder. Arka plandaki thread
+bekleyen kayıtları eklendikleri sırayla gönderir ve sonucu add_sent_listener ile bildirir
+(sayfalar için bkz. queued_rows.py). Sunucuya ulaşılamadığında (db_retry devresi açık,
+zaman aşımı, bağlantı yok) durur ve sırayı bozmadan daha sonra tekrar dener.
+
+Her kayıt günlüğe yazılırken idempotency_key alır (bkz. migrations/0011_idempotency_keys.sql,
+0014_contacts_idempotency_key.sql). Gönderim yarıda kalsa, uygulama kapansa ya da yanıt
+kaybolsa bile aynı kayıt sunucuda ikinci kez oluşmaz. Sunucunun reddettiği kayıtlar
+(ör. tekrar gönderimde stok yetersiz) "failed" olarak ayrılır, hatasıyla saklanır ve
+sıradakiler gönderilmeye devam eder.
+
+WRITE_JOURNAL_PATH ortam değişkeni günlük dosyasının yoludur (ör. kullanıcının uygulama veri
+dizininde). Verilmezse günlük kapalıdır ve yazmalar doğrudan gönderilir; uygulama çalışma
+dizinine kendiliğinden dosya açmaz.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from db_retry import OFFLINE_ERRORS
+
+# Gönderilmiş kayıtlar bu kadar gün sonra günlükten silinir
+KEEP_DONE_DAYS = 7
+
+logger = logging.getLogger(__name__)
+
+
+class QueuedWrite(dict):
+    """Günlüğe yazılmış, sunucuya henüz gönderilmemiş kayıt.
+
+    İçeriği gönderilecek satırdır (id'si henüz yoktur); sayfalar satırı "sırada" olarak gösterebilir.
+    """
+
+    def __init__(self, seq, row):
+        super().__init__(row)
+        self.seq = seq
+
+
+class WriteJournal:
+    """Yazmaların SQLite günlüğü ve arka plan gönderici"""
+
+    def __init__(self, path, db, interval=5.0):
+        self.path = path
+        self.db = db
+        self.interval = interval
+        self._lock = threading.RLock()
+        # Aynı anda tek kayıt gönderilir; sıra korunur
+        self._send_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._listeners = []
+        self._sent_listeners = []
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.conn.execute("pragma journal_mode=wal")
+        # Commit döndüğünde kayıt diskte; elektrik kesintisinde de kaybolmaz
+        self.conn.execute("pragma synchronous=full")
+        with self._lock, self.conn:
+            self.conn.execute("""
+                create table if not exists journal (
+                    seq integer primary key autoincrement,
+                    method text not null,
+                    args text not null,
+                    status text not null default 'pending',
+                    attempts integer not null default 0,
+                    last_error text,
+                    created_at real not null,
+                    sent_at real
+                )
+            """)
+            self.conn.execute("create index if not exists journal_status on journal (status, seq)")
+
+    @classmethod
+    def from_env(cls, db):
+        """WRITE_JOURNAL_PATH verilmişse bir WriteJournal, yoksa None döndürür"""
+        path = os.getenv("WRITE_JOURNAL_PATH")
+        if not path:
+            return None
+        return cls(path, db, interval=float(os.getenv("WRITE_JOURNAL_INTERVAL", "5")))
+
+    # ----- günlük ----- #
+
+    def _append(self, method, args):
+        with self._lock, self.conn:
+            cursor = self.conn.execute("insert into journal (method, args, created_at) values (?, ?, ?)",
+                                       (method, json.dumps(args, ensure_ascii=False), time.time()))
+            return cursor.lastrowid
+
+    def _set_status(self, seq, status, error=None):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                update journal set status = ?, attempts = attempts + 1, last_error = ?,
+                       sent_at = case when ? = 'done' then ? else sent_at end
+                 where seq = ?
+            """, (status, None if error is None else str(error), status, time.time(), seq))
+
+    def _first_pending(self):
+        with self._lock:
+            row = self.conn.execute("select min(seq) from journal where status = 'pending'").fetchone()
+        return row[0]
+
+    def _next_pending(self):
+        with self._lock:
+            row = self.conn.execute(
+                "select seq, method, args from journal where status = 'pending' order by seq limit 1").fetchone()
+        return None if row is None else (row[0], row[1], json.loads(row[2]))
+
+    def pending(self):
+        """Gönderilmeyi bekleyen kayıtlar, eklenme sırasıyla: [(seq, method, args)]"""
+        with self._lock:
+            rows = self.conn.execute(
+                "select seq, method, args from journal where status = 'pending' order by seq").fetchall()
+        return [(seq, method, json.loads(args)) for seq, method, args in rows]
+
+    def failed(self):
+        """Sunucunun reddettiği kayıtlar: [(seq, method, args, hata)]"""
+        with self._lock:
+            rows = self.conn.execute(
+                "select seq, method, args, last_error from journal where status = 'failed' order by seq").fetchall()
+        return [(seq, method, json.loads(args), error) for seq, method, args, error in rows]
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.conn.execute("select status, count(*) from journal group by status"))
+        return {"pending": counts.get("pending", 0), "failed": counts.get("failed", 0)}
+
+    def prune(self, days=KEEP_DONE_DAYS):
+        """Gönderilmiş eski kayıtları siler"""
+        with self._lock, self.conn:
+            return self.conn.execute("delete from journal where status = 'done' and sent_at < ?",
+                                     (time.time() - days * 86400,)).rowcount
+
+    # ----- gönderim ----- #
+
+    def submit(self, method, args, preview=None):
+        """Kaydı günlüğe yazar ve beklemeden QueuedWrite(preview) döndürür.
+
+        Gönderim her zaman arka plandaki thread'de (replay) yapılır; çağıran (GUI thread'i) ağı,
+        tekrar denemeleri ya da süre sınırını hiç beklemez. Sunucunun sonucu ya da reddi
+        add_sent_listener dinleyicilerine QueuedWrite.seq ile bildirilir.
+        """
+        seq = self._append(method, args)
+        self._wake.set()
+        self._notify()
+        return QueuedWrite(seq, preview or {})
+
+    def replay(self):
+        """Bekleyen kayıtları sırayla gönderir; sunucuya ulaşılamazsa durur. Gönderilen kayıt sayısını döndürür.
+
+        Aynı anda tek replay gönderir; kilit her kayıt için ayrı alınır.
+        """
+        sent = 0
+        while True:
+            with self._send_lock:
+                entry = self._next_pending()
+                if entry is None:
+                    break
+                seq, method, args = entry
+                result = error = None
+                try:
+                    result = getattr(self.db, method)(**args)
+                except OFFLINE_ERRORS as e:
+                    self._set_status(seq, "pending", e)
+                    break
+                except Exception as e:
+                    # Sunucu reddetti (ör. stok artık yetersiz): kayıt ayrılır, sıradakiler gönderilir
+                    logger.error(f"Sıradaki kayıt sunucu tarafından reddedildi (#{seq} {method}): {e}")
+                    self._set_status(seq, "failed", e)
+                    error = e
+                else:
+                    self._set_status(seq, "done")
+                    sent += 1
+            self._notify_sent(seq, result, error)
+        if sent:
+            logger.info(f"Sıradaki {sent} kayıt gönderildi")
+        self._notify()
+        return sent
+
+    # ----- durum dinleyicileri ----- #
+
+    def add_listener(self, listener):
+        """listener(stats) bekleyen/reddedilen kayıt sayısı değiştikçe (herhangi bir thread'de) çağrılır"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def add_sent_listener(self, listener):
+        """listener(seq, result, error) sıradan gönderilen her kayıt için (herhangi bir thread'de) çağrılır.
+
+        seq, submit()'in döndürdüğü QueuedWrite.seq'tir; sunucu kabul ettiyse result sunucunun
+        sonucu (ör. eklenen satır), reddettiyse error hatadır. Sayfalar sıradaki satırı bununla
+        günceller ya da kaldırır.
+        """
+        self._sent_listeners.append(listener)
+
+    def remove_sent_listener(self, listener):
+        if listener in self._sent_listeners:
+            self._sent_listeners.remove(listener)
+
+    def _notify_sent(self, seq, result, error):
+        for listener in list(self._sent_listeners):
+            try:
+                listener(seq, result, error)
+            except Exception:
+                logger.exception("Günlük dinleyicisi hata verdi")
+
+    def _notify(self):
+        if not self._listeners:
+            return
+        stats = self.stats()
+        for listener in list(self._listeners):
+            try:
+                listener(stats)
+            except Exception:
+                logger.exception("Günlük dinleyicisi hata verdi")
+
+    # ----- arka plan thread'i ----- #
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.prune()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="write-journal", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self._first_pending() is not None:
+                    self.replay()
+            except Exception:
+                logger.exception("Günlük gönderimi hata verdi")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self.conn.close()